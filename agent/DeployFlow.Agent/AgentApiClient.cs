@@ -1,7 +1,11 @@
 using System;
+using System.Collections.Generic;
+using System.Linq;
 using System.Net;
 using System.Net.Http;
 using System.Net.Http.Json;
+using System.Text;
+using System.Text.Json;
 using System.Threading;
 using System.Threading.Tasks;
 using Microsoft.Extensions.Logging;
@@ -21,6 +25,12 @@ public class AgentApiClient
         _config = config.Value;
         _logger = logger;
         _httpClient.BaseAddress = new Uri(_config.BackendBaseUrl);
+        // A long-poll heartbeat stays open for up to LongPollSeconds.
+        var minimumTimeout = TimeSpan.FromSeconds(_config.LongPollSeconds + 30);
+        if (_httpClient.Timeout < minimumTimeout)
+        {
+            _httpClient.Timeout = minimumTimeout;
+        }
     }
 
     public async Task<AgentRegisterResponse?> RegisterAsync(
@@ -52,12 +62,20 @@ public class AgentApiClient
         return await response.Content.ReadFromJsonAsync<AgentRegisterResponse>(cancellationToken: cancellationToken);
     }
 
-    public async Task<AgentHeartbeatResponse?> HeartbeatAsync(int deviceId, CancellationToken cancellationToken = default)
+    public async Task<AgentHeartbeatResponse?> HeartbeatAsync(
+        int deviceId,
+        string? hardwareSummary = null,
+        string? hardwareHash = null,
+        int waitSeconds = 0,
+        CancellationToken cancellationToken = default)
     {
         var request = new AgentHeartbeatRequest
         {
             DeviceId = deviceId,
-            Status = "online"
+            Status = "online",
+            HardwareSummary = hardwareSummary,
+            HardwareHash = hardwareHash,
+            WaitSeconds = waitSeconds > 0 ? waitSeconds : null,
         };
 
         var response = await _httpClient.PostAsJsonAsync("/api/v1/agent/heartbeat", request, cancellationToken);
@@ -84,25 +102,121 @@ public class AgentApiClient
         return await response.Content.ReadFromJsonAsync<AgentHeartbeatResponse>(cancellationToken: cancellationToken);
     }
 
-    public async Task<bool> SendActionResultAsync(int actionId, string status, int? exitCode, string? logs, CancellationToken cancellationToken = default)
+    /// <summary>
+    /// Posts results in one request. Returns the per-action outcomes, or null when the
+    /// request should be retried (network error, 5xx). A result the backend rejects,
+    /// such as "Action is not running", is final.
+    /// </summary>
+    public async Task<IReadOnlyList<AgentActionResultOutcome>?> SendActionResultsAsync(
+        IReadOnlyList<AgentActionResultItem> results,
+        CancellationToken cancellationToken = default)
     {
-        var request = new AgentActionResultRequest
+        var request = new AgentActionResultBatchRequest { Results = new List<AgentActionResultItem>(results) };
+
+        HttpResponseMessage response;
+        try
         {
-            Status = status,
-            ExitCode = exitCode,
-            Logs = logs,
-            CompletedAt = DateTime.UtcNow
-        };
+            response = await _httpClient.PostAsJsonAsync("/api/v1/agent/actions/results", request, cancellationToken);
+        }
+        catch (HttpRequestException ex)
+        {
+            _logger.LogWarning(ex, "Posting {Count} action results failed; will retry", results.Count);
+            return null;
+        }
 
-        var response = await _httpClient.PostAsJsonAsync($"/api/v1/agent/actions/{actionId}/result", request, cancellationToken);
         if (!response.IsSuccessStatusCode)
         {
             var body = await response.Content.ReadAsStringAsync(cancellationToken);
-            _logger.LogError("Posting action result for {ActionId} failed with {StatusCode}. Body: {Body}", actionId, response.StatusCode, body);
-            return false;
+            if (!IsFinal(response.StatusCode))
+            {
+                _logger.LogWarning("Posting action results failed with {StatusCode}; will retry. Body: {Body}", response.StatusCode, body);
+                return null;
+            }
+
+            _logger.LogError("Action results rejected with {StatusCode}. Body: {Body}", response.StatusCode, body);
+            return results
+                .Select(item => new AgentActionResultOutcome { ActionId = item.ActionId, Status = "error", Detail = body })
+                .ToList();
         }
 
-        return true;
+        var batch = await response.Content.ReadFromJsonAsync<AgentActionResultBatchResponse>(cancellationToken: cancellationToken);
+        return batch?.Results ?? new List<AgentActionResultOutcome>();
+    }
+
+    /// <summary>
+    /// Appends a chunk of output at byte <paramref name="offset"/>. On success
+    /// <see cref="LogChunkResult.NextOffset"/> is the byte offset the backend expects next,
+    /// including after an offset conflict, so the caller resumes from there.
+    /// </summary>
+    public async Task<LogChunkResult> AppendLogChunkAsync(
+        int actionId,
+        long offset,
+        string content,
+        CancellationToken cancellationToken = default)
+    {
+        var request = new AgentLogChunkRequest { Offset = offset, Content = content };
+
+        HttpResponseMessage response;
+        try
+        {
+            response = await _httpClient.PostAsJsonAsync($"/api/v1/agent/actions/{actionId}/logs", request, cancellationToken);
+        }
+        catch (HttpRequestException ex)
+        {
+            _logger.LogWarning(ex, "Uploading logs for action {ActionId} failed; will retry", actionId);
+            return new LogChunkResult(DeliveryStatus.Failed, offset);
+        }
+
+        if (response.StatusCode == HttpStatusCode.Conflict)
+        {
+            var expectedOffset = await ReadExpectedOffsetAsync(response, cancellationToken);
+            return expectedOffset is null
+                ? new LogChunkResult(DeliveryStatus.Failed, offset)
+                : new LogChunkResult(DeliveryStatus.Delivered, expectedOffset.Value);
+        }
+
+        if (!response.IsSuccessStatusCode)
+        {
+            var body = await response.Content.ReadAsStringAsync(cancellationToken);
+            _logger.LogWarning(
+                "Uploading logs for action {ActionId} failed with {StatusCode}. Body: {Body}",
+                actionId,
+                response.StatusCode,
+                body);
+            return new LogChunkResult(IsFinal(response.StatusCode) ? DeliveryStatus.Rejected : DeliveryStatus.Failed, offset);
+        }
+
+        var chunk = await response.Content.ReadFromJsonAsync<AgentLogChunkResponse>(cancellationToken: cancellationToken);
+        return new LogChunkResult(DeliveryStatus.Delivered, chunk?.Size ?? offset + Encoding.UTF8.GetByteCount(content));
+    }
+
+    private static bool IsFinal(HttpStatusCode statusCode)
+    {
+        var code = (int)statusCode;
+        return code >= 400 && code < 500
+            && statusCode != HttpStatusCode.RequestTimeout
+            && statusCode != HttpStatusCode.TooManyRequests;
+    }
+
+    private static async Task<long?> ReadExpectedOffsetAsync(HttpResponseMessage response, CancellationToken cancellationToken)
+    {
+        // 409 body: {"detail": {"message": "...", "expected_offset": 123}}
+        try
+        {
+            using var document = JsonDocument.Parse(await response.Content.ReadAsStringAsync(cancellationToken));
+            if (document.RootElement.TryGetProperty("detail", out var detail)
+                && detail.ValueKind == JsonValueKind.Object
+                && detail.TryGetProperty("expected_offset", out var expected)
+                && expected.ValueKind == JsonValueKind.Number)
+            {
+                return expected.GetInt64();
+            }
+        }
+        catch (JsonException)
+        {
+        }
+
+        return null;
     }
 
     public class DeviceNotFoundException : Exception
@@ -115,3 +229,14 @@ public class AgentApiClient
         }
     }
 }
+
+public enum DeliveryStatus
+{
+    Delivered,
+    // The backend refused the request for good (4xx); sending it again cannot succeed.
+    Rejected,
+    // Network error or 5xx; worth retrying.
+    Failed,
+}
+
+public readonly record struct LogChunkResult(DeliveryStatus Status, long NextOffset);
@@ -5,5 +5,7 @@ public class AgentConfig
     public string BackendBaseUrl { get; set; } = "http://localhost:8000";
     public string EnrollmentToken { get; set; } = "changeme";
     public int PollIntervalSeconds { get; set; } = 30;
+    public int LongPollSeconds { get; set; } = 25;
+    public int LogChunkBytes { get; set; } = 64 * 1024;
     public string DeviceStateFile { get; set; } = "device_state.json";
 }
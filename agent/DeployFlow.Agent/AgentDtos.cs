@@ -32,6 +32,9 @@ public class AgentRegisterResponse
 
     [JsonPropertyName("poll_interval_seconds")]
     public int PollIntervalSeconds { get; set; }
+
+    [JsonPropertyName("long_poll_max_seconds")]
+    public int LongPollMaxSeconds { get; set; }
 }
 
 public class AgentHeartbeatRequest
@@ -47,6 +50,12 @@ public class AgentHeartbeatRequest
 
     [JsonPropertyName("hardware_summary")]
     public string? HardwareSummary { get; set; }
+
+    [JsonPropertyName("hardware_hash")]
+    public string? HardwareHash { get; set; }
+
+    [JsonPropertyName("wait_seconds")]
+    public int? WaitSeconds { get; set; }
 }
 
 public class AgentActionPayload
@@ -68,6 +77,9 @@ public class AgentHeartbeatResponse
 {
     [JsonPropertyName("actions")]
     public List<AgentActionPayload> Actions { get; set; } = new();
+
+    [JsonPropertyName("hardware_summary_required")]
+    public bool HardwareSummaryRequired { get; set; }
 }
 
 public class AgentActionResultRequest
@@ -84,3 +96,51 @@ public class AgentActionResultRequest
     [JsonPropertyName("completed_at")]
     public DateTime? CompletedAt { get; set; }
 }
+
+public class AgentActionResultItem : AgentActionResultRequest
+{
+    [JsonPropertyName("action_id")]
+    public int ActionId { get; set; }
+}
+
+public class AgentActionResultBatchRequest
+{
+    [JsonPropertyName("results")]
+    public List<AgentActionResultItem> Results { get; set; } = new();
+}
+
+public class AgentActionResultOutcome
+{
+    [JsonPropertyName("action_id")]
+    public int ActionId { get; set; }
+
+    [JsonPropertyName("status")]
+    public string Status { get; set; } = string.Empty;
+
+    [JsonPropertyName("detail")]
+    public string? Detail { get; set; }
+}
+
+public class AgentActionResultBatchResponse
+{
+    [JsonPropertyName("results")]
+    public List<AgentActionResultOutcome> Results { get; set; } = new();
+}
+
+public class AgentLogChunkRequest
+{
+    [JsonPropertyName("offset")]
+    public long Offset { get; set; }
+
+    [JsonPropertyName("content")]
+    public string Content { get; set; } = string.Empty;
+}
+
+public class AgentLogChunkResponse
+{
+    [JsonPropertyName("action_id")]
+    public int ActionId { get; set; }
+
+    [JsonPropertyName("size")]
+    public long Size { get; set; }
+}
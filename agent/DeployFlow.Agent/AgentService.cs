@@ -1,4 +1,7 @@
 using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
 using System.Runtime.InteropServices;
 using System.Text;
 using System.Threading;
@@ -11,11 +14,17 @@ namespace DeployFlow.Agent;
 
 public class AgentService : BackgroundService
 {
+    private const int MaxResultsPerRequest = 500;
+
     private readonly AgentApiClient _apiClient;
     private readonly AgentConfig _config;
     private readonly ILogger<AgentService> _logger;
     private readonly DeviceStateStore _stateStore;
+    // Results not yet accepted or rejected by the backend, in completion order.
+    private readonly List<PendingResult> _pendingResults = new();
     private int _deviceId;
+    // Hash of the hardware summary the backend last received in full.
+    private string? _sentHardwareHash;
 
     public AgentService(
         AgentApiClient apiClient,
@@ -55,6 +64,7 @@ public class AgentService : BackgroundService
     {
         while (!stoppingToken.IsCancellationRequested)
         {
+            var pollStarted = Stopwatch.StartNew();
             if (_deviceId == 0)
             {
                 _logger.LogWarning("Device id missing; attempting registration before heartbeat.");
@@ -67,12 +77,25 @@ public class AgentService : BackgroundService
                 }
             }
 
+            // Results that could not be delivered on the previous pass.
+            await FlushResultsAsync(stoppingToken);
+
             _logger.LogInformation("Sending heartbeat for device {DeviceId}", _deviceId);
 
+            // The full inventory is only sent when its hash changed or the backend asks for it.
+            var hardwareSummary = HardwareInventory.Collect();
+            var hardwareHash = HardwareInventory.Hash(hardwareSummary);
+            var sendSummary = hardwareHash != _sentHardwareHash;
+
             AgentHeartbeatResponse? heartbeatResponse = null;
             try
             {
-                heartbeatResponse = await _apiClient.HeartbeatAsync(_deviceId, stoppingToken);
+                heartbeatResponse = await _apiClient.HeartbeatAsync(
+                    _deviceId,
+                    sendSummary ? hardwareSummary : null,
+                    hardwareHash,
+                    _config.LongPollSeconds,
+                    stoppingToken);
             }
             catch (AgentApiClient.DeviceNotFoundException ex)
             {
@@ -82,6 +105,8 @@ public class AgentService : BackgroundService
 
                 _stateStore.Clear();
                 _deviceId = 0;
+                // Results for the old device's actions can never be accepted.
+                _pendingResults.Clear();
                 var registered = await RegisterAndPersistAsync(stoppingToken);
                 if (registered)
                 {
@@ -96,6 +121,13 @@ public class AgentService : BackgroundService
                 continue;
             }
 
+            if (heartbeatResponse != null)
+            {
+                _sentHardwareHash = heartbeatResponse.HardwareSummaryRequired
+                    ? null
+                    : sendSummary ? hardwareHash : _sentHardwareHash;
+            }
+
             if (heartbeatResponse?.Actions != null && heartbeatResponse.Actions.Count > 0)
             {
                 foreach (var action in heartbeatResponse.Actions)
@@ -172,27 +204,142 @@ public class AgentService : BackgroundService
                         _logger.LogWarning("Unsupported action type {Type} for action {ActionId}", action.Type, action.Id);
                     }
 
-                    await _apiClient.SendActionResultAsync(
-                        action.Id,
-                        status,
-                        exitCode,
-                        logs,
-                        stoppingToken);
+                    EnqueueResult(action.Id, status, exitCode, logs);
+                }
+
+                await FlushResultsAsync(stoppingToken);
+            }
+
+            // A long-poll heartbeat already waited on the backend; check in at most
+            // once per poll interval either way.
+            var remaining = TimeSpan.FromSeconds(_config.PollIntervalSeconds) - pollStarted.Elapsed;
+            if (remaining > TimeSpan.Zero)
+            {
+                await Task.Delay(remaining, stoppingToken);
+            }
+        }
+    }
+
+    private void EnqueueResult(int actionId, string status, int exitCode, string logs)
+    {
+        var item = new AgentActionResultItem
+        {
+            ActionId = actionId,
+            Status = status,
+            ExitCode = exitCode,
+            Logs = logs,
+            CompletedAt = DateTime.UtcNow,
+        };
+
+        // Large output is uploaded as log chunks first; the result then carries no logs.
+        string? streamedLogs = null;
+        if (Encoding.UTF8.GetByteCount(logs) > _config.LogChunkBytes)
+        {
+            streamedLogs = logs;
+            item.Logs = null;
+        }
+
+        _pendingResults.Add(new PendingResult(item, streamedLogs));
+    }
+
+    private async Task FlushResultsAsync(CancellationToken cancellationToken)
+    {
+        var ready = new List<PendingResult>();
+        foreach (var pending in _pendingResults.ToList())
+        {
+            if (pending.StreamedLogs != null)
+            {
+                var upload = await UploadLogsAsync(pending.Item.ActionId, pending.StreamedLogs, cancellationToken);
+                if (upload == DeliveryStatus.Failed)
+                {
+                    continue;
+                }
+
+                if (upload == DeliveryStatus.Rejected)
+                {
+                    // Fall back to sending the output inline with the result.
+                    pending.Item.Logs = pending.StreamedLogs;
+                }
+
+                pending.StreamedLogs = null;
+            }
+
+            ready.Add(pending);
+        }
+
+        foreach (var batch in ready.Chunk(MaxResultsPerRequest))
+        {
+            var outcomes = await _apiClient.SendActionResultsAsync(
+                batch.Select(pending => pending.Item).ToList(),
+                cancellationToken);
+            if (outcomes == null)
+            {
+                // Kept for the next pass.
+                continue;
+            }
+
+            foreach (var outcome in outcomes)
+            {
+                // Accepted and rejected results are both final: a rejected one (e.g. the
+                // action was re-queued or cancelled) would only be rejected again.
+                _pendingResults.RemoveAll(pending => pending.Item.ActionId == outcome.ActionId);
+                if (outcome.Status != "ok")
+                {
+                    _logger.LogWarning(
+                        "Result for action {ActionId} was rejected: {Detail}. Not retrying.",
+                        outcome.ActionId,
+                        outcome.Detail);
                 }
             }
+        }
+    }
 
-            await Task.Delay(TimeSpan.FromSeconds(_config.PollIntervalSeconds), stoppingToken);
+    private async Task<DeliveryStatus> UploadLogsAsync(int actionId, string logs, CancellationToken cancellationToken)
+    {
+        var bytes = Encoding.UTF8.GetBytes(logs);
+        var offset = 0;
+        while (offset < bytes.Length)
+        {
+            var end = Math.Min(offset + _config.LogChunkBytes, bytes.Length);
+            // Never split a UTF-8 sequence across chunks.
+            while (end < bytes.Length && end > offset + 1 && (bytes[end] & 0xC0) == 0x80)
+            {
+                end--;
+            }
+
+            // Chunk boundaries are deterministic, so re-sending after a lost response
+            // repeats a stored chunk, which the backend accepts as a no-op.
+            var chunk = await _apiClient.AppendLogChunkAsync(
+                actionId,
+                offset,
+                Encoding.UTF8.GetString(bytes, offset, end - offset),
+                cancellationToken);
+            if (chunk.Status != DeliveryStatus.Delivered)
+            {
+                return chunk.Status;
+            }
+
+            if (chunk.NextOffset <= offset || chunk.NextOffset > bytes.Length)
+            {
+                // The backend holds output this agent did not send.
+                return DeliveryStatus.Rejected;
+            }
+
+            offset = (int)chunk.NextOffset;
         }
+
+        return DeliveryStatus.Delivered;
     }
 
     private async Task<bool> RegisterAndPersistAsync(CancellationToken cancellationToken)
     {
         var hostname = Environment.MachineName;
         var osDescription = RuntimeInformation.OSDescription;
+        var hardwareSummary = HardwareInventory.Collect();
         var registerResponse = await _apiClient.RegisterAsync(
             hostname,
             osVersion: Environment.OSVersion.VersionString,
-            hardwareSummary: null,
+            hardwareSummary: hardwareSummary,
             osType: "windows",
             osDescription: osDescription,
             cancellationToken: cancellationToken);
@@ -203,6 +350,7 @@ public class AgentService : BackgroundService
         }
 
         _deviceId = registerResponse.DeviceId;
+        _sentHardwareHash = HardwareInventory.Hash(hardwareSummary);
         _stateStore.Save(new DeviceState { DeviceId = _deviceId });
         _logger.LogInformation("Registered new device id: {DeviceId}", _deviceId);
 
@@ -211,6 +359,22 @@ public class AgentService : BackgroundService
             _config.PollIntervalSeconds = registerResponse.PollIntervalSeconds;
         }
 
+        _config.LongPollSeconds = Math.Min(_config.LongPollSeconds, registerResponse.LongPollMaxSeconds);
+
         return true;
     }
 }
+
+internal sealed class PendingResult
+{
+    public PendingResult(AgentActionResultItem item, string? streamedLogs)
+    {
+        Item = item;
+        StreamedLogs = streamedLogs;
+    }
+
+    public AgentActionResultItem Item { get; }
+
+    // Output still to upload as log chunks before the result is sent.
+    public string? StreamedLogs { get; set; }
+}
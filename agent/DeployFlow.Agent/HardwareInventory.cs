@@ -0,0 +1,28 @@
+using System;
+using System.Runtime.InteropServices;
+using System.Security.Cryptography;
+using System.Text;
+using System.Text.Json;
+
+namespace DeployFlow.Agent;
+
+public static class HardwareInventory
+{
+    public static string Collect()
+    {
+        return JsonSerializer.Serialize(new
+        {
+            machine_name = Environment.MachineName,
+            processor_count = Environment.ProcessorCount,
+            total_memory_bytes = GC.GetGCMemoryInfo().TotalAvailableMemoryBytes,
+            os_description = RuntimeInformation.OSDescription,
+            os_architecture = RuntimeInformation.OSArchitecture.ToString(),
+        });
+    }
+
+    // Same as the backend's inventory_hash: SHA-256 hex of the UTF-8 summary.
+    public static string Hash(string summary)
+    {
+        return Convert.ToHexString(SHA256.HashData(Encoding.UTF8.GetBytes(summary))).ToLowerInvariant();
+    }
+}
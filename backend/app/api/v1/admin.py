@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.cache import CACHES
+from app.core.events import event_broadcaster
+from app.db import get_db, pool_stats
+from app.services.device_liveness import run_liveness_sweep
+from app.services.fleet_counters import reconcile_fleet_counters
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/cache-stats")
+def cache_stats():
+    return {"caches": [cache.stats() for cache in CACHES]}
+
+
+@router.get("/event-stats")
+def event_stats():
+    return {"subscribers": event_broadcaster.subscriber_count()}
+
+
+@router.get("/db-stats")
+def db_stats():
+    """Connection pool occupancy and counters, plus the live SQLite pragmas."""
+    return pool_stats()
+
+
+@router.post("/reconcile-counters")
+def reconcile_counters(db: Session = Depends(get_db)):
+    """Recompute the fleet summary counters now instead of waiting for the periodic job."""
+    return {"corrected": reconcile_fleet_counters(db)}
+
+
+@router.post("/sweep-liveness")
+def sweep_liveness():
+    """Run the device liveness sweep now instead of waiting for the periodic job."""
+    return {"swept": run_liveness_sweep()}
@@ -1,37 +1,88 @@
 from datetime import datetime
+from typing import NamedTuple, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.core.cache import device_liveness_cache, enrollment_token_cache
+from app.core.checkin_buffer import checkin_buffer
+from app.core.config import get_settings
+from app.core.events import EVENT_ACTION_STATUS, event_broadcaster
+from app.core.notifications import action_hub
 from app.db import get_db
 from app.models.action import (
     ACTION_STATUS_FAILED,
-    ACTION_STATUS_PENDING,
     ACTION_STATUS_RUNNING,
     ACTION_STATUS_SUCCEEDED,
     Action,
+    join_payload,
 )
-from app.models.device import Device
+from app.models.device import DEVICE_STATUS_ONLINE, Device
 from app.models.enrollment_token import EnrollmentToken
 from app.schemas.agent import (
     AgentActionPayload,
+    AgentActionResultBatchRequest,
+    AgentActionResultBatchResponse,
+    AgentActionResultOutcome,
     AgentActionResultRequest,
     AgentHeartbeatRequest,
     AgentHeartbeatResponse,
+    AgentLogChunkRequest,
+    AgentLogChunkResponse,
     AgentRegisterRequest,
     AgentRegisterResponse,
 )
+from app.services.action_logs import LogOffsetConflict, append_log_chunk
+from app.services.device_groups import refresh_device_memberships
+from app.services.dispatch import claim_pending_actions, extend_lease
+from app.services.fleet_counters import (
+    CounterDeltas,
+    action_deltas,
+    bump_counters,
+    track_actions,
+    track_device,
+)
+from app.services.inventory import inventory_hash
+from app.services.payload_store import load_payloads
+from app.services.resource_versions import bump_device_actions
 
 router = APIRouter(prefix="/agent", tags=["agent"])
 
 
-@router.post("/register", response_model=AgentRegisterResponse)
-def register_agent(payload: AgentRegisterRequest, db: Session = Depends(get_db)):
-    token = (
-        db.query(EnrollmentToken)
-        .filter(EnrollmentToken.token_value == payload.enrollment_token)
+def _lookup_enrollment_token(token_value: str, db: Session):
+    return enrollment_token_cache.get_or_load(
+        token_value,
+        lambda: db.query(EnrollmentToken.id, EnrollmentToken.expires_at)
+        .filter(EnrollmentToken.token_value == token_value)
+        .first(),
+    )
+
+
+class DeviceLiveness(NamedTuple):
+    is_deleted: bool
+    hardware_hash: Optional[str]
+
+
+def _load_device_liveness(device_id: int, db: Session) -> Optional[DeviceLiveness]:
+    row = (
+        db.query(Device.is_deleted, Device.hardware_hash)
+        .filter(Device.id == device_id)
         .first()
     )
+    return DeviceLiveness(row.is_deleted, row.hardware_hash) if row else None
+
+
+def _lookup_device_liveness(device_id: int, db: Session) -> Optional[DeviceLiveness]:
+    return device_liveness_cache.get_or_load(
+        device_id, lambda: _load_device_liveness(device_id, db)
+    )
+
+
+@router.post("/register", response_model=AgentRegisterResponse)
+def register_agent(payload: AgentRegisterRequest, db: Session = Depends(get_db)):
+    token = _lookup_enrollment_token(payload.enrollment_token, db)
     if not token or (token.expires_at and token.expires_at < datetime.utcnow()):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid enrollment token"
@@ -40,12 +91,14 @@ def register_agent(payload: AgentRegisterRequest, db: Session = Depends(get_db))
     now = datetime.utcnow()
     device = db.query(Device).filter(Device.hostname == payload.hostname).first()
     os_type = payload.os_type or "windows"
+    previous = (device.status, device.os_type) if device and not device.is_deleted else None
     if device:
         # Reactivate soft-deleted devices or update existing ones
         device.os_version = payload.os_version
         device.hardware_summary = payload.hardware_summary
+        device.hardware_hash = inventory_hash(payload.hardware_summary)
         device.last_check_in = now
-        device.status = "online"
+        device.status = DEVICE_STATUS_ONLINE
         device.os_type = payload.os_type or device.os_type or "windows"
         device.is_deleted = False
     else:
@@ -53,16 +106,29 @@ def register_agent(payload: AgentRegisterRequest, db: Session = Depends(get_db))
             hostname=payload.hostname,
             os_version=payload.os_version,
             hardware_summary=payload.hardware_summary,
+            hardware_hash=inventory_hash(payload.hardware_summary),
             os_type=os_type,
-            status="online",
+            status=DEVICE_STATUS_ONLINE,
             last_check_in=now,
         )
         db.add(device)
 
+    db.flush()
+    refresh_device_memberships(db, [device.id])
+    track_device(db, previous, (device.status, device.os_type))
     db.commit()
     db.refresh(device)
+    # The row was just written directly; stale buffered check-ins must not overwrite it.
+    checkin_buffer.discard(device.id)
+    checkin_buffer.remember(device.id, device.os_version)
+    device_liveness_cache.invalidate(device.id)
 
-    return AgentRegisterResponse(device_id=device.id, poll_interval_seconds=30)
+    settings = get_settings()
+    return AgentRegisterResponse(
+        device_id=device.id,
+        poll_interval_seconds=settings.agent_poll_interval_seconds,
+        long_poll_max_seconds=settings.agent_long_poll_max_seconds,
+    )
 
 
 @router.get("/heartbeat", summary="Agent heartbeat debug")
@@ -70,68 +136,233 @@ async def heartbeat_debug():
     return {"message": "agent heartbeat endpoint is alive"}
 
 
-@router.post("/heartbeat", response_model=AgentHeartbeatResponse)
-def heartbeat(payload: AgentHeartbeatRequest, db: Session = Depends(get_db)):
-    device = db.query(Device).filter(Device.id == payload.device_id).first()
-    if not device:
+def _claim_pending_actions(device_id: int, db: Session) -> list[AgentActionPayload]:
+    claimed = claim_pending_actions(
+        db, device_id, get_settings().agent_max_actions_per_heartbeat
+    )
+    blobs = load_payloads(db, {row.payload_digest for row in claimed if row.payload_digest})
+    return [
+        AgentActionPayload(
+            id=row.id,
+            type=row.type,
+            payload=join_payload(blobs.get(row.payload_digest), row.payload)
+            if row.payload_digest
+            else row.payload,
+            software_id=row.software_id,
+        )
+        for row in claimed
+    ]
+
+
+def _publish_claimed(device_id: int, actions: list[AgentActionPayload]) -> None:
+    for action in actions:
+        event_broadcaster.publish(
+            EVENT_ACTION_STATUS, device_id, action_id=action.id, status=ACTION_STATUS_RUNNING
+        )
+
+
+def _process_heartbeat(payload: AgentHeartbeatRequest, db: Session) -> AgentHeartbeatResponse:
+    liveness = _lookup_device_liveness(payload.device_id, db)
+    if liveness is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
 
-    if device.is_deleted:
+    if liveness.is_deleted:
         raise HTTPException(
             status_code=status.HTTP_410_GONE, detail="Device deleted"
         )
 
-    device.status = payload.status or device.status
-    if payload.os_version:
-        device.os_version = payload.os_version
+    # Inventory is only written when its hash changes; a bare hash that does not
+    # match the stored one asks the agent for the full body on its next heartbeat.
+    hardware_summary = None
+    new_hash = None
+    hardware_summary_required = False
     if payload.hardware_summary:
-        device.hardware_summary = payload.hardware_summary
-    device.last_check_in = datetime.utcnow()
+        new_hash = inventory_hash(payload.hardware_summary)
+        if new_hash != liveness.hardware_hash:
+            hardware_summary = payload.hardware_summary
+            device_liveness_cache.set(payload.device_id, liveness._replace(hardware_hash=new_hash))
+    elif payload.hardware_hash:
+        hardware_summary_required = payload.hardware_hash != liveness.hardware_hash
 
-    pending_actions = (
-        db.query(Action)
-        .filter(Action.device_id == device.id, Action.status == ACTION_STATUS_PENDING)
-        .all()
+    checkin_buffer.record(
+        payload.device_id,
+        checked_in_at=datetime.utcnow(),
+        status=payload.status,
+        os_version=payload.os_version,
+        hardware_summary=hardware_summary,
+        hardware_hash=new_hash,
     )
 
-    action_payloads = []
-    for action in pending_actions:
-        action.status = ACTION_STATUS_RUNNING
-        action_payloads.append(
-            AgentActionPayload(
-                id=action.id,
-                type=action.type,
-                payload=action.payload,
-                software_id=action.software_id,
-            )
-        )
+    action_payloads = _claim_pending_actions(payload.device_id, db)
 
-    db.commit()
+    if get_settings().checkin_flush_interval_seconds <= 0:
+        checkin_buffer.flush(db)
+    else:
+        db.commit()
+    _publish_claimed(payload.device_id, action_payloads)
+
+    return AgentHeartbeatResponse(
+        actions=action_payloads, hardware_summary_required=hardware_summary_required
+    )
 
+
+def _dispatch_after_wake(device_id: int, db: Session) -> AgentHeartbeatResponse:
+    action_payloads = _claim_pending_actions(device_id, db)
+    db.commit()
+    _publish_claimed(device_id, action_payloads)
     return AgentHeartbeatResponse(actions=action_payloads)
 
 
+@router.post("/heartbeat", response_model=AgentHeartbeatResponse)
+async def heartbeat(payload: AgentHeartbeatRequest, db: Session = Depends(get_db)):
+    settings = get_settings()
+    wait_seconds = min(payload.wait_seconds or 0, settings.agent_long_poll_max_seconds)
+    if wait_seconds <= 0:
+        return await run_in_threadpool(_process_heartbeat, payload, db)
+
+    # Long-poll: the check-in commit releases the DB connection, then the request
+    # parks on the event loop until an action is queued or the wait times out.
+    waiter = action_hub.subscribe(payload.device_id)
+    try:
+        response = await run_in_threadpool(_process_heartbeat, payload, db)
+        if response.actions:
+            return response
+        if not await waiter.wait(wait_seconds):
+            return response
+        return await run_in_threadpool(_dispatch_after_wake, payload.device_id, db)
+    finally:
+        action_hub.unsubscribe(waiter)
+
+
+_RESULT_STATUSES = {ACTION_STATUS_SUCCEEDED, ACTION_STATUS_FAILED}
+
+
+_NOT_RUNNING = "Action is not running"
+
+
+def _apply_action_result(db: Session, action: Action, payload: AgentActionResultRequest) -> Optional[dict]:
+    """Record a result if ``action`` is still running; returns the ``action.status`` event fields.
+
+    The update re-checks ``status='running'``, so a late result never
+    overwrites an action the reaper re-queued or a cancel/delete finished.
+    """
+    if action.status != ACTION_STATUS_RUNNING:
+        return None
+    values = {
+        "status": payload.status,
+        "completed_at": payload.completed_at or datetime.utcnow(),
+        "lease_expires_at": None,
+    }
+    if payload.logs is not None:
+        values["logs"] = payload.logs
+    if payload.exit_code is not None:
+        values["exit_code"] = payload.exit_code
+        exit_note = f"exit_code={payload.exit_code}"
+        values["payload"] = f"{action.payload}\n{exit_note}" if action.payload else exit_note
+
+    matched = db.execute(
+        update(Action)
+        .where(Action.id == action.id, Action.status == ACTION_STATUS_RUNNING)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not matched:
+        return None
+    return dict(action_id=action.id, status=payload.status, exit_code=payload.exit_code)
+
+
 @router.post("/actions/{action_id}/result")
 def action_result(action_id: int, payload: AgentActionResultRequest, db: Session = Depends(get_db)):
     action = db.query(Action).filter(Action.id == action_id).first()
     if not action:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Action not found")
 
-    if payload.status not in {ACTION_STATUS_SUCCEEDED, ACTION_STATUS_FAILED}:
+    if payload.status not in _RESULT_STATUSES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
 
-    action.status = payload.status
-    if payload.logs is not None:
-        action.logs = payload.logs
-    action.completed_at = payload.completed_at or datetime.utcnow()
-
-    if payload.exit_code is not None:
-        exit_note = f"exit_code={payload.exit_code}"
-        if action.payload:
-            action.payload = f"{action.payload}\n{exit_note}"
-        else:
-            action.payload = exit_note
+    event = _apply_action_result(db, action, payload)
+    if event is None:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=_NOT_RUNNING)
+    track_actions(db, ACTION_STATUS_RUNNING, payload.status)
+    device_id = action.device_id
+    bump_device_actions(db, [device_id])
 
     db.commit()
+    event_broadcaster.publish(EVENT_ACTION_STATUS, device_id, **event)
 
     return {"status": "ok"}
+
+
+@router.post("/actions/{action_id}/logs", response_model=AgentLogChunkResponse)
+def append_action_logs(action_id: int, payload: AgentLogChunkRequest, db: Session = Depends(get_db)):
+    action = db.query(Action).filter(Action.id == action_id).first()
+    if not action:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Action not found")
+
+    if len(payload.content.encode("utf-8")) > get_settings().action_log_max_chunk_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Log chunk too large"
+        )
+
+    try:
+        size = append_log_chunk(db, action, payload.offset, payload.content)
+    except LogOffsetConflict as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": exc.message, "expected_offset": exc.expected_offset},
+        )
+    # Streaming output proves the agent is still working on the action.
+    extend_lease(db, action.id)
+    bump_device_actions(db, [action.device_id])
+    db.commit()
+
+    return AgentLogChunkResponse(action_id=action_id, size=size)
+
+
+@router.post("/actions/results", response_model=AgentActionResultBatchResponse)
+def action_results_batch(body: AgentActionResultBatchRequest, db: Session = Depends(get_db)):
+    valid = [item for item in body.results if item.status in _RESULT_STATUSES]
+    action_ids = {item.action_id for item in valid}
+    actions = (
+        {action.id: action for action in db.query(Action).filter(Action.id.in_(action_ids))}
+        if action_ids
+        else {}
+    )
+
+    outcomes = []
+    events = []
+    deltas = CounterDeltas()
+    device_ids = set()
+    finished = set()
+    for item in body.results:
+        if item.status not in _RESULT_STATUSES:
+            outcomes.append(
+                AgentActionResultOutcome(action_id=item.action_id, status="error", detail="Invalid status")
+            )
+            continue
+        action = actions.get(item.action_id)
+        if action is None:
+            outcomes.append(
+                AgentActionResultOutcome(action_id=item.action_id, status="error", detail="Action not found")
+            )
+            continue
+        event = None if action.id in finished else _apply_action_result(db, action, item)
+        if event is None:
+            outcomes.append(
+                AgentActionResultOutcome(action_id=item.action_id, status="error", detail=_NOT_RUNNING)
+            )
+            continue
+        finished.add(action.id)
+        deltas.update(action_deltas(ACTION_STATUS_RUNNING, item.status))
+        events.append((action.device_id, event))
+        device_ids.add(action.device_id)
+        outcomes.append(AgentActionResultOutcome(action_id=item.action_id, status="ok"))
+
+    bump_counters(db, deltas)
+    bump_device_actions(db, device_ids)
+    db.commit()
+    for device_id, event in events:
+        event_broadcaster.publish(EVENT_ACTION_STATUS, device_id, **event)
+
+    return AgentActionResultBatchResponse(results=outcomes)
@@ -0,0 +1,59 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models.apply_job import APPLY_JOB_STATUS_FAILED, APPLY_JOB_STATUS_QUEUED, ApplyJob
+from app.models.rollout import ROLLOUT_STATUS_FAILED, ROLLOUT_STATUS_PENDING, Rollout
+from app.schemas.apply_job import ApplyJobRead
+from app.services.apply_jobs import submit_apply_job
+
+router = APIRouter(prefix="/apply-jobs", tags=["apply-jobs"])
+
+
+@router.get("", response_model=List[ApplyJobRead])
+def list_apply_jobs(
+    profile_id: Optional[int] = Query(None, description="Filter by profile"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    query = db.query(ApplyJob)
+    if profile_id is not None:
+        query = query.filter(ApplyJob.profile_id == profile_id)
+    return query.order_by(ApplyJob.id.desc()).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=ApplyJobRead)
+def get_apply_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(ApplyJob).filter(ApplyJob.id == job_id).first()
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Apply job not found")
+    return job
+
+
+@router.post("/{job_id}/retry", response_model=ApplyJobRead, status_code=status.HTTP_202_ACCEPTED)
+def retry_apply_job(job_id: int, db: Session = Depends(get_db)):
+    """Re-queue a failed job; it continues from its cursor, after the last committed chunk."""
+    job = db.query(ApplyJob).filter(ApplyJob.id == job_id).first()
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Apply job not found")
+    if job.status != APPLY_JOB_STATUS_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Only failed apply jobs can be retried"
+        )
+
+    job.status = APPLY_JOB_STATUS_QUEUED
+    job.completed_at = None
+    job.error_count = 0
+    rollout = db.query(Rollout).filter(Rollout.apply_job_id == job.id).first()
+    if rollout is not None and rollout.status == ROLLOUT_STATUS_FAILED:
+        # The rollout failed with its job; it waits for the job again.
+        rollout.status = ROLLOUT_STATUS_PENDING
+        rollout.last_error = None
+        rollout.completed_at = None
+    db.commit()
+    db.refresh(job)
+
+    submit_apply_job(job.id)
+    return job
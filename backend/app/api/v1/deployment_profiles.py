@@ -1,30 +1,40 @@
-from typing import List
+from typing import List, Optional
 
-import json
-
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_response
 from app.core.constants import ALLOWED_OS_TYPES
+from app.core.pagination import Page, PageParams, page_params, paginate
 from app.db import get_db
-from app.models.action import ACTION_STATUS_PENDING, Action
+from app.models.apply_job import APPLY_JOB_STATUS_QUEUED, ApplyJob
 from app.models.deployment_profile import DeploymentProfile
-from app.models.device import Device
 from app.models.profile_task import ProfileTask
+from app.models.rollout import Rollout
 from app.models.script import Script
 from app.models.software_package import SoftwarePackage
+from app.schemas.apply_job import (
+    ApplyJobRead,
+    ApplyPreviewGroup,
+    ApplyPreviewRead,
+    ApplyProfileRequest,
+    ApplySelector,
+)
 from app.schemas.deployment_profile import (
     DeploymentProfileCreate,
     DeploymentProfileRead,
     DeploymentProfileUpdate,
     DeploymentProfileWithTasks,
+    ProfilePlanRead,
     ProfileTaskCreate,
     ProfileTaskRead,
     ProfileTaskUpdate,
     ProfileTaskUpsert,
     ProfileTasksBulkUpdate,
 )
+from app.services.apply_jobs import selected_os_type_counts, submit_apply_job
+from app.services.profile_plans import get_profile_plan
+from app.services.resource_versions import VERSION_PROFILES, collection_etag
 
 router = APIRouter(prefix="/profiles", tags=["profiles"])
 
@@ -57,10 +67,17 @@ def _validate_software_reference(action_type: str, software_id: int, db: Session
     return software
 
 
-@router.get("", response_model=List[DeploymentProfileRead])
-def list_profiles(db: Session = Depends(get_db)):
-    profiles = db.query(DeploymentProfile).order_by(DeploymentProfile.name.asc()).all()
-    return profiles
+@router.get("", response_model=Page[DeploymentProfileRead])
+def list_profiles(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+):
+    cached = conditional_response(request, response, collection_etag(db, VERSION_PROFILES))
+    if cached is not None:
+        return cached
+    return paginate(db.query(DeploymentProfile), (DeploymentProfile.name, DeploymentProfile.id), page)
 
 
 @router.post("", response_model=DeploymentProfileRead, status_code=status.HTTP_201_CREATED)
@@ -285,104 +302,75 @@ def delete_profile_task(profile_id: int, task_id: int, db: Session = Depends(get
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-class ApplyProfileRequest(BaseModel):
-    device_ids: List[int]
+def _resolve_selector(body: ApplyProfileRequest) -> ApplySelector:
+    selector = body.selector or ApplySelector(device_ids=body.device_ids)
+    if body.selector is not None and body.device_ids:
+        selector = selector.model_copy(update={"device_ids": body.device_ids})
+    if selector.is_empty():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No device IDs provided")
+    return selector
 
 
-@router.post("/{profile_id}/apply", status_code=status.HTTP_202_ACCEPTED)
-def apply_profile_to_devices(profile_id: int, body: ApplyProfileRequest, db: Session = Depends(get_db)):
-    profile = db.query(DeploymentProfile).filter(DeploymentProfile.id == profile_id).first()
-    if profile is None:
+@router.get("/{profile_id}/plan", response_model=ProfilePlanRead)
+def get_profile_plan_for_os(profile_id: int, os_type: Optional[str] = None):
+    """Compiled plan: the actions a device of ``os_type`` receives when the profile is applied."""
+    plan = get_profile_plan(profile_id, os_type)
+    if plan is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return plan
 
-    if not body.device_ids:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No device IDs provided")
 
-    tasks = (
-        db.query(ProfileTask)
-        .filter(ProfileTask.profile_id == profile_id)
-        .order_by(ProfileTask.order_index.asc(), ProfileTask.id.asc())
-        .all()
+@router.post("/{profile_id}/apply/preview", response_model=ApplyPreviewRead)
+def preview_profile_apply(profile_id: int, body: ApplyProfileRequest, db: Session = Depends(get_db)):
+    """Dry run of apply: matched devices and actions per ``os_type``, without creating anything."""
+    selector = _resolve_selector(body)
+    if get_profile_plan(profile_id, None) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    counts = selected_os_type_counts(db, selector)
+    groups = []
+    for os_type, devices in sorted(counts.items(), key=lambda item: item[0] or ""):
+        plan = get_profile_plan(profile_id, os_type)
+        groups.append(
+            ApplyPreviewGroup(
+                os_type=os_type,
+                devices=devices,
+                actions_per_device=len(plan.actions) if plan is not None else 0,
+            )
+        )
+    return ApplyPreviewRead(
+        profile_id=profile_id,
+        total_devices=sum(group.devices for group in groups),
+        total_actions=sum(group.devices * group.actions_per_device for group in groups),
+        groups=groups,
     )
 
-    if not tasks:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Profile has no tasks")
 
-    created_actions: list[Action] = []
-
-    for device_id in body.device_ids:
-        device = db.query(Device).filter(Device.id == device_id).first()
-        if device is None or device.is_deleted:
-            continue
-
-        if profile.target_os_type and device.os_type and profile.target_os_type != device.os_type:
-            continue
-
-        for task in tasks:
-            payload: str | None = None
-            script_id: int | None = task.script_id
-            software_id: int | None = task.software_id
-
-            if task.action_type == "install_software":
-                if task.software_id is None:
-                    continue
-                software = (
-                    db.query(SoftwarePackage).filter(SoftwarePackage.id == task.software_id).first()
-                )
-                if software is None:
-                    continue
-
-                if software.target_os_type and device.os_type and software.target_os_type != device.os_type:
-                    continue
-
-                payload = json.dumps(
-                    {
-                        "software_id": software.id,
-                        "name": software.name,
-                        "installer_type": software.installer_type,
-                        "source_type": software.source_type,
-                        "source": software.source,
-                        "install_args": software.install_args,
-                        "uninstall_args": software.uninstall_args,
-                        "target_os": software.target_os_type,
-                        "version": software.version,
-                    }
-                )
-
-            if task.script_id is not None:
-                script = db.query(Script).filter(Script.id == task.script_id).first()
-                if script is None:
-                    continue
-
-                if task.action_type in ("powershell_script", "powershell_inline") and script.language != "powershell":
-                    continue
-
-                if script.target_os_type and device.os_type and script.target_os_type != device.os_type:
-                    continue
-
-                payload = script.content
-
-            if task.action_type in {"powershell_inline", "bash_inline"} and payload is None:
-                # Skip tasks that require a script payload when none is available
-                continue
-
-            if task.action_type == "install_software" and payload is None:
-                continue
-
-            action = Action(
-                device_id=device.id,
-                type=task.action_type,
-                payload=payload,
-                script_id=script_id,
-                software_id=software_id,
-                status=ACTION_STATUS_PENDING,
-            )
-            db.add(action)
-            created_actions.append(action)
+@router.post("/{profile_id}/apply", response_model=ApplyJobRead, status_code=status.HTTP_202_ACCEPTED)
+def apply_profile_to_devices(profile_id: int, body: ApplyProfileRequest, db: Session = Depends(get_db)):
+    profile = db.query(DeploymentProfile).filter(DeploymentProfile.id == profile_id).first()
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
 
+    selector = _resolve_selector(body)
+    plan = get_profile_plan(profile_id, None)
+    if plan is None or not plan.task_count:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Profile has no tasks")
+
+    job = ApplyJob(
+        profile_id=profile.id,
+        status=APPLY_JOB_STATUS_QUEUED,
+        selector=selector.model_dump_json(exclude_none=True),
+    )
+    db.add(job)
+    if body.rollout is not None:
+        db.flush()
+        db.add(Rollout(profile_id=profile.id, apply_job_id=job.id, **body.rollout.model_dump()))
     db.commit()
+    db.refresh(job)
 
-    return {"created_actions": len(created_actions)}
+    submit_apply_job(job.id)
+    return job
 
 
 @router.delete("/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,18 +1,61 @@
-from typing import List
-
-import json
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session, load_only
+
+from app.core.conditional import (
+    CACHE_FINISHED,
+    CACHE_NO_STORE,
+    conditional_response,
+    weak_etag,
+)
+from app.core.config import get_settings
+from app.core.events import EVENT_ACTION_CREATED, event_broadcaster
+from app.core.fast_json import fast_page, schema_columns
+from app.core.notifications import action_hub
+from app.core.pagination import Page, PageParams, page_params, paginate
 from app.db import get_db
-from app.models.action import ACTION_STATUS_PENDING, Action
+from app.models.action import (
+    ACTION_STATUS_CANCELLED,
+    ACTION_STATUS_FAILED,
+    ACTION_STATUS_PENDING,
+    ACTION_STATUS_SUCCEEDED,
+    Action,
+    join_payload,
+)
 from app.models.device import Device
 from app.models.script import Script
 from app.models.software_package import SoftwarePackage
-from app.schemas.action import ActionCreate, ActionRead
+from app.schemas.action import (
+    ActionCreate,
+    ActionListItem,
+    ActionLogRead,
+    ActionPayloadRead,
+    ActionRead,
+)
+from app.services.action_logs import log_size, read_log_range
+from app.services.fleet_counters import track_actions
+from app.services.payload_store import load_payloads, store_payload
+from app.services.profile_apply import software_payload
+from app.services.resource_versions import bump_device_actions, device_actions_version
 
 router = APIRouter(prefix="/devices", tags=["device-actions"])
 
+_FINISHED_STATUSES = {ACTION_STATUS_SUCCEEDED, ACTION_STATUS_FAILED, ACTION_STATUS_CANCELLED}
+
+# Everything ActionListItem shows; payload and logs stay unloaded in listings.
+_LIST_COLUMNS = schema_columns(Action, ActionListItem)
+
+
+def _get_action(device_id: int, action_id: int, db: Session, *columns) -> Action:
+    query = db.query(Action)
+    if columns:
+        query = query.options(load_only(*columns))
+    action = query.filter(Action.id == action_id, Action.device_id == device_id).first()
+    if action is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Action not found")
+    return action
+
 
 @router.post("/{device_id}/actions", response_model=ActionRead, status_code=status.HTTP_201_CREATED)
 def create_action_for_device(device_id: int, body: ActionCreate, db: Session = Depends(get_db)):
@@ -46,18 +89,7 @@ def create_action_for_device(device_id: int, body: ActionCreate, db: Session = D
                 detail="Software target_os_type is not compatible with device os_type",
             )
 
-        payload_dict = {
-            "software_id": software.id,
-            "name": software.name,
-            "installer_type": software.installer_type,
-            "source_type": software.source_type,
-            "source": software.source,
-            "install_args": software.install_args,
-            "uninstall_args": software.uninstall_args,
-            "target_os": software.target_os_type,
-            "version": software.version,
-        }
-        payload = json.dumps(payload_dict)
+        payload = software_payload(software)
 
     if body.script_id is not None:
         script = db.query(Script).filter(Script.id == body.script_id).first()
@@ -86,34 +118,95 @@ def create_action_for_device(device_id: int, body: ActionCreate, db: Session = D
             detail="Either payload or script_id must be provided",
         )
 
+    payload_digest = store_payload(db, payload)
     action = Action(
         device_id=device.id,
         type=body.type,
-        payload=payload,
+        payload=None if payload_digest else payload,
+        payload_digest=payload_digest,
         script_id=body.script_id,
         software_id=software_id,
         status=ACTION_STATUS_PENDING,
     )
     db.add(action)
+    track_actions(db, None, ACTION_STATUS_PENDING)
+    bump_device_actions(db, [device.id])
     db.commit()
     db.refresh(action)
+    action_hub.notify(device.id)
+    event_broadcaster.publish(
+        EVENT_ACTION_CREATED, device.id, action_id=action.id, type=action.type, status=action.status
+    )
     return action
 
 
-@router.get("/{device_id}/actions", response_model=List[ActionRead])
-def list_actions_for_device(device_id: int, db: Session = Depends(get_db)):
-    device = (
-        db.query(Device)
-        .filter(Device.id == device_id, Device.is_deleted.is_(False))
-        .first()
-    )
-    if device is None:
+@router.get("/{device_id}/actions", response_model=Page[ActionListItem])
+def list_actions_for_device(
+    device_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+):
+    version = device_actions_version(db, device_id)
+    if version is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
+    cached = conditional_response(request, response, weak_etag("device", device_id, "actions", version))
+    if cached is not None:
+        return cached
 
-    actions = (
-        db.query(Action)
-        .filter(Action.device_id == device.id)
-        .order_by(Action.created_at.desc())
-        .all()
+    # Newest first; ids grow with created_at and make the ordering unique.
+    query = db.query(*_LIST_COLUMNS).filter(Action.device_id == device_id)
+    return fast_page(paginate(query, (Action.id,), page, descending=True), response)
+
+
+@router.get("/{device_id}/actions/{action_id}/payload", response_model=ActionPayloadRead)
+def get_action_payload(
+    device_id: int, action_id: int, response: Response, db: Session = Depends(get_db)
+):
+    action = _get_action(
+        device_id, action_id, db, Action.id, Action.status, Action.payload, Action.payload_digest
+    )
+    # The result appends an exit-code note, so only finished payloads are stable.
+    response.headers["Cache-Control"] = (
+        CACHE_FINISHED if action.status in _FINISHED_STATUSES else CACHE_NO_STORE
+    )
+    payload = action.payload
+    if action.payload_digest:
+        blobs = load_payloads(db, {action.payload_digest})
+        payload = join_payload(blobs.get(action.payload_digest), action.payload)
+    return ActionPayloadRead(action_id=action.id, payload=payload)
+
+
+@router.get("/{device_id}/actions/{action_id}/logs", response_model=ActionLogRead)
+def get_action_logs(
+    device_id: int,
+    action_id: int,
+    response: Response,
+    offset: int = Query(0, ge=0, description="Byte offset to read from"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum bytes to return"),
+    tail: Optional[int] = Query(None, ge=1, description="Return the last N bytes instead"),
+    db: Session = Depends(get_db),
+):
+    # ``logs`` is deferred: only actions that never streamed chunks read it.
+    action = _get_action(device_id, action_id, db, Action.id, Action.status, Action.log_size)
+
+    max_read = get_settings().action_log_max_read_bytes
+    limit = min(limit or max_read, max_read)
+    size = log_size(action)
+    if tail is not None:
+        tail = min(tail, max_read)
+        offset = max(size - tail, 0)
+        limit = tail
+
+    start, end, content = read_log_range(db, action, offset, limit)
+    complete = action.status in _FINISHED_STATUSES
+    response.headers["Cache-Control"] = CACHE_FINISHED if complete else CACHE_NO_STORE
+    return ActionLogRead(
+        action_id=action.id,
+        offset=start,
+        next_offset=end,
+        size=size,
+        content=content,
+        complete=complete,
     )
-    return actions
@@ -0,0 +1,179 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models.device import Device
+from app.models.device_group import (
+    DEVICE_GROUP_KIND_DYNAMIC,
+    DEVICE_GROUP_KIND_STATIC,
+    DeviceGroup,
+    DeviceGroupMember,
+)
+from app.schemas.device_group import (
+    DeviceGroupCreate,
+    DeviceGroupMembersUpdate,
+    DeviceGroupRead,
+    DeviceGroupUpdate,
+)
+from app.services.device_groups import add_members, rebuild_group_membership, remove_members
+
+router = APIRouter(prefix="/device-groups", tags=["device-groups"])
+
+
+def _get_group(group_id: int, db: Session) -> DeviceGroup:
+    group = db.query(DeviceGroup).filter(DeviceGroup.id == group_id).first()
+    if group is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device group not found")
+    return group
+
+
+def _member_counts(db: Session, group_ids: List[int]) -> dict[int, int]:
+    if not group_ids:
+        return {}
+    rows = db.execute(
+        select(DeviceGroupMember.group_id, func.count())
+        .join(Device, Device.id == DeviceGroupMember.device_id)
+        .where(DeviceGroupMember.group_id.in_(group_ids), Device.is_deleted.is_(False))
+        .group_by(DeviceGroupMember.group_id)
+    ).all()
+    return {group_id: count for group_id, count in rows}
+
+
+def _to_read(group: DeviceGroup, member_count: int) -> DeviceGroupRead:
+    read = DeviceGroupRead.model_validate(group)
+    read.member_count = member_count
+    return read
+
+
+def _read_one(group: DeviceGroup, db: Session) -> DeviceGroupRead:
+    return _to_read(group, _member_counts(db, [group.id]).get(group.id, 0))
+
+
+def _ensure_unique_name(name: str, db: Session, exclude_id: int | None = None) -> None:
+    query = db.query(DeviceGroup.id).filter(DeviceGroup.name == name)
+    if exclude_id is not None:
+        query = query.filter(DeviceGroup.id != exclude_id)
+    if query.first() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Device group with this name already exists"
+        )
+
+
+@router.get("", response_model=List[DeviceGroupRead])
+def list_device_groups(db: Session = Depends(get_db)):
+    groups = db.query(DeviceGroup).order_by(DeviceGroup.name.asc()).all()
+    counts = _member_counts(db, [group.id for group in groups])
+    return [_to_read(group, counts.get(group.id, 0)) for group in groups]
+
+
+@router.post("", response_model=DeviceGroupRead, status_code=status.HTTP_201_CREATED)
+def create_device_group(body: DeviceGroupCreate, db: Session = Depends(get_db)):
+    _ensure_unique_name(body.name, db)
+    if body.kind == DEVICE_GROUP_KIND_DYNAMIC and (body.rules is None or body.rules.is_empty()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Dynamic groups need at least one rule"
+        )
+    if body.kind == DEVICE_GROUP_KIND_STATIC and body.rules is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Static groups do not take rules"
+        )
+
+    group = DeviceGroup(
+        name=body.name,
+        description=body.description,
+        kind=body.kind,
+        rules=body.rules.model_dump_json(exclude_none=True) if body.rules is not None else None,
+    )
+    db.add(group)
+    db.flush()
+    if group.kind == DEVICE_GROUP_KIND_DYNAMIC:
+        rebuild_group_membership(db, group)
+    db.commit()
+    db.refresh(group)
+    return _read_one(group, db)
+
+
+@router.get("/{group_id}", response_model=DeviceGroupRead)
+def get_device_group(group_id: int, db: Session = Depends(get_db)):
+    return _read_one(_get_group(group_id, db), db)
+
+
+@router.put("/{group_id}", response_model=DeviceGroupRead)
+def update_device_group(group_id: int, body: DeviceGroupUpdate, db: Session = Depends(get_db)):
+    group = _get_group(group_id, db)
+    update_data = body.model_dump(exclude_unset=True)
+
+    if update_data.get("name") is not None:
+        _ensure_unique_name(update_data["name"], db, exclude_id=group.id)
+        group.name = update_data["name"]
+    if "description" in update_data:
+        group.description = update_data["description"]
+    if "rules" in update_data:
+        if group.kind != DEVICE_GROUP_KIND_DYNAMIC:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Static groups do not take rules"
+            )
+        if body.rules is None or body.rules.is_empty():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Dynamic groups need at least one rule"
+            )
+        group.rules = body.rules.model_dump_json(exclude_none=True)
+        db.flush()
+        rebuild_group_membership(db, group)
+
+    db.commit()
+    db.refresh(group)
+    return _read_one(group, db)
+
+
+@router.delete("/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_device_group(group_id: int, db: Session = Depends(get_db)):
+    group = _get_group(group_id, db)
+    db.query(DeviceGroupMember).filter(DeviceGroupMember.group_id == group.id).delete(
+        synchronize_session=False
+    )
+    db.delete(group)
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/{group_id}/members", response_model=DeviceGroupRead)
+def add_device_group_members(
+    group_id: int, body: DeviceGroupMembersUpdate, db: Session = Depends(get_db)
+):
+    group = _get_group(group_id, db)
+    if group.kind != DEVICE_GROUP_KIND_STATIC:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Dynamic group membership follows its rules"
+        )
+    requested = set(body.device_ids)
+    existing = set(
+        db.execute(
+            select(Device.id).where(Device.id.in_(requested), Device.is_deleted.is_(False))
+        ).scalars()
+    )
+    missing = requested - existing
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Devices not found: {', '.join(str(device_id) for device_id in sorted(missing))}",
+        )
+    add_members(db, group.id, existing)
+    db.commit()
+    return _read_one(group, db)
+
+
+@router.delete("/{group_id}/members/{device_id}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_device_group_member(group_id: int, device_id: int, db: Session = Depends(get_db)):
+    group = _get_group(group_id, db)
+    if group.kind != DEVICE_GROUP_KIND_STATIC:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Dynamic group membership follows its rules"
+        )
+    if not remove_members(db, group.id, [device_id]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device is not in this group")
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,24 +1,148 @@
-from typing import List
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.cache import device_liveness_cache
+from app.core.checkin_buffer import checkin_buffer
+from app.core.conditional import conditional_response, weak_etag
+from app.core.events import (
+    EVENT_ACTION_CREATED,
+    EVENT_DEVICE_DELETED,
+    EVENT_DEVICE_STATUS,
+    event_broadcaster,
+)
+from app.core.fast_json import fast_page, rows_as_dicts, schema_columns
+from app.core.notifications import action_hub
+from app.core.pagination import Page, PageParams, page_params, paginate
 from app.db import get_db
-from app.models.action import Action
+from app.models.action import ACTION_STATUS_CANCELLED, ACTION_STATUS_HELD, ACTION_STATUS_PENDING, Action
 from app.models.device import Device
-from app.models.action import ACTION_STATUS_PENDING
 from app.schemas.device import DeviceRead, DeviceUpdate
+from app.services.device_groups import group_member_ids, refresh_device_memberships
+from app.services.device_search import device_filter_conditions, search_condition
+from app.services.fleet_counters import track_actions, track_device
+from app.services.inventory import inventory_hash
+from app.services.resource_versions import (
+    VERSION_DEVICE_GROUPS,
+    VERSION_DEVICES,
+    bump_device_actions,
+    collection_etag,
+    device_version,
+)
 
 router = APIRouter(prefix="/devices", tags=["devices"])
 
+_LIST_COLUMNS = schema_columns(Device, DeviceRead)
 
-@router.get("/", response_model=List[DeviceRead])
-def list_devices(db: Session = Depends(get_db)):
-    return db.query(Device).filter(Device.is_deleted.is_(False)).all()
+
+def _to_read(device: Device) -> DeviceRead:
+    # Check-ins are written behind; overlay any buffered values so reads stay fresh.
+    read = DeviceRead.model_validate(device)
+    pending = {
+        key: value
+        for key, value in checkin_buffer.pending_fields(device.id).items()
+        if key in DeviceRead.model_fields
+    }
+    return read.model_copy(update=pending) if pending else read
+
+
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    # Check-in times are stored as naive UTC.
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@dataclass(frozen=True)
+class DeviceQuery:
+    conditions: list
+    order_by: tuple
+    # Collections whose version makes up the listing's ETag.
+    versions: tuple = (VERSION_DEVICES,)
+
+
+def device_filters(
+    hostname_prefix: Optional[str] = Query(None, description="Hostname starts with"),
+    hostname_contains: Optional[str] = Query(None, description="Hostname contains"),
+    status: Optional[str] = Query(None),
+    os_type: Optional[str] = Query(None),
+    profile_id: Optional[int] = Query(None),
+    group_id: Optional[int] = Query(None, description="Only devices in this device group"),
+    checked_in_after: Optional[datetime] = Query(None, description="last_check_in at or after"),
+    checked_in_before: Optional[datetime] = Query(None, description="last_check_in before"),
+) -> DeviceQuery:
+    conditions = [Device.is_deleted.is_(False)]
+    conditions.extend(
+        device_filter_conditions(
+            hostname_prefix=hostname_prefix,
+            hostname_contains=hostname_contains,
+            status=status,
+            os_type=os_type,
+            profile_id=profile_id,
+            checked_in_after=utc_naive(checked_in_after),
+            checked_in_before=utc_naive(checked_in_before),
+        )
+    )
+    versions = (VERSION_DEVICES,)
+    if group_id is not None:
+        conditions.append(Device.id.in_(group_member_ids(group_id)))
+        versions = (VERSION_DEVICES, VERSION_DEVICE_GROUPS)
+    # Page a check-in window in check-in order so the last_check_in index
+    # serves both the range and the ordering; by id SQLite would scan.
+    if checked_in_after is not None or checked_in_before is not None:
+        return DeviceQuery(conditions, (Device.last_check_in, Device.id), versions)
+    return DeviceQuery(conditions, (Device.id,), versions)
+
+
+def _device_page(
+    request: Request, response: Response, filters: DeviceQuery, page: PageParams, db: Session, *extra
+):
+    etag = collection_etag(db, *filters.versions, buffered=checkin_buffer.generation())
+    cached = conditional_response(request, response, etag)
+    if cached is not None:
+        return cached
+    query = db.query(*_LIST_COLUMNS).filter(*filters.conditions, *extra)
+    result = paginate(query, filters.order_by, page)
+    result["items"] = [checkin_buffer.overlay(item) for item in rows_as_dicts(result["items"])]
+    return fast_page(result, response)
+
+
+@router.get("/", response_model=Page[DeviceRead])
+def list_devices(
+    request: Request,
+    response: Response,
+    filters: DeviceQuery = Depends(device_filters),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+):
+    return _device_page(request, response, filters, page, db)
+
+
+@router.get("/search", response_model=Page[DeviceRead])
+def search_devices(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, description="Substring of hostname or hardware_summary"),
+    filters: DeviceQuery = Depends(device_filters),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+):
+    """Full-text search (SQLite FTS5 trigram index, LIKE elsewhere) combined with the list filters."""
+    return _device_page(request, response, filters, page, db, search_condition(q))
 
 
 @router.get("/{device_id}", response_model=DeviceRead)
-def get_device(device_id: int, db: Session = Depends(get_db)):
+def get_device(device_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    version = device_version(db, device_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Device not found")
+    etag = weak_etag("device", device_id, version, checkin_buffer.generation(device_id))
+    cached = conditional_response(request, response, etag)
+    if cached is not None:
+        return cached
     device = (
         db.query(Device)
         .filter(Device.id == device_id, Device.is_deleted.is_(False))
@@ -26,7 +150,7 @@ def get_device(device_id: int, db: Session = Depends(get_db)):
     )
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
-    return device
+    return _to_read(device)
 
 
 @router.put("/{device_id}", response_model=DeviceRead)
@@ -38,10 +162,23 @@ def update_device(device_id: int, payload: DeviceUpdate, db: Session = Depends(g
     )
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
-    for key, value in payload.dict(exclude_unset=True).items():
+    update_data = payload.dict(exclude_unset=True)
+    previous = (device.status, device.os_type)
+    for key, value in update_data.items():
         setattr(device, key, value)
+    if "hardware_summary" in update_data:
+        device.hardware_hash = inventory_hash(device.hardware_summary)
+    db.flush()
+    refresh_device_memberships(db, [device.id])
+    track_device(db, previous, (device.status, device.os_type))
     db.commit()
     db.refresh(device)
+    checkin_buffer.discard(device.id)
+    device_liveness_cache.invalidate(device.id)
+    if device.status != previous[0]:
+        event_broadcaster.publish(
+            EVENT_DEVICE_STATUS, device.id, status=device.status, os_version=device.os_version
+        )
     return device
 
 
@@ -52,6 +189,21 @@ def delete_device(device_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Device not found")
 
     device.is_deleted = True
+    checkin_buffer.discard(device.id)
+    track_device(db, (device.status, device.os_type), None)
+    # Undelivered rollout actions would otherwise keep their wave open forever.
+    for undelivered in (ACTION_STATUS_HELD, ACTION_STATUS_PENDING):
+        cancelled = db.query(Action).filter(
+            Action.device_id == device.id,
+            Action.rollout_id.isnot(None),
+            Action.status == undelivered,
+        ).update(
+            {Action.status: ACTION_STATUS_CANCELLED, Action.completed_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+        track_actions(db, undelivered, ACTION_STATUS_CANCELLED, cancelled)
+    db.flush()
+    refresh_device_memberships(db, [device.id])
 
     uninstall_action = Action(
         device_id=device.id,
@@ -60,6 +212,18 @@ def delete_device(device_id: int, db: Session = Depends(get_db)):
         status=ACTION_STATUS_PENDING,
     )
     db.add(uninstall_action)
+    track_actions(db, None, ACTION_STATUS_PENDING)
+    bump_device_actions(db, [device.id])
     db.commit()
+    device_liveness_cache.invalidate(device.id)
+    action_hub.notify(device.id)
+    event_broadcaster.publish(EVENT_DEVICE_DELETED, device.id)
+    event_broadcaster.publish(
+        EVENT_ACTION_CREATED,
+        device.id,
+        action_id=uninstall_action.id,
+        type=uninstall_action.type,
+        status=uninstall_action.status,
+    )
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,75 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.conditional import CACHE_NO_STORE
+from app.core.config import get_settings
+from app.core.events import (
+    EVENT_RESYNC,
+    FLEET_CHANNEL,
+    device_channel,
+    event_broadcaster,
+    format_sse,
+)
+from app.db import SessionLocal
+from app.models.device import Device
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Reconnect delay suggested to EventSource clients.
+RETRY_MILLISECONDS = 3000
+
+
+def _device_exists(device_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        return (
+            db.query(Device.id).filter(Device.id == device_id, Device.is_deleted.is_(False)).first()
+            is not None
+        )
+    finally:
+        db.close()
+
+
+async def _stream(request: Request, channel: str):
+    keepalive = get_settings().event_keepalive_seconds
+    subscriber = event_broadcaster.subscribe(channel)
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while not await request.is_disconnected():
+            messages, dropped = await subscriber.next_batch(keepalive)
+            if dropped:
+                # Older events were discarded; the client should refetch rather than patch.
+                yield format_sse(EVENT_RESYNC, {"dropped": dropped})
+            if messages:
+                yield "".join(
+                    format_sse(message["type"], message["data"], message["id"]) for message in messages
+                )
+            elif not dropped:
+                yield ": keepalive\n\n"
+    finally:
+        event_broadcaster.unsubscribe(subscriber)
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    device_id: Optional[int] = Query(None, description="Only this device's events; fleet-wide when omitted"),
+):
+    """Server-sent event stream of device status and action state changes.
+
+    No database session is held while streaming: the device check runs up front
+    and events come from the in-process broadcaster.
+    """
+    channel = FLEET_CHANNEL
+    if device_id is not None:
+        if not await run_in_threadpool(_device_exists, device_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
+        channel = device_channel(device_id)
+    return StreamingResponse(
+        _stream(request, channel),
+        media_type="text/event-stream",
+        headers={"Cache-Control": CACHE_NO_STORE, "X-Accel-Buffering": "no"},
+    )
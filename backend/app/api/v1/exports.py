@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.api.v1.devices import DeviceQuery, device_filters, utc_naive
+from app.core.checkin_buffer import checkin_buffer
+from app.core.conditional import CACHE_NO_STORE
+from app.core.fast_json import schema_columns
+from app.models.action import Action
+from app.models.device import Device
+from app.schemas.action import ActionListItem
+from app.schemas.device import DeviceRead
+from app.services.exports import EXPORT_FORMAT_NDJSON, EXPORT_MEDIA_TYPES, stream_export
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def _export_response(name: str, statement, export_format: str, gzip: bool, transform=None):
+    headers = {
+        "Cache-Control": CACHE_NO_STORE,
+        "Content-Disposition": f'attachment; filename="{name}.{export_format}"',
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_export(statement, export_format, gzip=gzip, transform=transform),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
+
+
+@router.get("/devices")
+def export_devices(
+    export_format: ExportFormat = Query(EXPORT_FORMAT_NDJSON, alias="format"),
+    gzip: bool = Query(False, description="Compress the stream (Content-Encoding: gzip)"),
+    filters: DeviceQuery = Depends(device_filters),
+):
+    """Stream every matching device (DeviceRead fields) as NDJSON or CSV.
+
+    Takes the same filters as the device list, including the check-in window.
+    """
+    statement = (
+        select(*schema_columns(Device, DeviceRead))
+        .where(*filters.conditions)
+        .order_by(*filters.order_by)
+    )
+    return _export_response("devices", statement, export_format, gzip, checkin_buffer.overlay)
+
+
+@router.get("/actions")
+def export_actions(
+    export_format: ExportFormat = Query(EXPORT_FORMAT_NDJSON, alias="format"),
+    gzip: bool = Query(False, description="Compress the stream (Content-Encoding: gzip)"),
+    status: Optional[str] = Query(None),
+    action_type: Optional[str] = Query(None, alias="type"),
+    device_id: Optional[int] = Query(None),
+    os_type: Optional[str] = Query(None, description="Only actions of devices with this os_type"),
+    created_after: Optional[datetime] = Query(None, description="created_at at or after"),
+    created_before: Optional[datetime] = Query(None, description="created_at before"),
+):
+    """Stream action history (ActionListItem fields, no payloads or logs) as NDJSON or CSV."""
+    statement = select(*schema_columns(Action, ActionListItem))
+    if status:
+        statement = statement.where(Action.status == status)
+    if action_type:
+        statement = statement.where(Action.type == action_type)
+    if device_id is not None:
+        statement = statement.where(Action.device_id == device_id)
+    if os_type:
+        statement = statement.where(
+            Action.device_id.in_(select(Device.id).where(Device.os_type == os_type))
+        )
+    if created_after is not None:
+        statement = statement.where(Action.created_at >= utc_naive(created_after))
+    if created_before is not None:
+        statement = statement.where(Action.created_at < utc_naive(created_before))
+    return _export_response("actions", statement.order_by(Action.id.asc()), export_format, gzip)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models.fleet_counter import (
+    COUNTER_SCOPE_ACTION_STATUS,
+    COUNTER_SCOPE_DEVICE_OS_TYPE,
+    COUNTER_SCOPE_DEVICE_STATUS,
+)
+from app.schemas.fleet import ActionCounts, DeviceCounts, FleetSummary
+from app.services.fleet_counters import read_counters
+
+router = APIRouter(prefix="/fleet", tags=["fleet"])
+
+
+@router.get("/summary", response_model=FleetSummary)
+def fleet_summary(db: Session = Depends(get_db)):
+    """Device and action counts read from the maintained counter rows, not the fleet tables."""
+    counters = read_counters(db)
+    by_status = counters[COUNTER_SCOPE_DEVICE_STATUS]
+    actions = counters[COUNTER_SCOPE_ACTION_STATUS]
+    return FleetSummary(
+        devices=DeviceCounts(
+            total=sum(by_status.values()),
+            by_status=by_status,
+            by_os_type=counters[COUNTER_SCOPE_DEVICE_OS_TYPE],
+        ),
+        actions=ActionCounts(total=sum(actions.values()), by_status=actions),
+    )
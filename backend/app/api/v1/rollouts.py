@@ -0,0 +1,101 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models.rollout import (
+    ROLLOUT_STATUS_CANCELLED,
+    ROLLOUT_STATUS_COMPLETED,
+    ROLLOUT_STATUS_FAILED,
+    ROLLOUT_STATUS_PAUSED,
+    ROLLOUT_STATUS_RUNNING,
+    Rollout,
+)
+from app.schemas.rollout import RolloutDetail, RolloutRead
+from app.services.rollouts import (
+    advance_rollout,
+    cancel_rollout,
+    step_rollout,
+    unreachable_count,
+    wave_counts,
+)
+
+router = APIRouter(prefix="/rollouts", tags=["rollouts"])
+
+_FINISHED = {ROLLOUT_STATUS_COMPLETED, ROLLOUT_STATUS_CANCELLED, ROLLOUT_STATUS_FAILED}
+
+
+def _get_rollout(rollout_id: int, db: Session) -> Rollout:
+    rollout = db.query(Rollout).filter(Rollout.id == rollout_id).first()
+    if rollout is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rollout not found")
+    return rollout
+
+
+def _detail(rollout: Rollout, db: Session) -> RolloutDetail:
+    detail = RolloutDetail.model_validate(rollout)
+    detail.current_wave_counts = wave_counts(db, rollout.id, rollout.current_wave)
+    detail.current_wave_unreachable = unreachable_count(db, rollout.id, rollout.current_wave)
+    return detail
+
+
+@router.get("", response_model=List[RolloutRead])
+def list_rollouts(
+    profile_id: Optional[int] = Query(None, description="Filter by profile"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    query = db.query(Rollout)
+    if profile_id is not None:
+        query = query.filter(Rollout.profile_id == profile_id)
+    return query.order_by(Rollout.id.desc()).limit(limit).all()
+
+
+@router.get("/{rollout_id}", response_model=RolloutDetail)
+def get_rollout(rollout_id: int, db: Session = Depends(get_db)):
+    return _detail(_get_rollout(rollout_id, db), db)
+
+
+@router.post("/{rollout_id}/pause", response_model=RolloutDetail)
+def pause_rollout(rollout_id: int, db: Session = Depends(get_db)):
+    rollout = _get_rollout(rollout_id, db)
+    if rollout.status != ROLLOUT_STATUS_RUNNING:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Rollout is not running")
+    # Already released actions still run; no further ones are released.
+    rollout.status = ROLLOUT_STATUS_PAUSED
+    db.commit()
+    return _detail(rollout, db)
+
+
+@router.post("/{rollout_id}/resume", response_model=RolloutDetail)
+def resume_rollout(rollout_id: int, db: Session = Depends(get_db)):
+    rollout = _get_rollout(rollout_id, db)
+    if rollout.status != ROLLOUT_STATUS_PAUSED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Rollout is not paused")
+    rollout.status = ROLLOUT_STATUS_RUNNING
+    rollout.last_error = None
+    db.commit()
+    step_rollout(db, rollout.id)
+    return _detail(_get_rollout(rollout_id, db), db)
+
+
+@router.post("/{rollout_id}/advance", response_model=RolloutDetail)
+def advance_rollout_wave(rollout_id: int, db: Session = Depends(get_db)):
+    """Start the next wave now, overriding the success threshold."""
+    rollout = _get_rollout(rollout_id, db)
+    if rollout.status not in {ROLLOUT_STATUS_RUNNING, ROLLOUT_STATUS_PAUSED}:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Rollout is not active")
+    if rollout.current_wave + 1 >= rollout.total_waves:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Rollout is on its last wave")
+    advance_rollout(db, rollout)
+    return _detail(_get_rollout(rollout_id, db), db)
+
+
+@router.post("/{rollout_id}/cancel", response_model=RolloutDetail)
+def cancel_rollout_actions(rollout_id: int, db: Session = Depends(get_db)):
+    rollout = _get_rollout(rollout_id, db)
+    if rollout.status in _FINISHED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Rollout already finished")
+    cancel_rollout(db, rollout)
+    return _detail(rollout, db)
@@ -1,6 +1,21 @@
 from fastapi import APIRouter
 
-from app.api.v1 import agent, deployment_profiles, device_actions, devices, scripts, software, templates
+from app.api.v1 import (
+    admin,
+    agent,
+    apply_jobs,
+    deployment_profiles,
+    device_actions,
+    device_groups,
+    devices,
+    events,
+    exports,
+    fleet,
+    rollouts,
+    scripts,
+    software,
+    templates,
+)
 
 router = APIRouter()
 
@@ -8,9 +23,16 @@ router.include_router(scripts.router)
 router.include_router(software.router)
 router.include_router(deployment_profiles.router)
 router.include_router(devices.router)
+router.include_router(device_groups.router)
 router.include_router(device_actions.router)
 router.include_router(agent.router)
 router.include_router(templates.router)
+router.include_router(apply_jobs.router)
+router.include_router(rollouts.router)
+router.include_router(fleet.router)
+router.include_router(events.router)
+router.include_router(exports.router)
+router.include_router(admin.router)
 
 
 @router.get("/health")
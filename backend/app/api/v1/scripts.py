@@ -1,15 +1,19 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_response
 from app.core.constants import ALLOWED_OS_TYPES, ALLOWED_SCRIPT_LANGUAGES
+from app.core.fast_json import fast_page, schema_columns
+from app.core.pagination import Page, PageParams, page_params, paginate
 from app.db import get_db
 from app.models.script import Script
 from app.schemas.script import ScriptCreate, ScriptRead, ScriptUpdate
+from app.services.resource_versions import VERSION_SCRIPTS, collection_etag
 
 router = APIRouter(prefix="/scripts", tags=["scripts"])
 
+_LIST_COLUMNS = schema_columns(Script, ScriptRead)
+
 
 def _validate_target_os(target_os_type: str | None) -> None:
     if target_os_type is not None and target_os_type not in ALLOWED_OS_TYPES:
@@ -27,9 +31,17 @@ def _validate_language(language: str | None) -> None:
         )
 
 
-@router.get("/", response_model=List[ScriptRead])
-def list_scripts(db: Session = Depends(get_db)):
-    return db.query(Script).all()
+@router.get("/", response_model=Page[ScriptRead])
+def list_scripts(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+):
+    cached = conditional_response(request, response, collection_etag(db, VERSION_SCRIPTS))
+    if cached is not None:
+        return cached
+    return fast_page(paginate(db.query(*_LIST_COLUMNS), (Script.name, Script.id), page), response)
 
 
 @router.post("/", response_model=ScriptRead, status_code=status.HTTP_201_CREATED)
@@ -1,16 +1,22 @@
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_response
 from app.core.constants import ALLOWED_INSTALLER_TYPES
+from app.core.fast_json import fast_page, schema_columns
+from app.core.pagination import Page, PageParams, page_params, paginate
 from app.db import get_db
 from app.models.profile_task import ProfileTask
 from app.models.software_package import SoftwarePackage
 from app.schemas.software import SoftwareCreate, SoftwareRead, SoftwareUpdate
+from app.services.resource_versions import VERSION_SOFTWARE, collection_etag
 
 router = APIRouter(prefix="/software", tags=["software"])
 
+_LIST_COLUMNS = schema_columns(SoftwarePackage, SoftwareRead)
+
 
 def _validate_payload(payload: SoftwareCreate | SoftwareUpdate) -> None:
     # Simple source requirement for non-catalog installers
@@ -22,15 +28,21 @@ def _validate_payload(payload: SoftwareCreate | SoftwareUpdate) -> None:
             )
 
 
-@router.get("/", response_model=List[SoftwareRead])
+@router.get("/", response_model=Page[SoftwareRead])
 def list_software(
+    request: Request,
+    response: Response,
     target_os: Optional[str] = Query(None, description="Filter by target_os_type"),
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
 ):
-    query = db.query(SoftwarePackage)
+    cached = conditional_response(request, response, collection_etag(db, VERSION_SOFTWARE))
+    if cached is not None:
+        return cached
+    query = db.query(*_LIST_COLUMNS)
     if target_os:
         query = query.filter(SoftwarePackage.target_os_type == target_os)
-    return query.order_by(SoftwarePackage.name.asc()).all()
+    return fast_page(paginate(query, (SoftwarePackage.name, SoftwarePackage.id), page), response)
 
 
 @router.post("/", response_model=SoftwareRead, status_code=status.HTTP_201_CREATED)
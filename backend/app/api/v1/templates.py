@@ -1,10 +1,12 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_response
 from app.core.constants import ALLOWED_OS_TYPES
+from app.core.pagination import Page, PageParams, page_params, paginate
 from app.db import get_db
 from app.models.deployment_profile import DeploymentProfile
 from app.models.profile_task import ProfileTask
@@ -19,6 +21,7 @@ from app.schemas.deployment_profile import (
     ProfileTaskUpdate,
     ProfileTasksBulkUpdate,
 )
+from app.services.resource_versions import VERSION_PROFILES, collection_etag
 
 router = APIRouter(prefix="/templates", tags=["templates"])
 
@@ -51,15 +54,22 @@ def _validate_software_reference(action_type: str, software_id: int, db: Session
     return software
 
 
-@router.get("", response_model=List[DeploymentProfileRead])
-def list_templates(db: Session = Depends(get_db)):
-    templates = (
-        db.query(DeploymentProfile)
-        .filter(DeploymentProfile.is_template.is_(True))
-        .order_by(DeploymentProfile.name.asc())
-        .all()
+@router.get("", response_model=Page[DeploymentProfileRead])
+def list_templates(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+):
+    cached = conditional_response(request, response, collection_etag(db, VERSION_PROFILES))
+    if cached is not None:
+        return cached
+    return paginate(
+        db.query(DeploymentProfile).filter(DeploymentProfile.is_template.is_(True)),
+        (DeploymentProfile.name, DeploymentProfile.id),
+        page,
+        listing="templates",
     )
-    return templates
 
 
 @router.get("/{template_id}", response_model=DeploymentProfileWithTasks)
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import event
+
+from app.core.config import get_settings
+from app.models.enrollment_token import EnrollmentToken
+
+_MISSING = object()
+
+# Every cache registers itself here so admin stats can report on all of them.
+CACHES: list["TTLCache"] = []
+
+
+class TTLCache:
+    """Thread-safe bounded LRU cache whose entries expire after a TTL.
+
+    ``None`` is a valid cached value, which lets callers cache negative lookups.
+    Invalidation is in-process only; other workers converge within the TTL.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        CACHES.append(self)
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_settings = get_settings()
+
+# token_value -> (token_id, expires_at) or None for unknown tokens
+enrollment_token_cache = TTLCache(
+    "enrollment_tokens", _settings.cache_max_entries, _settings.cache_ttl_seconds
+)
+# device_id -> is_deleted flag or None for unknown devices
+device_liveness_cache = TTLCache(
+    "device_liveness", _settings.cache_max_entries, _settings.cache_ttl_seconds
+)
+
+
+@event.listens_for(EnrollmentToken, "after_insert")
+@event.listens_for(EnrollmentToken, "after_update")
+@event.listens_for(EnrollmentToken, "after_delete")
+def _invalidate_enrollment_tokens(mapper, connection, target) -> None:
+    # Token writes are rare; dropping everything also covers renamed token values.
+    enrollment_token_cache.clear()
@@ -0,0 +1,249 @@
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import SessionLocal
+from app.models.device import Device
+
+_devices = Device.__table__
+
+
+class CheckInBuffer:
+    """Coalesces agent check-ins in memory and writes them in bulk.
+
+    Only the latest check-in per device is kept. ``os_version`` is only written
+    when it differs from the last value this process wrote, and callers pass
+    hardware inventory only when its hash changed, so steady-state heartbeats
+    update just ``status`` and ``last_check_in``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[int, dict] = {}
+        self._known_os_version: dict[int, str] = {}
+        # Last status this process wrote per device, with the check-in time it came with.
+        self._known_status: dict[int, tuple[str, datetime]] = {}
+        self._flush_listeners: list[Callable[[Session, list[int]], None]] = []
+        self._status_listeners: list[Callable[[Session, list[tuple]], None]] = []
+        # Bumped on every buffered check-in and flush; part of the ETags of device
+        # reads that ``overlay`` buffered values, with a per-process prefix.
+        self._instance = uuid.uuid4().hex[:8]
+        self._generation = 0
+        self._recorded: dict[int, int] = {}
+
+    def add_flush_listener(self, listener: Callable[[Session, list[int]], None]) -> None:
+        """Call ``listener(db, device_ids)`` after each flush with the devices whose
+        ``status`` or ``os_version`` changed. Listeners commit their own work."""
+        if listener not in self._flush_listeners:
+            self._flush_listeners.append(listener)
+
+    def add_status_listener(self, listener: Callable[[Session, list[tuple]], None]) -> None:
+        """Call ``listener(db, changes)`` inside the flush transaction, before it
+        commits, with ``(device_id, old_status, new_status, os_type)`` for active
+        devices whose stored status this flush changed."""
+        if listener not in self._status_listeners:
+            self._status_listeners.append(listener)
+
+    def record(
+        self,
+        device_id: int,
+        *,
+        checked_in_at: datetime,
+        status: Optional[str] = None,
+        os_version: Optional[str] = None,
+        hardware_summary: Optional[str] = None,
+        hardware_hash: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._generation += 1
+            self._recorded[device_id] = self._generation
+            entry = self._pending.setdefault(device_id, {"id": device_id})
+            entry["last_check_in"] = checked_in_at
+            if status:
+                entry["status"] = status
+            if os_version:
+                if self._known_os_version.get(device_id) == os_version:
+                    entry.pop("os_version", None)
+                else:
+                    entry["os_version"] = os_version
+            if hardware_summary:
+                entry["hardware_summary"] = hardware_summary
+                entry["hardware_hash"] = hardware_hash
+
+    def pending_fields(self, device_id: int) -> dict:
+        with self._lock:
+            entry = self._pending.get(device_id)
+            if entry is None:
+                return {}
+            return {key: value for key, value in entry.items() if key != "id"}
+
+    def overlay(self, row: dict) -> dict:
+        """Apply buffered values to a device row dict, for the keys it already has."""
+        with self._lock:
+            entry = self._pending.get(row["id"])
+            if entry is not None:
+                for key, value in entry.items():
+                    if key in row:
+                        row[key] = value
+        return row
+
+    def generation(self, device_id: Optional[int] = None) -> str:
+        """ETag part for reads that overlay buffered values, of one device or any.
+
+        Empty while nothing is buffered; otherwise it changes with every check-in.
+        """
+        with self._lock:
+            if device_id is None:
+                generation = self._generation if self._pending else 0
+            else:
+                generation = self._recorded.get(device_id, 0)
+        return f"{self._instance}.{generation}" if generation else ""
+
+    def discard(self, device_id: int) -> None:
+        """Drop buffered and remembered state, e.g. when a device row is rewritten directly."""
+        with self._lock:
+            self._pending.pop(device_id, None)
+            self._recorded.pop(device_id, None)
+            self._known_os_version.pop(device_id, None)
+            self._known_status.pop(device_id, None)
+
+    def remember(self, device_id: int, os_version: Optional[str]) -> None:
+        """Record a value already persisted for a device so identical check-ins skip it."""
+        with self._lock:
+            if os_version:
+                self._known_os_version[device_id] = os_version
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, db: Session) -> int:
+        """Write buffered check-ins with one bulk UPDATE per column set and commit."""
+        with self._lock:
+            entries, self._pending = self._pending, {}
+            self._recorded = {}
+            self._generation += 1
+        if not entries:
+            return 0
+
+        groups: dict[tuple, list[dict]] = defaultdict(list)
+        for entry in entries.values():
+            groups[tuple(sorted(entry))].append(entry)
+
+        try:
+            changes = self._status_changes(db, entries)
+            if changes:
+                for status_listener in self._status_listeners:
+                    status_listener(db, changes)
+            for rows in groups.values():
+                db.execute(update(Device), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._requeue(entries)
+            raise
+
+        changed = {change[0] for change in changes}
+        with self._lock:
+            for device_id, entry in entries.items():
+                if "os_version" in entry:
+                    self._known_os_version[device_id] = entry["os_version"]
+                    changed.add(device_id)
+                if "status" in entry:
+                    self._known_status[device_id] = (entry["status"], entry["last_check_in"])
+
+        if changed:
+            for listener in self._flush_listeners:
+                listener(db, sorted(changed))
+        return len(entries)
+
+    def _status_settled(self, device_id: int, entry: dict, window: timedelta) -> bool:
+        """Whether the stored status is known to match the entry's already."""
+        known = self._known_status.get(device_id)
+        if known is None or known[0] != entry["status"]:
+            return False
+        # After a gap this long the liveness sweeper, in any worker, may have
+        # rewritten the stored status, so it has to be read again.
+        return entry["last_check_in"] - known[1] < window
+
+    def _status_changes(self, db: Session, entries: dict[int, dict]) -> list[tuple]:
+        """Write the status of devices where it differs and return those changes.
+
+        Each write is a compare-and-set on the status just read, so when several
+        workers flush (or the liveness sweep runs) at once, every transition is
+        reported by exactly one of them.
+        """
+        window = timedelta(seconds=get_settings().device_stale_after_seconds)
+        with self._lock:
+            candidates = {
+                device_id: entry["status"]
+                for device_id, entry in entries.items()
+                if "status" in entry and not self._status_settled(device_id, entry, window)
+            }
+        changes = []
+        ids = sorted(candidates)
+        for start in range(0, len(ids), 500):
+            rows = db.execute(
+                select(Device.id, Device.status, Device.os_type).where(
+                    Device.id.in_(ids[start : start + 500]), Device.is_deleted.is_(False)
+                )
+            ).all()
+            for row in rows:
+                if row.status != candidates[row.id]:
+                    change = self._swap_status(db, row, candidates[row.id])
+                    if change is not None:
+                        changes.append(change)
+        return changes
+
+    @staticmethod
+    def _swap_status(db: Session, row, new_status: str, attempts: int = 3) -> Optional[tuple]:
+        old_status = row.status
+        for _ in range(attempts):
+            swapped = db.execute(
+                update(_devices)
+                .where(
+                    _devices.c.id == row.id,
+                    _devices.c.status == old_status,
+                    _devices.c.is_deleted.is_(False),
+                )
+                .values(status=new_status)
+            ).rowcount
+            if swapped:
+                return (row.id, old_status, new_status, row.os_type)
+            # Changed since it was read; this transaction now holds the write
+            # lock (SQLite) or waited for the other writer (row lock), so the
+            # re-read sees the committed value.
+            current = db.execute(
+                select(_devices.c.status).where(_devices.c.id == row.id, _devices.c.is_deleted.is_(False))
+            ).scalar_one_or_none()
+            if current is None or current == new_status:
+                return None
+            old_status = current
+        return None
+
+    def _requeue(self, entries: dict[int, dict]) -> None:
+        with self._lock:
+            self._generation += 1
+            for device_id, entry in entries.items():
+                newer = self._pending.get(device_id)
+                if newer is not None:
+                    entry.update(newer)
+                self._pending[device_id] = entry
+                self._recorded[device_id] = self._generation
+
+
+checkin_buffer = CheckInBuffer()
+
+
+def flush_checkins() -> int:
+    db = SessionLocal()
+    try:
+        return checkin_buffer.flush(db)
+    finally:
+        db.close()
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Console lists change constantly: always revalidate, answered cheaply with 304.
+CACHE_REVALIDATE = "private, no-cache"
+# Payload and logs of finished actions; an agent re-posting a result can still
+# rewrite them, so they are cached for a while rather than marked immutable.
+CACHE_FINISHED = "private, max-age=3600"
+CACHE_NO_STORE = "no-store"
+
+
+def weak_etag(*parts: object) -> str:
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on either side.
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str, cache_control: str = CACHE_REVALIDATE
+) -> Optional[Response]:
+    """Tag ``response`` with ``etag``; return a 304 to send instead when the client's copy is current.
+
+    Call this before loading anything so an unchanged resource costs only the
+    version lookup.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -6,11 +6,74 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: str = Field("sqlite:///./deployflow.db", env="DATABASE_URL")
+    # Connection pool (QueuePool; also used for file-backed SQLite).
+    db_pool_size: int = Field(10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(20, env="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(30.0, env="DB_POOL_TIMEOUT_SECONDS")
+    # Recycle connections before server-side idle timeouts drop them; -1 disables.
+    db_pool_recycle_seconds: int = Field(1800, env="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(True, env="DB_POOL_PRE_PING")
+    # SQLite pragmas set on every new connection. WAL lets readers run alongside
+    # the writer; busy_timeout makes writers wait for the lock instead of failing.
+    sqlite_journal_mode: str = Field("wal", env="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field("normal", env="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    # Page cache per connection, in KiB.
+    sqlite_cache_size_kib: int = Field(16384, env="SQLITE_CACHE_SIZE_KIB")
     secret_key: str = Field("changeme", env="SECRET_KEY")
     default_enrollment_token: str = Field("changeme", env="DEFAULT_ENROLLMENT_TOKEN")
+    agent_poll_interval_seconds: int = Field(30, env="AGENT_POLL_INTERVAL_SECONDS")
+    agent_long_poll_max_seconds: int = Field(25, env="AGENT_LONG_POLL_MAX_SECONDS")
+    agent_max_actions_per_heartbeat: int = Field(20, env="AGENT_MAX_ACTIONS_PER_HEARTBEAT")
+    action_lease_seconds: int = Field(3600, env="ACTION_LEASE_SECONDS")
+    action_max_attempts: int = Field(3, env="ACTION_MAX_ATTEMPTS")
+    action_retry_backoff_seconds: int = Field(60, env="ACTION_RETRY_BACKOFF_SECONDS")
+    action_reaper_interval_seconds: float = Field(30.0, env="ACTION_REAPER_INTERVAL_SECONDS")
+    action_reaper_batch_size: int = Field(500, env="ACTION_REAPER_BATCH_SIZE")
+    apply_job_workers: int = Field(2, env="APPLY_JOB_WORKERS")
+    apply_job_chunk_size: int = Field(500, env="APPLY_JOB_CHUNK_SIZE")
+    # Attempts per chunk before the job fails (cursor kept, so it can be retried).
+    apply_job_chunk_attempts: int = Field(3, env="APPLY_JOB_CHUNK_ATTEMPTS")
+    # A running job with no progress for this long is taken over by another worker.
+    apply_job_stale_seconds: float = Field(120.0, env="APPLY_JOB_STALE_SECONDS")
+    rollout_interval_seconds: float = Field(10.0, env="ROLLOUT_INTERVAL_SECONDS")
+    # Fleet summary counters are maintained incrementally; this recomputes them to correct drift.
+    fleet_reconcile_interval_seconds: float = Field(300.0, env="FLEET_RECONCILE_INTERVAL_SECONDS")
+    fleet_counter_shards: int = Field(8, env="FLEET_COUNTER_SHARDS")
+    # Server-sent events: per-subscriber queue bound (oldest dropped) and keepalive interval.
+    event_queue_size: int = Field(256, env="EVENT_QUEUE_SIZE")
+    event_keepalive_seconds: float = Field(15.0, env="EVENT_KEEPALIVE_SECONDS")
+    # Rows fetched per batch by the streaming export endpoints.
+    export_batch_size: int = Field(1000, env="EXPORT_BATCH_SIZE")
+    page_size_default: int = Field(100, env="PAGE_SIZE_DEFAULT")
+    page_size_max: int = Field(1000, env="PAGE_SIZE_MAX")
+    action_log_max_chunk_bytes: int = Field(256 * 1024, env="ACTION_LOG_MAX_CHUNK_BYTES")
+    action_log_max_read_bytes: int = Field(1024 * 1024, env="ACTION_LOG_MAX_READ_BYTES")
+    cache_ttl_seconds: float = Field(30.0, env="CACHE_TTL_SECONDS")
+    cache_max_entries: int = Field(50_000, env="CACHE_MAX_ENTRIES")
+    # Payloads at least this large are stored once in payload_blobs and referenced by digest.
+    payload_store_min_bytes: int = Field(512, env="PAYLOAD_STORE_MIN_BYTES")
+    payload_cache_max_entries: int = Field(1024, env="PAYLOAD_CACHE_MAX_ENTRIES")
+    # Action payloads/logs at or above the threshold are stored compressed ("zlib", "lzma" or "none").
+    compression_algorithm: str = Field("zlib", env="COMPRESSION_ALGORITHM")
+    compression_threshold_bytes: int = Field(1024, env="COMPRESSION_THRESHOLD_BYTES")
+    # 0 disables write-behind and writes each heartbeat check-in immediately.
+    checkin_flush_interval_seconds: float = Field(5.0, env="CHECKIN_FLUSH_INTERVAL_SECONDS")
+    # Devices silent for this many poll intervals are marked stale, then offline.
+    device_stale_after_polls: float = Field(3.0, env="DEVICE_STALE_AFTER_POLLS")
+    device_offline_after_polls: float = Field(10.0, env="DEVICE_OFFLINE_AFTER_POLLS")
+    liveness_sweep_interval_seconds: float = Field(60.0, env="LIVENESS_SWEEP_INTERVAL_SECONDS")
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
+    @property
+    def device_stale_after_seconds(self) -> float:
+        return self.agent_poll_interval_seconds * self.device_stale_after_polls
+
+    @property
+    def device_offline_after_seconds(self) -> float:
+        return self.agent_poll_interval_seconds * self.device_offline_after_polls
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict, deque
+from typing import Any, Iterable
+
+from app.core.config import get_settings
+
+FLEET_CHANNEL = "fleet"
+
+EVENT_ACTION_CREATED = "action.created"
+EVENT_ACTION_STATUS = "action.status"
+# Several actions of a device changed at once (rollout waves, bulk applies,
+# lease expiry); clients refetch the device's action list.
+EVENT_ACTIONS_CHANGED = "actions.changed"
+EVENT_DEVICE_STATUS = "device.status"
+EVENT_DEVICE_DELETED = "device.deleted"
+# Sent to a subscriber whose queue overflowed; ``dropped`` events were lost.
+EVENT_RESYNC = "resync"
+
+
+def device_channel(device_id: int) -> str:
+    return f"device:{device_id}"
+
+
+class _Subscriber:
+    __slots__ = ("channel", "loop", "queue", "event", "dropped")
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, max_queued: int) -> None:
+        self.channel = channel
+        self.loop = loop
+        # A full deque discards its oldest entry on append: slow consumers lose
+        # old events instead of holding memory or blocking publishers.
+        self.queue: deque[dict] = deque(maxlen=max_queued)
+        self.event = asyncio.Event()
+        self.dropped = 0
+
+    def _push(self, message: dict) -> None:
+        # Runs on the subscriber's loop, so the queue is only touched from one thread.
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(message)
+        self.event.set()
+
+    async def next_batch(self, timeout: float) -> tuple[list[dict], int]:
+        """Wait up to ``timeout`` for events; returns ``(events, dropped since last call)``."""
+        if not self.queue:
+            try:
+                await asyncio.wait_for(self.event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.event.clear()
+        messages = list(self.queue)
+        self.queue.clear()
+        dropped, self.dropped = self.dropped, 0
+        return messages, dropped
+
+
+class EventBroadcaster:
+    """Fans device and action state changes out to server-sent event streams.
+
+    Each subscriber has a bounded queue with drop-oldest backpressure; a
+    subscriber that fell behind is told how many events it lost so it can
+    refetch. Like ``action_hub`` this is in-process: with several workers a
+    stream only sees changes made by its own process.
+    """
+
+    def __init__(self, max_queued: int = 256) -> None:
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[_Subscriber]] = defaultdict(set)
+        self._ids = itertools.count(1)
+
+    def subscribe(self, channel: str) -> _Subscriber:
+        subscriber = _Subscriber(channel, asyncio.get_running_loop(), self.max_queued)
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.channel)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.channel]
+
+    def publish(self, event_type: str, device_id: int, **data: Any) -> None:
+        """Send an event to the device's channel and the fleet channel.
+
+        Safe to call from sync endpoints in the threadpool; call it after the
+        change is committed.
+        """
+        message = {"id": next(self._ids), "type": event_type, "data": {"device_id": device_id, **data}}
+        with self._lock:
+            subscribers = [
+                *self._subscribers.get(device_channel(device_id), ()),
+                *self._subscribers.get(FLEET_CHANNEL, ()),
+            ]
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber._push, message)
+            except RuntimeError:
+                # The subscriber's loop already shut down; it unsubscribes on its way out.
+                pass
+
+    def publish_many(self, event_type: str, device_ids: Iterable[int], **data: Any) -> None:
+        for device_id in set(device_ids):
+            self.publish(event_type, device_id, **data)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+def format_sse(event_type: str, data: dict, event_id: int | None = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event_type}", f"data: {json.dumps(data, default=str)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+event_broadcaster = EventBroadcaster(get_settings().event_queue_size)
@@ -0,0 +1,62 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # optional; pydantic-core's encoder below writes the same JSON
+    orjson = None
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode plain dicts/lists/scalars/datetimes the way a pydantic response model would."""
+    if orjson is not None:
+        # OPT_UTC_Z: pydantic writes a zero UTC offset as "Z".
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+def schema_columns(model, schema: type[BaseModel]) -> tuple:
+    """The model's columns for ``schema``'s fields, in field order so rows encode like the schema."""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+def rows_as_dicts(rows: list) -> list[dict]:
+    # Row._asdict() rebuilds the key list for every row; zip against it once.
+    if not rows:
+        return []
+    fields = rows[0]._fields
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def fast_page(result: dict, response: Optional[Response] = None) -> FastJSONResponse:
+    """Encode a ``paginate`` result over column rows without building response models.
+
+    ``items`` may be column rows or dicts already built by ``rows_as_dicts``.
+    Returning a response skips FastAPI's validation of ``response_model``, which
+    stays on the route for the OpenAPI schema. Rows must come from
+    ``schema_columns`` so their keys match the schema. Headers already set on
+    the injected ``response`` (ETag, Cache-Control) are carried over.
+    """
+    items = result["items"]
+    if items and not isinstance(items[0], dict):
+        items = rows_as_dicts(items)
+    headers = None
+    if response is not None:
+        headers = {
+            key: value
+            for key, value in response.headers.items()
+            if key not in ("content-length", "content-type")
+        }
+    return FastJSONResponse(
+        {"items": items, "next_cursor": result["next_cursor"], "total": result["total"]},
+        headers=headers,
+    )
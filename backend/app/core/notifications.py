@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class _Waiter:
+    __slots__ = ("device_id", "loop", "event")
+
+    def __init__(self, device_id: int, loop: asyncio.AbstractEventLoop) -> None:
+        self.device_id = device_id
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class ActionNotificationHub:
+    """Wakes parked long-poll heartbeats when work is queued for a device.
+
+    Notifications are in-process only; with several workers an agent parked on
+    another process simply falls back to its long-poll timeout.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiters: dict[int, set[_Waiter]] = defaultdict(set)
+
+    def subscribe(self, device_id: int) -> _Waiter:
+        # Subscribe before checking the database so a notification sent between
+        # the check and the wait is not lost.
+        waiter = _Waiter(device_id, asyncio.get_running_loop())
+        with self._lock:
+            self._waiters[device_id].add(waiter)
+        return waiter
+
+    def unsubscribe(self, waiter: _Waiter) -> None:
+        with self._lock:
+            waiters = self._waiters.get(waiter.device_id)
+            if waiters is None:
+                return
+            waiters.discard(waiter)
+            if not waiters:
+                del self._waiters[waiter.device_id]
+
+    def notify(self, device_id: int) -> None:
+        # Safe to call from sync endpoints running in the threadpool.
+        with self._lock:
+            waiters = list(self._waiters.get(device_id, ()))
+        for waiter in waiters:
+            waiter.loop.call_soon_threadsafe(waiter.event.set)
+
+    def notify_many(self, device_ids) -> None:
+        for device_id in set(device_ids):
+            self.notify(device_id)
+
+    def waiting_count(self) -> int:
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiters.values())
+
+
+action_hub = ActionNotificationHub()
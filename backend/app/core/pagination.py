@@ -0,0 +1,133 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm import Query as OrmQuery
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    # Opaque token for the next page; ``None`` on the last page.
+    next_cursor: Optional[str] = None
+    # Only filled in when the request asked for ``include_total``.
+    total: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class PageParams:
+    cursor: Optional[str]
+    limit: int
+    include_total: bool
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by PAGE_SIZE_MAX)"),
+    include_total: bool = Query(False, description="Also count all matching rows"),
+) -> PageParams:
+    settings = get_settings()
+    return PageParams(
+        cursor=cursor,
+        limit=min(limit or settings.page_size_default, settings.page_size_max),
+        include_total=include_total,
+    )
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def _ordering_key(listing: str, order_by: Sequence[InstrumentedAttribute], descending: bool) -> str:
+    columns = ",".join(column.key for column in order_by)
+    return f"{listing}:{columns}:{'desc' if descending else 'asc'}"
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode((text + "=" * (-len(text) % 4)).encode("ascii"))
+
+
+def _signature(body: bytes) -> bytes:
+    return hmac.new(get_settings().secret_key.encode("utf-8"), body, hashlib.sha256).digest()[:16]
+
+
+def encode_cursor(values: Sequence[Any], ordering: str) -> str:
+    """Opaque cursor for ``values``, signed with SECRET_KEY and bound to ``ordering``."""
+    body = json.dumps({"o": ordering, "k": [_encode_value(value) for value in values]}).encode("utf-8")
+    return f"{_b64encode(body)}.{_b64encode(_signature(body))}"
+
+
+def decode_cursor(cursor: str, ordering: str) -> list[Any]:
+    try:
+        encoded_body, encoded_signature = cursor.split(".")
+        body = _b64decode(encoded_body)
+        if not hmac.compare_digest(_b64decode(encoded_signature), _signature(body)):
+            raise ValueError("cursor signature mismatch")
+        data = json.loads(body)
+        if data["o"] != ordering:
+            raise ValueError("cursor belongs to a different listing")
+        return [_decode_value(value) for value in data["k"]]
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(
+    query: OrmQuery,
+    order_by: Sequence[InstrumentedAttribute],
+    params: PageParams,
+    *,
+    descending: bool = False,
+    listing: Optional[str] = None,
+) -> dict:
+    """Keyset-paginate an ORM query into a ``Page``-shaped dict.
+
+    ``order_by`` must end in a unique column (normally the primary key) so the
+    ordering is total. Each page is a range scan that starts after the last key
+    of the previous one, so deep pages cost the same as the first.
+
+    Cursors name their ``listing`` (default: the table of ``order_by``) and are
+    rejected with 400 on any other listing.
+    """
+    ordering = _ordering_key(listing or order_by[0].class_.__tablename__, order_by, descending)
+    total = query.order_by(None).count() if params.include_total else None
+
+    if params.cursor:
+        values = decode_cursor(params.cursor, ordering)
+        if len(values) != len(order_by):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        key = tuple_(*order_by)
+        query = query.filter(key < tuple_(*values) if descending else key > tuple_(*values))
+
+    columns = [column.desc() if descending else column.asc() for column in order_by]
+    rows = query.order_by(*columns).limit(params.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_by], ordering)
+    return {"items": rows, "next_cursor": next_cursor, "total": total}
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+from typing import Callable
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs a blocking callable in the threadpool on a fixed interval."""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], object]) -> None:
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await run_in_threadpool(self.func)
+            except Exception:  # pragma: no cover - logged and retried next tick
+                logger.exception("Periodic task %s failed", self.name)
@@ -1,13 +1,86 @@
-from sqlalchemy import create_engine
+from collections import Counter
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 settings = get_settings()
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
-)
+
+_SQLITE_JOURNAL_MODES = {"delete", "truncate", "persist", "memory", "wal", "off"}
+_SQLITE_SYNCHRONOUS = {"off", "normal", "full", "extra"}
+
+
+def _engine_options(settings: Settings) -> dict:
+    url = make_url(settings.database_url)
+    options: dict = {}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # In-memory SQLite lives in one connection; pool sizing does not apply.
+            return options
+    options.update(
+        poolclass=QueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return options
+
+
+def _sqlite_pragmas(settings: Settings) -> list[str]:
+    journal_mode = settings.sqlite_journal_mode.lower()
+    synchronous = settings.sqlite_synchronous.lower()
+    if journal_mode not in _SQLITE_JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE must be one of {', '.join(sorted(_SQLITE_JOURNAL_MODES))}")
+    if synchronous not in _SQLITE_SYNCHRONOUS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {', '.join(sorted(_SQLITE_SYNCHRONOUS))}")
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kib)}",
+    ]
+
+
+engine = create_engine(settings.database_url, **_engine_options(settings))
+
+if engine.dialect.name == "sqlite":
+    _pragmas = _sqlite_pragmas(settings)
+
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in _pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+# Cumulative pool events since startup; a high connects/checkouts ratio means
+# the pool is too small or connections are being recycled/invalidated.
+_pool_events: Counter = Counter()
+
+
+@event.listens_for(engine, "connect")
+def _count_connect(dbapi_connection, connection_record) -> None:
+    _pool_events["connects"] += 1
+
+
+@event.listens_for(engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    _pool_events["checkouts"] += 1
+
+
+@event.listens_for(engine, "invalidate")
+def _count_invalidate(dbapi_connection, connection_record, exception) -> None:
+    _pool_events["invalidations"] += 1
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -19,3 +92,30 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def pool_stats() -> dict:
+    """Snapshot of the engine's connection pool for the admin endpoint."""
+    pool = engine.pool
+    stats: dict = {"dialect": engine.dialect.name, "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=settings.db_max_overflow,
+            timeout_seconds=pool.timeout(),
+        )
+    stats.update(
+        connects=_pool_events["connects"],
+        checkouts=_pool_events["checkouts"],
+        invalidations=_pool_events["invalidations"],
+    )
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            stats["sqlite"] = {
+                pragma: conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                for pragma in ("journal_mode", "synchronous", "busy_timeout", "cache_size")
+            }
+    return stats
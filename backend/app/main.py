@@ -2,15 +2,47 @@ from fastapi import FastAPI
 from sqlalchemy.orm import Session
 
 from app.api.v1.routes import router as api_router
+from app.core.checkin_buffer import checkin_buffer, flush_checkins
 from app.core.config import get_settings
+from app.core.tasks import PeriodicTask
 from app.db import SessionLocal, engine
 from app.models import Base  # noqa: F401
 from app.models.enrollment_token import EnrollmentToken
+from app.services.apply_jobs import resume_apply_jobs, shutdown_apply_jobs
+from app.services.device_liveness import run_liveness_sweep
+from app.services.device_events import register_device_event_listeners
+from app.services.device_search import setup_device_search
+from app.services.dispatch import run_lease_reaper
+from app.services.fleet_counters import register_counter_listeners, run_counter_reconciliation
+from app.services.resource_versions import ensure_resource_versions
+from app.services.rollouts import run_rollouts
 
 Base.metadata.create_all(bind=engine)
+setup_device_search(engine)
+ensure_resource_versions(engine)
 
 app = FastAPI(title="DeployFlow Fleet API")
 
+background_tasks = [
+    PeriodicTask(
+        "checkin-flush", get_settings().checkin_flush_interval_seconds, flush_checkins
+    ),
+    PeriodicTask(
+        "action-lease-reaper", get_settings().action_reaper_interval_seconds, run_lease_reaper
+    ),
+    PeriodicTask("rollout-scheduler", get_settings().rollout_interval_seconds, run_rollouts),
+    # Picks up jobs left behind by a worker that died mid-job.
+    PeriodicTask("apply-job-resume", get_settings().apply_job_stale_seconds, resume_apply_jobs),
+    PeriodicTask(
+        "fleet-counter-reconcile",
+        get_settings().fleet_reconcile_interval_seconds,
+        run_counter_reconciliation,
+    ),
+    PeriodicTask(
+        "device-liveness-sweep", get_settings().liveness_sweep_interval_seconds, run_liveness_sweep
+    ),
+]
+
 
 @app.on_event("startup")
 def seed_default_enrollment_token() -> None:
@@ -34,4 +66,24 @@ def seed_default_enrollment_token() -> None:
         db.close()
 
 
+@app.on_event("startup")
+async def start_background_tasks() -> None:
+    register_counter_listeners()
+    register_device_event_listeners()
+    # Counters start from the tables, e.g. after an upgrade or a crash mid-flush.
+    run_counter_reconciliation()
+    for task in background_tasks:
+        task.start()
+    resume_apply_jobs()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks() -> None:
+    for task in background_tasks:
+        await task.stop()
+    shutdown_apply_jobs()
+    if len(checkin_buffer):
+        flush_checkins()
+
+
 app.include_router(api_router, prefix="/api/v1")
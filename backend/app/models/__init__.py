@@ -1,9 +1,16 @@
 from app.db import Base  # noqa: F401
 from app.models.action import Action  # noqa: E402,F401
+from app.models.action_log_chunk import ActionLogChunk  # noqa: E402,F401
+from app.models.apply_job import ApplyJob  # noqa: E402,F401
 from app.models.deployment_profile import DeploymentProfile  # noqa: E402,F401
 from app.models.device import Device  # noqa: E402,F401
+from app.models.device_group import DeviceGroup, DeviceGroupMember  # noqa: E402,F401
 from app.models.enrollment_token import EnrollmentToken  # noqa: E402,F401
+from app.models.fleet_counter import FleetCounter  # noqa: E402,F401
 from app.models.os_image import OSImage  # noqa: E402,F401
+from app.models.payload_blob import PayloadBlob  # noqa: E402,F401
 from app.models.profile_task import ProfileTask  # noqa: E402,F401
+from app.models.resource_version import ResourceVersion  # noqa: E402,F401
+from app.models.rollout import Rollout  # noqa: E402,F401
 from app.models.script import Script  # noqa: E402,F401
 from app.models.software_package import SoftwarePackage  # noqa: E402,F401
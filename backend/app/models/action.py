@@ -1,13 +1,23 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db import Base
+from app.models.types import CompressedText
 
 ACTION_STATUS_PENDING = "pending"
 ACTION_STATUS_RUNNING = "running"
 ACTION_STATUS_SUCCEEDED = "succeeded"
 ACTION_STATUS_FAILED = "failed"
+# Created by a rollout but not yet released to the device; never dispatched.
+ACTION_STATUS_HELD = "held"
+ACTION_STATUS_CANCELLED = "cancelled"
+
+
+def join_payload(body: str | None, suffix: str | None) -> str | None:
+    if body is None:
+        return suffix
+    return f"{body}\n{suffix}" if suffix else body
 
 
 class Action(Base):
@@ -16,15 +26,68 @@ class Action(Base):
     id = Column(Integer, primary_key=True, index=True)
     device_id = Column(Integer, ForeignKey("devices.id"), nullable=False)
     type = Column(String, nullable=False)
-    payload = Column(Text, nullable=True)
+    # With payload_digest set, the shared body lives in payload_blobs and
+    # ``payload`` only holds per-action text appended after it (the exit_code note).
+    payload = Column(CompressedText, nullable=True)
+    payload_digest = Column(String(64), ForeignKey("payload_blobs.digest"), nullable=True)
     script_id = Column(Integer, ForeignKey("scripts.id"), nullable=True)
     software_id = Column(Integer, ForeignKey("software_packages.id"), nullable=True)
     status = Column(String, nullable=False, default=ACTION_STATUS_PENDING)
-    logs = Column(Text, nullable=True)
+    exit_code = Column(Integer, nullable=True)
+    logs = Column(CompressedText, nullable=True)
+    # Total bytes streamed into action_log_chunks; 0 when only ``logs`` is used.
+    log_size = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    # Lease bookkeeping: a running action whose lease expires is re-queued (after
+    # not_before) or failed by the reaper once attempts reach the configured cap.
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    not_before = Column(DateTime(timezone=True), nullable=True)
+    # Set for actions created by a staged rollout; they start as held and are
+    # released to pending wave by wave.
+    rollout_id = Column(Integer, ForeignKey("rollouts.id", ondelete="CASCADE"), nullable=True)
+    rollout_wave = Column(Integer, nullable=True)
 
     device = relationship("Device", back_populates="actions")
+    payload_blob = relationship("PayloadBlob")
+
+    @property
+    def resolved_payload(self) -> str | None:
+        if self.payload_digest is None:
+            return self.payload
+        return join_payload(self.payload_blob.content if self.payload_blob else None, self.payload)
+
+    __table_args__ = (
+        Index("ix_actions_device_id_status", "device_id", "status"),
+        # Keyset pagination of a device's action history (newest first).
+        Index("ix_actions_device_id_id", "device_id", "id"),
+        # Partial index used by heartbeat dispatch; stays small however large
+        # the action history grows.
+        Index(
+            "ix_actions_pending_dispatch",
+            "device_id",
+            "id",
+            sqlite_where=status == ACTION_STATUS_PENDING,
+            postgresql_where=status == ACTION_STATUS_PENDING,
+        ),
+        Index(
+            "ix_actions_running_lease",
+            "lease_expires_at",
+            sqlite_where=status == ACTION_STATUS_RUNNING,
+            postgresql_where=status == ACTION_STATUS_RUNNING,
+        ),
+        # Wave release and progress counts; only rollout actions are indexed.
+        Index(
+            "ix_actions_rollout_wave",
+            "rollout_id",
+            "rollout_wave",
+            "status",
+            sqlite_where=rollout_id.isnot(None),
+            postgresql_where=rollout_id.isnot(None),
+        ),
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db import Base
+from app.models.types import CompressedText
+
+
+class ActionLogChunk(Base):
+    __tablename__ = "action_log_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    action_id = Column(Integer, ForeignKey("actions.id", ondelete="CASCADE"), nullable=False)
+    # Byte offset (UTF-8) of this chunk within the action's log and its length.
+    byte_offset = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=False)
+    content = Column(CompressedText, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("action_id", "byte_offset", name="uq_action_log_chunks_action_offset"),
+    )
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+APPLY_JOB_STATUS_QUEUED = "queued"
+APPLY_JOB_STATUS_RUNNING = "running"
+APPLY_JOB_STATUS_SUCCEEDED = "succeeded"
+APPLY_JOB_STATUS_FAILED = "failed"
+
+
+class ApplyJob(Base):
+    __tablename__ = "apply_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    profile_id = Column(
+        Integer, ForeignKey("deployment_profiles.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    status = Column(String(20), nullable=False, default=APPLY_JOB_STATUS_QUEUED, index=True)
+    # JSON-encoded ApplySelector describing the target devices.
+    selector = Column(Text, nullable=False)
+    total_devices = Column(Integer, nullable=False, default=0, server_default="0")
+    processed_devices = Column(Integer, nullable=False, default=0, server_default="0")
+    created_actions = Column(Integer, nullable=False, default=0, server_default="0")
+    skipped_actions = Column(Integer, nullable=False, default=0, server_default="0")
+    error_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+    # Highest device id committed so far; lets an interrupted job resume.
+    cursor_device_id = Column(Integer, nullable=False, default=0, server_default="0")
+    # Worker holding the job and its last progress write; a running job whose
+    # heartbeat goes stale may be claimed by another worker.
+    owner = Column(String(128), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    rollout = relationship("Rollout", uselist=False, viewonly=True, lazy="selectin")
+
+    @property
+    def rollout_id(self) -> int | None:
+        return self.rollout.id if self.rollout is not None else None
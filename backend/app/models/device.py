@@ -4,19 +4,32 @@ from sqlalchemy.sql import func
 
 from app.db import Base
 
+# Agents report their own status (normally "online"); the liveness sweeper sets
+# stale/offline when check-ins stop.
+DEVICE_STATUS_ONLINE = "online"
+DEVICE_STATUS_STALE = "stale"
+DEVICE_STATUS_OFFLINE = "offline"
+
 
 class Device(Base):
     __tablename__ = "devices"
 
     id = Column(Integer, primary_key=True, index=True)
     hostname = Column(String, nullable=False, unique=True)
-    profile_id = Column(Integer, ForeignKey("deployment_profiles.id"), nullable=True)
-    status = Column(String, nullable=False, default="unknown")
+    profile_id = Column(Integer, ForeignKey("deployment_profiles.id"), nullable=True, index=True)
+    status = Column(String, nullable=False, default="unknown", index=True)
     os_type = Column(String(50), nullable=True, index=True)
     os_version = Column(String, nullable=True)
     hardware_summary = Column(Text, nullable=True)
-    last_check_in = Column(DateTime(timezone=True), nullable=True)
+    # SHA-256 of hardware_summary; agents send it instead of the full inventory.
+    hardware_hash = Column(String(64), nullable=True)
+    last_check_in = Column(DateTime(timezone=True), nullable=True, index=True)
     is_deleted = Column(Boolean, default=False, nullable=False)
+    # Bumped whenever one of the device's actions is created or changes; the
+    # ETag of its action list.
+    actions_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped on every write to this row; the ETag of GET /devices/{id}.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     profile = relationship("DeploymentProfile", back_populates="devices")
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+DEVICE_GROUP_KIND_STATIC = "static"
+DEVICE_GROUP_KIND_DYNAMIC = "dynamic"
+
+
+class DeviceGroup(Base):
+    __tablename__ = "device_groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False, unique=True)
+    description = Column(Text, nullable=True)
+    kind = Column(String(20), nullable=False, default=DEVICE_GROUP_KIND_STATIC)
+    # JSON-encoded GroupRules; only used by dynamic groups.
+    rules = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class DeviceGroupMember(Base):
+    """Materialized membership; maintained explicitly for static groups and by rule evaluation for dynamic ones."""
+
+    __tablename__ = "device_group_members"
+
+    group_id = Column(Integer, ForeignKey("device_groups.id", ondelete="CASCADE"), primary_key=True)
+    device_id = Column(Integer, ForeignKey("devices.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (Index("ix_device_group_members_device_id", "device_id"),)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String
+
+from app.db import Base
+
+COUNTER_SCOPE_DEVICE_STATUS = "device_status"
+COUNTER_SCOPE_DEVICE_OS_TYPE = "device_os_type"
+COUNTER_SCOPE_ACTION_STATUS = "action_status"
+
+
+class FleetCounter(Base):
+    __tablename__ = "fleet_counters"
+
+    # e.g. ("device_status", "online") or ("action_status", "pending").
+    scope = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    # Increments are spread over FLEET_COUNTER_SHARDS rows per counter so busy
+    # counters (e.g. pending actions) are not one row every writer waits on.
+    # A counter's value is the sum of its shards.
+    shard = Column(Integer, primary_key=True, default=0)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db import Base
+from app.models.types import CompressedText
+
+
+class PayloadBlob(Base):
+    __tablename__ = "payload_blobs"
+
+    # SHA-256 hex of the UTF-8 content; identical payloads share one row.
+    digest = Column(String(64), primary_key=True)
+    content = Column(CompressedText, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
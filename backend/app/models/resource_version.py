@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+
+from app.db import Base
+
+
+class ResourceVersion(Base):
+    __tablename__ = "resource_versions"
+
+    # One row per polled collection ("devices", "scripts", ...); bumped on every
+    # write to it and used to build ETags.
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,41 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+ROLLOUT_STATUS_PENDING = "pending"
+ROLLOUT_STATUS_RUNNING = "running"
+ROLLOUT_STATUS_PAUSED = "paused"
+ROLLOUT_STATUS_COMPLETED = "completed"
+ROLLOUT_STATUS_CANCELLED = "cancelled"
+ROLLOUT_STATUS_FAILED = "failed"
+
+
+class Rollout(Base):
+    __tablename__ = "rollouts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    profile_id = Column(
+        Integer, ForeignKey("deployment_profiles.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    apply_job_id = Column(
+        Integer, ForeignKey("apply_jobs.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    status = Column(String(20), nullable=False, default=ROLLOUT_STATUS_PENDING, index=True)
+    # Exactly one of wave_size / wave_percent is given; a percentage is turned
+    # into wave_size once the apply job knows how many devices it targets.
+    wave_size = Column(Integer, nullable=True)
+    wave_percent = Column(Float, nullable=True)
+    total_waves = Column(Integer, nullable=False, default=0, server_default="0")
+    current_wave = Column(Integer, nullable=False, default=0, server_default="0")
+    # Upper bound on pending + running actions released by this rollout.
+    max_concurrent = Column(Integer, nullable=False)
+    # Fraction of a finished wave's actions that must succeed to advance.
+    success_threshold = Column(Float, nullable=False, default=1.0)
+    auto_advance = Column(Boolean, nullable=False, default=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,67 @@
+import base64
+import lzma
+import zlib
+from typing import Optional
+
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import get_settings
+
+# Stored values starting with MARKER carry a one-character codec tag. Anything
+# else is plain text, so rows written before compression existed read unchanged.
+MARKER = "\x01"
+_CODEC_RAW = "r"
+_CODEC_ZLIB = "z"
+_CODEC_LZMA = "x"
+
+_COMPRESSORS = {
+    "zlib": (_CODEC_ZLIB, lambda data: zlib.compress(data, 6)),
+    "lzma": (_CODEC_LZMA, lzma.compress),
+}
+_DECOMPRESSORS = {
+    _CODEC_ZLIB: zlib.decompress,
+    _CODEC_LZMA: lzma.decompress,
+}
+
+
+def is_encoded(stored: Optional[str]) -> bool:
+    return stored is not None and stored.startswith(MARKER)
+
+
+def encode_text(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    settings = get_settings()
+    data = value.encode("utf-8")
+    if settings.compression_algorithm in _COMPRESSORS and len(data) >= settings.compression_threshold_bytes:
+        codec, compress = _COMPRESSORS[settings.compression_algorithm]
+        packed = base64.b64encode(compress(data)).decode("ascii")
+        # Only keep the compressed form when it actually saves space.
+        if len(packed) + 2 < len(data):
+            return f"{MARKER}{codec}{packed}"
+    if value.startswith(MARKER):
+        return f"{MARKER}{_CODEC_RAW}{value}"
+    return value
+
+
+def decode_text(stored: Optional[str]) -> Optional[str]:
+    if not is_encoded(stored):
+        return stored
+    codec, body = stored[1:2], stored[2:]
+    if codec == _CODEC_RAW:
+        return body
+    return _DECOMPRESSORS[codec](base64.b64decode(body)).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """Text column compressed above a size threshold, stored with a marker prefix."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encode_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_text(value)
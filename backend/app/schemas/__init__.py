@@ -1,9 +1,24 @@
-from app.schemas.action import ActionCreate, ActionRead  # noqa: F401
+from app.schemas.action import (  # noqa: F401
+    ActionCreate,
+    ActionListItem,
+    ActionLogRead,
+    ActionPayloadRead,
+    ActionRead,
+)
+from app.schemas.apply_job import (  # noqa: F401
+    ApplyJobRead,
+    ApplyPreviewGroup,
+    ApplyPreviewRead,
+    ApplyProfileRequest,
+    ApplySelector,
+)
 from app.schemas.deployment_profile import (  # noqa: F401
     DeploymentProfileCreate,
     DeploymentProfileRead,
     DeploymentProfileUpdate,
     DeploymentProfileWithTasks,
+    PlannedActionRead,
+    ProfilePlanRead,
     ProfileTaskCreate,
     ProfileTaskRead,
     ProfileTaskUpdate,
@@ -11,7 +26,16 @@ from app.schemas.deployment_profile import (  # noqa: F401
     ProfileTasksBulkUpdate,
 )
 from app.schemas.device import DeviceCreate, DeviceRead, DeviceUpdate  # noqa: F401
+from app.schemas.device_group import (  # noqa: F401
+    DeviceGroupCreate,
+    DeviceGroupMembersUpdate,
+    DeviceGroupRead,
+    DeviceGroupUpdate,
+    GroupRules,
+)
 from app.schemas.enrollment_token import EnrollmentTokenCreate, EnrollmentTokenRead  # noqa: F401
+from app.schemas.rollout import RolloutConfig, RolloutDetail, RolloutRead  # noqa: F401
+from app.schemas.fleet import ActionCounts, DeviceCounts, FleetSummary  # noqa: F401
 from app.schemas.os_image import OSImageCreate, OSImageRead  # noqa: F401
 from app.schemas.script import ScriptCreate, ScriptRead, ScriptUpdate  # noqa: F401
 from app.schemas.software import SoftwareCreate, SoftwareRead, SoftwareUpdate  # noqa: F401
@@ -22,4 +46,10 @@ from app.schemas.agent import (  # noqa: F401
     AgentHeartbeatResponse,
     AgentActionPayload,
     AgentActionResultRequest,
+    AgentActionResultItem,
+    AgentActionResultBatchRequest,
+    AgentActionResultOutcome,
+    AgentActionResultBatchResponse,
+    AgentLogChunkRequest,
+    AgentLogChunkResponse,
 )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 
 class ActionCreate(BaseModel):
@@ -11,17 +11,39 @@ class ActionCreate(BaseModel):
     software_id: Optional[int] = None
 
 
-class ActionRead(BaseModel):
+class ActionListItem(BaseModel):
+    """Action history row; payload and logs are fetched per action on demand."""
+
     id: int
     device_id: int
     type: str
     status: str
-    payload: Optional[str] = None
     script_id: Optional[int] = None
     software_id: Optional[int] = None
-    logs: Optional[str] = None
+    exit_code: Optional[int] = None
+    log_size: int = 0
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ActionRead(ActionListItem):
+    # ORM actions expose the blob-store body joined with any inline suffix.
+    payload: Optional[str] = Field(None, validation_alias=AliasChoices("resolved_payload", "payload"))
+    logs: Optional[str] = None
+
+
+class ActionPayloadRead(BaseModel):
+    action_id: int
+    payload: Optional[str] = None
+
+
+class ActionLogRead(BaseModel):
+    action_id: int
+    offset: int
+    next_offset: int
+    size: int
+    content: str
+    complete: bool
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class AgentRegisterRequest(BaseModel):
@@ -16,6 +16,7 @@ class AgentRegisterRequest(BaseModel):
 class AgentRegisterResponse(BaseModel):
     device_id: int
     poll_interval_seconds: int = 30
+    long_poll_max_seconds: int = 0
 
 
 class AgentHeartbeatRequest(BaseModel):
@@ -23,6 +24,10 @@ class AgentHeartbeatRequest(BaseModel):
     status: str = "online"
     os_version: Optional[str] = None
     hardware_summary: Optional[str] = None
+    # SHA-256 hex of hardware_summary; send alone when the inventory is unchanged.
+    hardware_hash: Optional[str] = None
+    # Opt-in long-poll: park the request up to this many seconds waiting for work.
+    wait_seconds: Optional[int] = None
 
 
 class AgentActionPayload(BaseModel):
@@ -34,6 +39,8 @@ class AgentActionPayload(BaseModel):
 
 class AgentHeartbeatResponse(BaseModel):
     actions: List[AgentActionPayload]
+    # Set when hardware_hash did not match; the agent should send hardware_summary next time.
+    hardware_summary_required: bool = False
 
 
 class AgentActionResultRequest(BaseModel):
@@ -41,3 +48,31 @@ class AgentActionResultRequest(BaseModel):
     exit_code: Optional[int] = None
     logs: Optional[str] = None
     completed_at: Optional[datetime] = None
+
+
+class AgentActionResultItem(AgentActionResultRequest):
+    action_id: int
+
+
+class AgentActionResultBatchRequest(BaseModel):
+    results: List[AgentActionResultItem] = Field(..., max_length=500)
+
+
+class AgentActionResultOutcome(BaseModel):
+    action_id: int
+    status: str
+    detail: Optional[str] = None
+
+
+class AgentActionResultBatchResponse(BaseModel):
+    results: List[AgentActionResultOutcome]
+
+
+class AgentLogChunkRequest(BaseModel):
+    offset: int = Field(..., ge=0)
+    content: str
+
+
+class AgentLogChunkResponse(BaseModel):
+    action_id: int
+    size: int
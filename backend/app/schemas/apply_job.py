@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, field_validator
+
+from app.schemas.rollout import RolloutConfig
+
+
+class ApplySelector(BaseModel):
+    """Device targeting for profile apply; all given criteria must match."""
+
+    all: bool = False
+    device_ids: Optional[List[int]] = None
+    os_type: Optional[str] = None
+    status: Optional[str] = None
+    # Glob (``*``/``?``) matched case-insensitively against hostname, e.g. "web-*".
+    hostname_pattern: Optional[str] = None
+    group_id: Optional[int] = None
+
+    def is_empty(self) -> bool:
+        return not self.all and not (
+            self.device_ids
+            or self.os_type
+            or self.status
+            or self.hostname_pattern
+            or self.group_id is not None
+        )
+
+
+class ApplyProfileRequest(BaseModel):
+    device_ids: Optional[List[int]] = None
+    selector: Optional[ApplySelector] = None
+    # Release the created actions in waves instead of all at once.
+    rollout: Optional[RolloutConfig] = None
+
+
+class ApplyJobRead(BaseModel):
+    id: int
+    profile_id: int
+    status: str
+    selector: ApplySelector
+    total_devices: int
+    processed_devices: int
+    created_actions: int
+    skipped_actions: int
+    error_count: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    rollout_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("selector", mode="before")
+    @classmethod
+    def parse_selector(cls, v):
+        return json.loads(v) if isinstance(v, str) else v
+
+
+class ApplyPreviewGroup(BaseModel):
+    os_type: Optional[str] = None
+    devices: int
+    actions_per_device: int
+
+
+class ApplyPreviewRead(BaseModel):
+    profile_id: int
+    total_devices: int
+    total_actions: int
+    groups: List[ApplyPreviewGroup]
@@ -82,3 +82,23 @@ class ProfileTaskUpsert(ProfileTaskBase):
 
 class ProfileTasksBulkUpdate(BaseModel):
     tasks: List[ProfileTaskUpsert]
+
+
+class PlannedActionRead(BaseModel):
+    action_type: str
+    script_id: Optional[int] = None
+    software_id: Optional[int] = None
+    # payload_digest is set for payloads that actions will reference as a shared blob.
+    payload: Optional[str] = None
+    payload_digest: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProfilePlanRead(BaseModel):
+    profile_id: int
+    os_type: Optional[str] = None
+    task_count: int
+    actions: List[PlannedActionRead]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,53 @@
+import json
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class GroupRules(BaseModel):
+    """Dynamic membership rules; a device must match every given rule."""
+
+    os_type: Optional[str] = None
+    os_version_prefix: Optional[str] = None
+    # Glob (``*``/``?``) matched case-insensitively against hostname, e.g. "web-*".
+    hostname_pattern: Optional[str] = None
+    status: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return not (self.os_type or self.os_version_prefix or self.hostname_pattern or self.status)
+
+
+class DeviceGroupCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    kind: Literal["static", "dynamic"] = "static"
+    rules: Optional[GroupRules] = None
+
+
+class DeviceGroupUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    rules: Optional[GroupRules] = None
+
+
+class DeviceGroupRead(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    kind: str
+    rules: Optional[GroupRules] = None
+    member_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("rules", mode="before")
+    @classmethod
+    def parse_rules(cls, v):
+        return json.loads(v) if isinstance(v, str) else v
+
+
+class DeviceGroupMembersUpdate(BaseModel):
+    device_ids: List[int] = Field(..., max_length=10_000)
@@ -0,0 +1,19 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class DeviceCounts(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_os_type: Dict[str, int]
+
+
+class ActionCounts(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+
+
+class FleetSummary(BaseModel):
+    devices: DeviceCounts
+    actions: ActionCounts
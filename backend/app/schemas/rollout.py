@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class RolloutConfig(BaseModel):
+    """Staged release of an apply: give exactly one of ``wave_size`` / ``wave_percent``."""
+
+    wave_size: Optional[int] = Field(None, ge=1)
+    wave_percent: Optional[float] = Field(None, gt=0, le=100)
+    max_concurrent: int = Field(..., ge=1)
+    success_threshold: float = Field(1.0, ge=0, le=1)
+    auto_advance: bool = True
+
+    @model_validator(mode="after")
+    def check_wave_spec(self):
+        if (self.wave_size is None) == (self.wave_percent is None):
+            raise ValueError("Provide exactly one of wave_size or wave_percent")
+        return self
+
+
+class RolloutRead(BaseModel):
+    id: int
+    profile_id: int
+    apply_job_id: int
+    status: str
+    wave_size: Optional[int] = None
+    wave_percent: Optional[float] = None
+    total_waves: int
+    current_wave: int
+    max_concurrent: int
+    success_threshold: float
+    auto_advance: bool
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RolloutDetail(RolloutRead):
+    # Action counts by status for the current wave.
+    current_wave_counts: Dict[str, int] = {}
+    # Pending actions of the current wave whose device is stale/offline.
+    current_wave_unreachable: int = 0
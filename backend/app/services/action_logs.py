@@ -0,0 +1,122 @@
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.action import Action
+from app.models.action_log_chunk import ActionLogChunk
+
+# Longest UTF-8 sequence. Reads fetch two of these past the window: enough to
+# skip a partial character at the start and still finish one whole character.
+_MAX_CHAR_BYTES = 4
+
+
+class LogOffsetConflict(Exception):
+    """An append did not continue the stored log; ``expected_offset`` is where it should."""
+
+    def __init__(self, message: str, expected_offset: Optional[int]) -> None:
+        super().__init__(message)
+        self.message = message
+        self.expected_offset = expected_offset
+
+
+def append_log_chunk(db: Session, action: Action, offset: int, content: str) -> int:
+    """Append ``content`` at byte ``offset`` of the action's log and return the new size.
+
+    Appends must be contiguous. Re-sending an already stored chunk (e.g. after a
+    lost response) is accepted as a no-op; any other mismatch raises
+    ``LogOffsetConflict`` with the offset the server expects next. The caller commits.
+    """
+    data = content.encode("utf-8")
+    current_size = action.log_size or 0
+
+    if offset != current_size:
+        existing = (
+            db.query(ActionLogChunk)
+            .filter(ActionLogChunk.action_id == action.id, ActionLogChunk.byte_offset == offset)
+            .first()
+        )
+        if existing is not None and existing.content == content:
+            return current_size
+        raise LogOffsetConflict("Log offset mismatch", current_size)
+
+    if not data:
+        return current_size
+
+    new_size = current_size + len(data)
+    # Compare-and-set on log_size so concurrent appends cannot both win the same offset.
+    result = db.execute(
+        update(Action)
+        .where(Action.id == action.id, Action.log_size == current_size)
+        .values(log_size=new_size)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise LogOffsetConflict("Concurrent log append", None)
+
+    db.add(ActionLogChunk(action_id=action.id, byte_offset=offset, size=len(data), content=content))
+    return new_size
+
+
+def _is_continuation(byte: int) -> bool:
+    return (byte & 0xC0) == 0x80
+
+
+def _char_window(data: bytes, start: int, end: int) -> tuple[int, int]:
+    """Align ``[start, end)`` within ``data`` to whole UTF-8 characters.
+
+    ``start`` moves forward past continuation bytes and ``end`` moves back, but
+    a non-empty ``data`` always yields at least one character, so a ``limit``
+    smaller than a character still makes progress.
+    """
+    while start < len(data) and _is_continuation(data[start]):
+        start += 1
+    end = min(max(end, start), len(data))
+    while end > start and end < len(data) and _is_continuation(data[end]):
+        end -= 1
+    if end == start and start < len(data):
+        end = start + 1
+        while end < len(data) and _is_continuation(data[end]):
+            end += 1
+    return start, end
+
+
+def read_log_range(db: Session, action: Action, offset: int, limit: int) -> tuple[int, int, str]:
+    """Return ``(start, end, text)`` for up to ``limit`` bytes of the log from ``offset``.
+
+    ``start``/``end`` are byte offsets aligned to whole characters (``start`` may
+    be a little past ``offset``); clients continue reading from ``end``.
+    """
+    size = action.log_size or 0
+    if size == 0:
+        # Actions that never streamed keep their output in the legacy column.
+        data = (action.logs or "").encode("utf-8")
+        start, end = _char_window(data, min(offset, len(data)), offset + limit)
+        return start, end, data[start:end].decode("utf-8")
+
+    start = min(offset, size)
+    if start >= size:
+        return start, start, ""
+    fetch_end = min(start + limit + 2 * _MAX_CHAR_BYTES, size)
+    chunks = db.execute(
+        select(ActionLogChunk.byte_offset, ActionLogChunk.content)
+        .where(
+            ActionLogChunk.action_id == action.id,
+            ActionLogChunk.byte_offset < fetch_end,
+            ActionLogChunk.byte_offset + ActionLogChunk.size > start,
+        )
+        .order_by(ActionLogChunk.byte_offset.asc())
+    ).all()
+    if not chunks:
+        return start, start, ""
+
+    base = chunks[0].byte_offset
+    data = b"".join(chunk.content.encode("utf-8") for chunk in chunks)[: fetch_end - base]
+    window_start, window_end = _char_window(data, start - base, start + limit - base)
+    return base + window_start, base + window_end, data[window_start:window_end].decode("utf-8")
+
+
+def log_size(action: Action) -> int:
+    if action.log_size:
+        return action.log_size
+    return len(action.logs.encode("utf-8")) if action.logs else 0
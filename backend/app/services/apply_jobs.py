@@ -0,0 +1,350 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import get_settings
+from app.core.events import EVENT_ACTIONS_CHANGED, event_broadcaster
+from app.core.notifications import action_hub
+from app.db import SessionLocal
+from app.models.apply_job import (
+    APPLY_JOB_STATUS_FAILED,
+    APPLY_JOB_STATUS_QUEUED,
+    APPLY_JOB_STATUS_RUNNING,
+    APPLY_JOB_STATUS_SUCCEEDED,
+    ApplyJob,
+)
+from app.models.device import Device
+from app.models.rollout import Rollout
+from app.schemas.apply_job import ApplySelector
+from app.services.device_groups import group_member_ids, hostname_glob_condition
+from app.services.profile_apply import DeviceTarget, insert_planned_actions
+from app.services.profile_plans import get_profile_plan
+from app.services.rollouts import plan_rollout_waves, step_rollout
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Jobs submitted to this process's executor and not finished yet.
+_active_jobs: set[int] = set()
+_active_lock = threading.Lock()
+
+_WORKER_PREFIX = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def selector_conditions(selector: ApplySelector) -> list:
+    """SQL conditions on ``Device`` matching a selector (always excluding deleted devices).
+
+    Explicit ``device_ids`` are not included: they can be arbitrarily many, so
+    callers walk them in chunks with ``selector_id_chunks``.
+    """
+    conditions = [Device.is_deleted.is_(False)]
+    if selector.os_type:
+        conditions.append(Device.os_type == selector.os_type)
+    if selector.status:
+        conditions.append(Device.status == selector.status)
+    if selector.hostname_pattern:
+        conditions.append(hostname_glob_condition(selector.hostname_pattern))
+    if selector.group_id is not None:
+        conditions.append(Device.id.in_(group_member_ids(selector.group_id)))
+    return conditions
+
+
+def selector_id_chunks(
+    selector: ApplySelector, chunk_size: int, after_id: int = 0
+) -> Iterator[Optional[Sequence[int]]]:
+    """Sorted chunks of the selector's explicit device ids above ``after_id``.
+
+    Yields a single ``None`` (no id restriction) when the selector has none.
+    """
+    if not selector.device_ids:
+        yield None
+        return
+    device_ids = sorted(set(selector.device_ids))
+    start = bisect_right(device_ids, after_id)
+    for index in range(start, len(device_ids), chunk_size):
+        yield device_ids[index : index + chunk_size]
+
+
+def selected_os_type_counts(db: Session, selector: ApplySelector) -> Counter:
+    """Number of devices the selector matches, per ``os_type``."""
+    conditions = selector_conditions(selector)
+    counts: Counter = Counter()
+    for chunk in selector_id_chunks(selector, get_settings().apply_job_chunk_size):
+        id_conditions = () if chunk is None else (Device.id.in_(chunk),)
+        rows = db.execute(
+            select(Device.os_type, func.count())
+            .where(*conditions, *id_conditions)
+            .group_by(Device.os_type)
+        ).all()
+        counts.update({os_type: count for os_type, count in rows})
+    return counts
+
+
+def _next_chunk(
+    db: Session, selector: ApplySelector, conditions: list, after_id: int, chunk_size: int
+) -> Optional[tuple[list, int]]:
+    """The next devices after ``after_id`` and the cursor to store once they are done."""
+    chunk = next(selector_id_chunks(selector, chunk_size, after_id), ())
+    if chunk is None:
+        rows = db.execute(
+            select(Device.id, Device.os_type)
+            .where(*conditions, Device.id > after_id)
+            .order_by(Device.id.asc())
+            .limit(chunk_size)
+        ).all()
+        return (rows, rows[-1].id) if rows else None
+    if not chunk:
+        return None
+    # Ids that no longer match (deleted, other filters) are skipped, but the
+    # cursor still moves past the whole id chunk.
+    rows = db.execute(
+        select(Device.id, Device.os_type)
+        .where(*conditions, Device.id.in_(chunk))
+        .order_by(Device.id.asc())
+    ).all()
+    return rows, chunk[-1]
+
+
+def _claim(db: Session, job_id: int, owner: str) -> bool:
+    """Take the job if it is queued or its running owner stopped heartbeating."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=get_settings().apply_job_stale_seconds)
+    claimed = db.execute(
+        update(ApplyJob)
+        .where(
+            ApplyJob.id == job_id,
+            or_(
+                ApplyJob.status == APPLY_JOB_STATUS_QUEUED,
+                and_(
+                    ApplyJob.status == APPLY_JOB_STATUS_RUNNING,
+                    or_(ApplyJob.heartbeat_at.is_(None), ApplyJob.heartbeat_at < stale),
+                ),
+            ),
+        )
+        .values(status=APPLY_JOB_STATUS_RUNNING, owner=owner, heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+
+def _save(db: Session, job: ApplyJob, owner: str, **values) -> bool:
+    """Write job progress only while ``owner`` still holds the claim. The caller commits.
+
+    Returns ``False`` if another worker took the job over; the caller must roll
+    back so nothing written in this transaction (e.g. a chunk's actions) lands.
+    """
+    values["heartbeat_at"] = datetime.utcnow()
+    matched = db.execute(
+        update(ApplyJob)
+        .where(ApplyJob.id == job.id, ApplyJob.owner == owner)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if matched != 1:
+        return False
+    for key, value in values.items():
+        set_committed_value(job, key, value)
+    return True
+
+
+def _fail(db: Session, job: ApplyJob, owner: str, message: str) -> None:
+    if _save(
+        db,
+        job,
+        owner,
+        status=APPLY_JOB_STATUS_FAILED,
+        last_error=message,
+        error_count=job.error_count + 1,
+        completed_at=datetime.utcnow(),
+    ):
+        db.commit()
+    else:
+        db.rollback()
+
+
+def process_apply_job(job_id: int) -> None:
+    """Apply a job's profile to its selector in device-id order, committing per chunk.
+
+    Every progress write is conditional on this worker's claim, so a job taken
+    over by another process stops here without inserting duplicate actions.
+    """
+    settings = get_settings()
+    owner = f"{_WORKER_PREFIX}:{uuid.uuid4().hex[:8]}"
+    db = SessionLocal()
+    job = None
+    try:
+        if not _claim(db, job_id, owner):
+            return
+        job = db.get(ApplyJob, job_id)
+
+        base_plan = get_profile_plan(job.profile_id, None)
+        if base_plan is None:
+            _fail(db, job, owner, "Profile not found")
+            return
+        if not base_plan.task_count:
+            _fail(db, job, owner, "Profile has no tasks")
+            return
+        # Pin one plan per os_type for the whole job, even if the profile changes meanwhile.
+        plans: dict[Optional[str], tuple] = {None: base_plan.actions}
+
+        def plan_for(os_type: Optional[str]) -> tuple:
+            if os_type not in plans:
+                plan = get_profile_plan(job.profile_id, os_type)
+                plans[os_type] = plan.actions if plan is not None else ()
+            return plans[os_type]
+
+        selector = ApplySelector.model_validate_json(job.selector)
+        conditions = selector_conditions(selector)
+        rollout = db.query(Rollout).filter(Rollout.apply_job_id == job.id).first()
+        if job.started_at is None:
+            total_devices = sum(selected_os_type_counts(db, selector).values())
+            if rollout is not None:
+                plan_rollout_waves(rollout, total_devices)
+            if not _save(db, job, owner, started_at=datetime.utcnow(), total_devices=total_devices):
+                db.rollback()
+                logger.warning("Apply job %s was taken over by another worker", job_id)
+                return
+            db.commit()
+
+        attempts = 0
+        while True:
+            chunk = _next_chunk(db, selector, conditions, job.cursor_device_id, settings.apply_job_chunk_size)
+            if chunk is None:
+                break
+            rows, cursor = chunk
+
+            if rollout is not None:
+                # Waves are consecutive runs of devices in device-id order.
+                devices = [
+                    DeviceTarget(row.id, row.os_type, (job.processed_devices + index) // rollout.wave_size)
+                    for index, row in enumerate(rows)
+                ]
+            else:
+                devices = [DeviceTarget(row.id, row.os_type) for row in rows]
+            try:
+                created, touched = insert_planned_actions(
+                    db, plan_for, devices, rollout_id=rollout.id if rollout is not None else None
+                )
+            except Exception as exc:
+                db.rollback()
+                logger.exception("Apply job %s failed on a chunk", job_id)
+                attempts += 1
+                if attempts >= settings.apply_job_chunk_attempts:
+                    # The cursor stays before this chunk: no device is skipped,
+                    # and a retried job starts again from here.
+                    _fail(db, job, owner, f"Chunk after device {job.cursor_device_id} failed: {exc}")
+                    return
+                # Visible while the job retries; error_count only counts failures.
+                retrying = f"Retrying chunk after device {job.cursor_device_id}: {exc}"
+                if not _save(db, job, owner, last_error=retrying):
+                    db.rollback()
+                    return
+                db.commit()
+                time.sleep(attempts)
+                continue
+
+            attempts = 0
+            if not _save(
+                db,
+                job,
+                owner,
+                cursor_device_id=cursor,
+                processed_devices=job.processed_devices + len(devices),
+                created_actions=job.created_actions + created,
+                skipped_actions=job.skipped_actions + base_plan.task_count * len(devices) - created,
+            ):
+                db.rollback()
+                logger.warning("Apply job %s was taken over by another worker", job_id)
+                return
+            db.commit()
+            action_hub.notify_many(touched)
+            event_broadcaster.publish_many(EVENT_ACTIONS_CHANGED, touched)
+
+        if not _save(
+            db, job, owner, status=APPLY_JOB_STATUS_SUCCEEDED, completed_at=datetime.utcnow(), last_error=None
+        ):
+            db.rollback()
+            return
+        db.commit()
+        if rollout is not None:
+            # Release the first wave now rather than on the next scheduler pass.
+            step_rollout(db, rollout.id)
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Apply job %s failed", job_id)
+        if job is not None:
+            _fail(db, job, owner, str(exc))
+    finally:
+        db.close()
+
+
+def _forget_job(job_id: int) -> None:
+    with _active_lock:
+        _active_jobs.discard(job_id)
+
+
+def submit_apply_job(job_id: int) -> None:
+    global _executor
+    with _active_lock:
+        if job_id in _active_jobs:
+            return
+        _active_jobs.add(job_id)
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().apply_job_workers, thread_name_prefix="apply-job"
+            )
+        future = _executor.submit(process_apply_job, job_id)
+    future.add_done_callback(lambda _: _forget_job(job_id))
+
+
+def resume_apply_jobs() -> int:
+    """Submit queued jobs and running jobs whose owner stopped heartbeating.
+
+    Runs at startup and periodically; with several processes the claim in
+    ``process_apply_job`` decides which one works on a job.
+    """
+    stale = datetime.utcnow() - timedelta(seconds=get_settings().apply_job_stale_seconds)
+    db = SessionLocal()
+    try:
+        job_ids = db.execute(
+            select(ApplyJob.id)
+            .where(
+                or_(
+                    ApplyJob.status == APPLY_JOB_STATUS_QUEUED,
+                    and_(
+                        ApplyJob.status == APPLY_JOB_STATUS_RUNNING,
+                        or_(ApplyJob.heartbeat_at.is_(None), ApplyJob.heartbeat_at < stale),
+                    ),
+                )
+            )
+            .order_by(ApplyJob.id.asc())
+        ).scalars().all()
+    finally:
+        db.close()
+    for job_id in job_ids:
+        submit_apply_job(job_id)
+    return len(job_ids)
+
+
+def shutdown_apply_jobs() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            # Running jobs keep their cursor and resume on the next start.
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
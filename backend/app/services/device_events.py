@@ -0,0 +1,30 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.checkin_buffer import checkin_buffer
+from app.core.events import EVENT_DEVICE_STATUS, event_broadcaster
+from app.models.device import Device
+
+CHUNK_SIZE = 500
+
+
+def _publish_checkin_changes(db: Session, device_ids: list[int]) -> None:
+    # Heartbeats reach the database through the check-in buffer, so status
+    # transitions are published once they are flushed and committed.
+    if not event_broadcaster.subscriber_count():
+        return
+    for start in range(0, len(device_ids), CHUNK_SIZE):
+        rows = db.execute(
+            select(Device.id, Device.status, Device.os_version).where(
+                Device.id.in_(device_ids[start : start + CHUNK_SIZE]), Device.is_deleted.is_(False)
+            )
+        ).all()
+        for row in rows:
+            event_broadcaster.publish(
+                EVENT_DEVICE_STATUS, row.id, status=row.status, os_version=row.os_version
+            )
+
+
+def register_device_event_listeners() -> None:
+    """Publish status changes written by check-in flushes. Called at startup."""
+    checkin_buffer.add_flush_listener(_publish_checkin_changes)
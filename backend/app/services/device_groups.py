@@ -0,0 +1,181 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.checkin_buffer import checkin_buffer
+from app.models.device import Device
+from app.models.device_group import DEVICE_GROUP_KIND_DYNAMIC, DeviceGroup, DeviceGroupMember
+from app.schemas.device_group import GroupRules
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+
+# Device columns dynamic rules may look at.
+_RULE_COLUMNS = (
+    Device.id,
+    Device.hostname,
+    Device.status,
+    Device.os_type,
+    Device.os_version,
+    Device.is_deleted,
+)
+
+
+# Hostname globs: ``*`` and ``?`` only, case-insensitive. Group rules (Python)
+# and apply selectors (SQL) share these two helpers so they always agree.
+@lru_cache(maxsize=256)
+def _hostname_glob_regex(pattern: str) -> re.Pattern:
+    parts = (".*" if ch == "*" else "." if ch == "?" else re.escape(ch) for ch in pattern.lower())
+    return re.compile("".join(parts), re.DOTALL)
+
+
+def hostname_glob_matches(pattern: str, hostname: str) -> bool:
+    return _hostname_glob_regex(pattern).fullmatch(hostname.lower()) is not None
+
+
+def hostname_glob_condition(pattern: str):
+    """SQL condition on ``Device.hostname`` equivalent to ``hostname_glob_matches``."""
+    escaped = pattern.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    like = escaped.replace("*", "%").replace("?", "_")
+    # Lower both sides: LIKE is case-insensitive on SQLite but not on PostgreSQL.
+    return func.lower(Device.hostname).like(like, escape="\\")
+
+
+def rules_match(rules: GroupRules, device) -> bool:
+    """Evaluate dynamic rules against a row carrying the ``_RULE_COLUMNS`` fields.
+
+    This is the single definition of rule semantics, used by both full rebuilds
+    and incremental per-device updates.
+    """
+    if device.is_deleted:
+        return False
+    if rules.os_type and device.os_type != rules.os_type:
+        return False
+    if rules.status and device.status != rules.status:
+        return False
+    if rules.os_version_prefix and not (device.os_version or "").startswith(rules.os_version_prefix):
+        return False
+    if rules.hostname_pattern and not hostname_glob_matches(rules.hostname_pattern, device.hostname):
+        return False
+    return True
+
+
+def _chunks(values: Sequence[int]) -> Iterable[Sequence[int]]:
+    for start in range(0, len(values), CHUNK_SIZE):
+        yield values[start : start + CHUNK_SIZE]
+
+
+def add_members(db: Session, group_id: int, device_ids: Iterable[int]) -> int:
+    """Insert memberships that do not exist yet; returns how many were added. The caller commits."""
+    added = 0
+    for chunk in _chunks(sorted(set(device_ids))):
+        existing = set(
+            db.execute(
+                select(DeviceGroupMember.device_id).where(
+                    DeviceGroupMember.group_id == group_id, DeviceGroupMember.device_id.in_(chunk)
+                )
+            ).scalars()
+        )
+        rows = [{"group_id": group_id, "device_id": device_id} for device_id in chunk if device_id not in existing]
+        if rows:
+            db.execute(insert(DeviceGroupMember), rows)
+            added += len(rows)
+    return added
+
+
+def remove_members(db: Session, group_id: int, device_ids: Iterable[int]) -> int:
+    removed = 0
+    for chunk in _chunks(sorted(set(device_ids))):
+        result = db.execute(
+            delete(DeviceGroupMember).where(
+                DeviceGroupMember.group_id == group_id, DeviceGroupMember.device_id.in_(chunk)
+            )
+        )
+        removed += result.rowcount
+    return removed
+
+
+def rebuild_group_membership(db: Session, group: DeviceGroup) -> None:
+    """Recompute a dynamic group from scratch, e.g. after its rules change. The caller commits."""
+    rules = GroupRules.model_validate_json(group.rules or "{}")
+    desired: set[int] = set()
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(*_RULE_COLUMNS).where(Device.id > last_id).order_by(Device.id.asc()).limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        desired.update(row.id for row in rows if rules_match(rules, row))
+        last_id = rows[-1].id
+
+    current = set(
+        db.execute(
+            select(DeviceGroupMember.device_id).where(DeviceGroupMember.group_id == group.id)
+        ).scalars()
+    )
+    remove_members(db, group.id, current - desired)
+    add_members(db, group.id, desired - current)
+
+
+def _dynamic_groups(db: Session) -> list[tuple[int, GroupRules]]:
+    rows = db.execute(
+        select(DeviceGroup.id, DeviceGroup.rules).where(DeviceGroup.kind == DEVICE_GROUP_KIND_DYNAMIC)
+    ).all()
+    return [(row.id, GroupRules.model_validate_json(row.rules or "{}")) for row in rows]
+
+
+def refresh_device_memberships(db: Session, device_ids: Iterable[int]) -> None:
+    """Re-evaluate every dynamic group for just ``device_ids``. The caller commits."""
+    device_ids = sorted(set(device_ids))
+    if not device_ids:
+        return
+    groups = _dynamic_groups(db)
+    if not groups:
+        return
+    group_ids = [group_id for group_id, _ in groups]
+
+    for chunk in _chunks(device_ids):
+        devices = db.execute(select(*_RULE_COLUMNS).where(Device.id.in_(chunk))).all()
+        desired = {
+            (group_id, device.id)
+            for device in devices
+            for group_id, rules in groups
+            if rules_match(rules, device)
+        }
+        current = set(
+            db.execute(
+                select(DeviceGroupMember.group_id, DeviceGroupMember.device_id).where(
+                    DeviceGroupMember.device_id.in_(chunk), DeviceGroupMember.group_id.in_(group_ids)
+                )
+            ).tuples()
+        )
+        for group_id in group_ids:
+            stale = [device_id for gid, device_id in current - desired if gid == group_id]
+            if stale:
+                remove_members(db, group_id, stale)
+        missing = [{"group_id": gid, "device_id": device_id} for gid, device_id in desired - current]
+        if missing:
+            db.execute(insert(DeviceGroupMember), missing)
+
+
+def group_member_ids(group_id: int):
+    """Subquery of device ids in a group, for use in ``Device.id.in_(...)`` filters."""
+    return select(DeviceGroupMember.device_id).where(DeviceGroupMember.group_id == group_id)
+
+
+def _refresh_after_checkin_flush(db: Session, device_ids: list[int]) -> None:
+    try:
+        refresh_device_memberships(db, device_ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Refreshing group memberships after check-in flush failed")
+
+
+checkin_buffer.add_flush_listener(_refresh_after_checkin_flush)
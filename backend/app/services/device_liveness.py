@@ -0,0 +1,120 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.checkin_buffer import flush_checkins
+from app.core.config import get_settings
+from app.core.events import EVENT_DEVICE_STATUS, event_broadcaster
+from app.db import SessionLocal
+from app.models.device import DEVICE_STATUS_OFFLINE, DEVICE_STATUS_STALE, Device
+from app.services.device_groups import refresh_device_memberships
+from app.services.fleet_counters import CounterDeltas, bump_counters, device_change_deltas
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def _flip(db: Session, ids: list[int], old_status: str, new_status: str, window) -> list[int]:
+    """Compare-and-set ``old_status`` -> ``new_status``; returns the ids actually flipped.
+
+    ``window`` is re-checked so a check-in committed since the candidates were
+    read keeps its status.
+    """
+    statement = (
+        update(Device)
+        .where(Device.id.in_(ids), Device.status == old_status, *window)
+        .values(status=new_status)
+        .execution_options(synchronize_session=False)
+    )
+    if getattr(db.get_bind().dialect, "update_returning", False):
+        return list(db.execute(statement.returning(Device.id)).scalars())
+    if db.execute(statement).rowcount == len(ids):
+        return ids
+    return list(
+        db.execute(
+            select(Device.id).where(Device.id.in_(ids), Device.status == new_status)
+        ).scalars()
+    )
+
+
+def _sweep_level(db: Session, new_status: str, window, skip: tuple[str, ...]) -> int:
+    swept = 0
+    while True:
+        # Walks the last_check_in index; devices already at (or past) this
+        # level are skipped in the index scan, not rewritten.
+        rows = db.execute(
+            select(Device.id, Device.status, Device.os_type, Device.os_version)
+            .where(Device.is_deleted.is_(False), Device.status.not_in(skip), *window)
+            .order_by(Device.last_check_in.asc())
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return swept
+
+        by_status: dict[str, list] = defaultdict(list)
+        for row in rows:
+            by_status[row.status].append(row)
+        flipped = []
+        deltas = CounterDeltas()
+        for old_status, group in by_status.items():
+            done = set(_flip(db, [row.id for row in group], old_status, new_status, window))
+            for row in group:
+                if row.id in done:
+                    flipped.append(row)
+                    deltas.update(
+                        device_change_deltas((old_status, row.os_type), (new_status, row.os_type))
+                    )
+        bump_counters(db, deltas)
+        refresh_device_memberships(db, [row.id for row in flipped])
+        db.commit()
+
+        for row in flipped:
+            event_broadcaster.publish(
+                EVENT_DEVICE_STATUS, row.id, status=new_status, os_version=row.os_version
+            )
+        swept += len(flipped)
+        if len(rows) < BATCH_SIZE:
+            return swept
+
+
+def sweep_device_liveness(db: Session, now: datetime | None = None) -> dict[str, int]:
+    """Mark devices whose last check-in is too old stale, then offline.
+
+    Thresholds are multiples of the agent poll interval. The agent's next
+    heartbeat writes its own status back, which the check-in flush counts and
+    publishes like any other status change. Commits per batch.
+    """
+    settings = get_settings()
+    now = now or datetime.utcnow()
+    offline_before = now - timedelta(seconds=settings.device_offline_after_seconds)
+    stale_before = now - timedelta(seconds=settings.device_stale_after_seconds)
+    offline = _sweep_level(
+        db,
+        DEVICE_STATUS_OFFLINE,
+        (Device.last_check_in < offline_before,),
+        (DEVICE_STATUS_OFFLINE,),
+    )
+    stale = _sweep_level(
+        db,
+        DEVICE_STATUS_STALE,
+        (Device.last_check_in >= offline_before, Device.last_check_in < stale_before),
+        (DEVICE_STATUS_STALE, DEVICE_STATUS_OFFLINE),
+    )
+    return {DEVICE_STATUS_STALE: stale, DEVICE_STATUS_OFFLINE: offline}
+
+
+def run_liveness_sweep() -> dict[str, int]:
+    # Write buffered check-ins first so devices that did check in are not swept.
+    flush_checkins()
+    db = SessionLocal()
+    try:
+        swept = sweep_device_liveness(db)
+    finally:
+        db.close()
+    if any(swept.values()):
+        logger.info("Liveness sweep: %(stale)d stale, %(offline)d offline", swept)
+    return swept
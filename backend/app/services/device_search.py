@@ -0,0 +1,141 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import literal_column, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.models.device import Device
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "devices_fts"
+# The trigram tokenizer matches substrings but needs at least three characters.
+FTS_MIN_QUERY_LENGTH = 3
+
+_fts_enabled = False
+
+# External-content FTS5 index over devices, kept in sync by triggers. The update
+# trigger only fires when hostname/hardware_summary are written, so check-ins
+# that touch status/last_check_in do not rewrite the index.
+_FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        hostname, hardware_summary, content='devices', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER devices_fts_insert AFTER INSERT ON devices BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, hostname, hardware_summary)
+        VALUES (new.id, new.hostname, new.hardware_summary);
+    END
+    """,
+    f"""
+    CREATE TRIGGER devices_fts_delete AFTER DELETE ON devices BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, hostname, hardware_summary)
+        VALUES ('delete', old.id, old.hostname, old.hardware_summary);
+    END
+    """,
+    f"""
+    CREATE TRIGGER devices_fts_update AFTER UPDATE OF hostname, hardware_summary ON devices BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, hostname, hardware_summary)
+        VALUES ('delete', old.id, old.hostname, old.hardware_summary);
+        INSERT INTO {FTS_TABLE}(rowid, hostname, hardware_summary)
+        VALUES (new.id, new.hostname, new.hardware_summary);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+
+def setup_device_search(engine: Engine) -> bool:
+    """Create the FTS5 index on SQLite builds that support it; returns whether it is used."""
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        _fts_enabled = False
+        return False
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE},
+            ).first()
+            if exists is None:
+                for statement in _FTS_DDL:
+                    conn.execute(text(statement))
+        _fts_enabled = True
+    except OperationalError:
+        # SQLite without FTS5 or the trigram tokenizer (< 3.34).
+        logger.warning("FTS5 trigram search unavailable; device search falls back to LIKE")
+        _fts_enabled = False
+    return _fts_enabled
+
+
+def fts_enabled() -> bool:
+    return _fts_enabled
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _fts_ids(match: str):
+    return select(literal_column("rowid")).select_from(text(FTS_TABLE)).where(
+        text(f"{FTS_TABLE} MATCH :match").bindparams(match=match)
+    )
+
+
+def hostname_prefix_condition(prefix: str):
+    # A range on the unique hostname index instead of LIKE, which SQLite only
+    # serves from an index with case_sensitive_like.
+    return (Device.hostname >= prefix) & (Device.hostname < prefix + "\U0010ffff")
+
+
+def hostname_contains_condition(value: str):
+    if _fts_enabled and len(value) >= FTS_MIN_QUERY_LENGTH:
+        return Device.id.in_(_fts_ids(f"hostname : {_fts_phrase(value)}"))
+    return Device.hostname.like(f"%{_escape_like(value)}%", escape="\\")
+
+
+def search_condition(query: str):
+    """Substring match over hostname and hardware_summary."""
+    if _fts_enabled and len(query) >= FTS_MIN_QUERY_LENGTH:
+        return Device.id.in_(_fts_ids(_fts_phrase(query)))
+    pattern = f"%{_escape_like(query)}%"
+    return or_(
+        Device.hostname.like(pattern, escape="\\"),
+        Device.hardware_summary.like(pattern, escape="\\"),
+    )
+
+
+def device_filter_conditions(
+    *,
+    hostname_prefix: Optional[str] = None,
+    hostname_contains: Optional[str] = None,
+    status: Optional[str] = None,
+    os_type: Optional[str] = None,
+    profile_id: Optional[int] = None,
+    checked_in_after: Optional[datetime] = None,
+    checked_in_before: Optional[datetime] = None,
+) -> list:
+    conditions = []
+    if hostname_prefix:
+        conditions.append(hostname_prefix_condition(hostname_prefix))
+    if hostname_contains:
+        conditions.append(hostname_contains_condition(hostname_contains))
+    if status:
+        conditions.append(Device.status == status)
+    if os_type:
+        conditions.append(Device.os_type == os_type)
+    if profile_id is not None:
+        conditions.append(Device.profile_id == profile_id)
+    if checked_in_after is not None:
+        conditions.append(Device.last_check_in >= checked_in_after)
+    if checked_in_before is not None:
+        conditions.append(Device.last_check_in < checked_in_before)
+    return conditions
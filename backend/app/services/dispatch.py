@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.events import EVENT_ACTIONS_CHANGED, event_broadcaster
+from app.db import SessionLocal
+from app.models.action import (
+    ACTION_STATUS_FAILED,
+    ACTION_STATUS_PENDING,
+    ACTION_STATUS_RUNNING,
+    Action,
+)
+from app.services.fleet_counters import track_actions
+from app.services.resource_versions import bump_device_actions
+
+_CLAIM_COLUMNS = (Action.id, Action.type, Action.payload, Action.payload_digest, Action.software_id)
+
+
+def _pending_ids(device_id: int, limit: int, now: datetime):
+    return (
+        select(Action.id)
+        .where(
+            Action.device_id == device_id,
+            Action.status == ACTION_STATUS_PENDING,
+            or_(Action.not_before.is_(None), Action.not_before <= now),
+        )
+        .order_by(Action.id.asc())
+        .limit(limit)
+        # Rendered only where supported (PostgreSQL); concurrent claimers skip
+        # each other's rows instead of blocking on them.
+        .with_for_update(skip_locked=True)
+    )
+
+
+def _claim_values(now: datetime) -> dict:
+    return {
+        "status": ACTION_STATUS_RUNNING,
+        "dispatched_at": now,
+        "lease_expires_at": now + timedelta(seconds=get_settings().action_lease_seconds),
+        "attempts": Action.attempts + 1,
+    }
+
+
+def claim_pending_actions(db: Session, device_id: int, limit: int) -> list[Row]:
+    """Atomically flip up to ``limit`` pending actions to running and return them.
+
+    Overlapping heartbeats for the same device never receive the same action:
+    the status check is part of the UPDATE itself, so only one claimer wins a row.
+    Each claimed action gets a lease; see ``reap_expired_leases``. The caller commits.
+    """
+    if limit <= 0:
+        return []
+
+    now = datetime.utcnow()
+    if getattr(db.get_bind().dialect, "update_returning", False):
+        stmt = (
+            update(Action)
+            .where(
+                Action.id.in_(_pending_ids(device_id, limit, now).scalar_subquery()),
+                Action.status == ACTION_STATUS_PENDING,
+            )
+            .values(**_claim_values(now))
+            .returning(*_CLAIM_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = sorted(db.execute(stmt).all(), key=lambda row: row.id)
+        if claimed:
+            track_actions(db, ACTION_STATUS_PENDING, ACTION_STATUS_RUNNING, len(claimed))
+            bump_device_actions(db, [device_id])
+        return claimed
+
+    # Fallback without UPDATE ... RETURNING: compare-and-set each candidate row
+    # and keep only the ones this transaction actually flipped.
+    candidate_ids = db.execute(_pending_ids(device_id, limit, now)).scalars().all()
+    claimed_ids = []
+    for action_id in candidate_ids:
+        result = db.execute(
+            update(Action)
+            .where(Action.id == action_id, Action.status == ACTION_STATUS_PENDING)
+            .values(**_claim_values(now))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed_ids.append(action_id)
+    if not claimed_ids:
+        return []
+    track_actions(db, ACTION_STATUS_PENDING, ACTION_STATUS_RUNNING, len(claimed_ids))
+    bump_device_actions(db, [device_id])
+    return db.execute(
+        select(*_CLAIM_COLUMNS).where(Action.id.in_(claimed_ids)).order_by(Action.id.asc())
+    ).all()
+
+
+def extend_lease(db: Session, action_id: int) -> None:
+    """Push out the lease of a running action the agent is still reporting on."""
+    now = datetime.utcnow()
+    db.execute(
+        update(Action)
+        .where(Action.id == action_id, Action.status == ACTION_STATUS_RUNNING)
+        .values(lease_expires_at=now + timedelta(seconds=get_settings().action_lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reap_expired_leases(db: Session, now: datetime | None = None) -> tuple[int, int]:
+    """Re-queue or fail one batch of running actions whose lease expired.
+
+    Actions below ``action_max_attempts`` go back to pending with exponential
+    backoff via ``not_before``; the rest are failed. Returns ``(requeued, failed)``.
+    """
+    settings = get_settings()
+    now = now or datetime.utcnow()
+
+    expired = db.execute(
+        select(Action.id, Action.device_id, Action.attempts)
+        .where(Action.status == ACTION_STATUS_RUNNING, Action.lease_expires_at < now)
+        .order_by(Action.lease_expires_at.asc())
+        .limit(settings.action_reaper_batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not expired:
+        return 0, 0
+
+    requeue_rows = []
+    fail_ids = []
+    for row in expired:
+        if row.attempts < settings.action_max_attempts:
+            backoff = settings.action_retry_backoff_seconds * 2 ** max(row.attempts - 1, 0)
+            requeue_rows.append({"row_id": row.id, "retry_at": now + timedelta(seconds=backoff)})
+        else:
+            fail_ids.append(row.id)
+
+    # Both statements re-check the lease so a result posted meanwhile wins.
+    still_expired = (
+        Action.status == ACTION_STATUS_RUNNING,
+        Action.lease_expires_at < now,
+    )
+    if requeue_rows:
+        # Core table statement: per-row backoff values go through executemany.
+        actions = Action.__table__
+        requeued = db.execute(
+            update(actions)
+            .where(actions.c.id == bindparam("row_id"), *still_expired)
+            .values(status=ACTION_STATUS_PENDING, lease_expires_at=None, not_before=bindparam("retry_at")),
+            requeue_rows,
+        ).rowcount
+        track_actions(db, ACTION_STATUS_RUNNING, ACTION_STATUS_PENDING, max(requeued, 0))
+    if fail_ids:
+        failed = db.execute(
+            update(Action)
+            .where(Action.id.in_(fail_ids), *still_expired)
+            .values(
+                status=ACTION_STATUS_FAILED,
+                lease_expires_at=None,
+                completed_at=now,
+                logs=func.coalesce(Action.logs, "Lease expired; maximum attempts reached"),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        track_actions(db, ACTION_STATUS_RUNNING, ACTION_STATUS_FAILED, failed)
+    device_ids = {row.device_id for row in expired}
+    bump_device_actions(db, device_ids)
+    db.commit()
+    event_broadcaster.publish_many(EVENT_ACTIONS_CHANGED, device_ids)
+    return len(requeue_rows), len(fail_ids)
+
+
+def run_lease_reaper() -> tuple[int, int]:
+    batch_size = get_settings().action_reaper_batch_size
+    requeued_total = failed_total = 0
+    db = SessionLocal()
+    try:
+        while True:
+            requeued, failed = reap_expired_leases(db)
+            requeued_total += requeued
+            failed_total += failed
+            if requeued + failed < batch_size:
+                break
+    finally:
+        db.close()
+    return requeued_total, failed_total
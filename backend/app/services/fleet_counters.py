@@ -0,0 +1,199 @@
+import logging
+import random
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.checkin_buffer import checkin_buffer
+from app.core.config import get_settings
+from app.db import SessionLocal
+from app.models.action import Action
+from app.models.device import Device
+from app.models.fleet_counter import (
+    COUNTER_SCOPE_ACTION_STATUS,
+    COUNTER_SCOPE_DEVICE_OS_TYPE,
+    COUNTER_SCOPE_DEVICE_STATUS,
+    FleetCounter,
+)
+
+logger = logging.getLogger(__name__)
+
+# Counts keyed by (scope, key); only non-deleted devices are counted.
+CounterDeltas = Counter
+
+_SHARD_KEY = "fleet_counters.shard"
+
+
+def device_deltas(status: Optional[str], os_type: Optional[str], sign: int = 1) -> CounterDeltas:
+    return CounterDeltas(
+        {
+            (COUNTER_SCOPE_DEVICE_STATUS, status or "unknown"): sign,
+            (COUNTER_SCOPE_DEVICE_OS_TYPE, os_type or "unknown"): sign,
+        }
+    )
+
+
+def device_change_deltas(old: Optional[tuple], new: Optional[tuple]) -> CounterDeltas:
+    """Deltas for a device moving from ``old`` to ``new`` ``(status, os_type)``.
+
+    ``None`` stands for "not counted" (missing or soft-deleted).
+    """
+    deltas = CounterDeltas()
+    if old is not None:
+        deltas.update(device_deltas(*old, sign=-1))
+    if new is not None:
+        deltas.update(device_deltas(*new))
+    return deltas
+
+
+def action_deltas(old_status: Optional[str], new_status: Optional[str], count: int = 1) -> CounterDeltas:
+    deltas = CounterDeltas()
+    if count and old_status != new_status:
+        if old_status is not None:
+            deltas[(COUNTER_SCOPE_ACTION_STATUS, old_status)] -= count
+        if new_status is not None:
+            deltas[(COUNTER_SCOPE_ACTION_STATUS, new_status)] += count
+    return deltas
+
+
+def _session_shard(db: Session) -> int:
+    # Sessions pick a random shard and keep it, so one transaction's increments
+    # to a counter always land on the same row.
+    shard = db.info.get(_SHARD_KEY)
+    if shard is None:
+        shard = db.info[_SHARD_KEY] = random.randrange(max(get_settings().fleet_counter_shards, 1))
+    return shard
+
+
+def _increment(db: Session, scope: str, key: str, shard: int, delta: int) -> None:
+    matched = db.execute(
+        update(FleetCounter)
+        .where(FleetCounter.scope == scope, FleetCounter.key == key, FleetCounter.shard == shard)
+        .values(count=FleetCounter.count + delta)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if matched:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(FleetCounter).values(scope=scope, key=key, shard=shard, count=delta))
+    except IntegrityError:
+        db.execute(
+            update(FleetCounter)
+            .where(FleetCounter.scope == scope, FleetCounter.key == key, FleetCounter.shard == shard)
+            .values(count=FleetCounter.count + delta)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def bump_counters(db: Session, deltas: CounterDeltas) -> None:
+    """Apply ``deltas`` inside the caller's transaction. The caller commits.
+
+    Increments are relative (``count = count + n``), so concurrent writers
+    never overwrite each other, and go to the session's shard, so concurrent
+    transactions mostly update different rows. Rows seen for the first time
+    are inserted under a savepoint and retried as an increment if another
+    transaction created them first.
+    """
+    shard = _session_shard(db)
+    for (scope, key), delta in sorted(deltas.items()):
+        if delta:
+            _increment(db, scope, key, shard, delta)
+
+
+def track_device(db: Session, old: Optional[tuple], new: Optional[tuple]) -> None:
+    bump_counters(db, device_change_deltas(old, new))
+
+
+def track_actions(
+    db: Session, old_status: Optional[str], new_status: Optional[str], count: int = 1
+) -> None:
+    bump_counters(db, action_deltas(old_status, new_status, count))
+
+
+def read_counters(db: Session) -> dict[str, dict[str, int]]:
+    summary: dict[str, dict[str, int]] = {
+        COUNTER_SCOPE_DEVICE_STATUS: {},
+        COUNTER_SCOPE_DEVICE_OS_TYPE: {},
+        COUNTER_SCOPE_ACTION_STATUS: {},
+    }
+    rows = db.execute(
+        select(FleetCounter.scope, FleetCounter.key, func.sum(FleetCounter.count).label("count"))
+        .group_by(FleetCounter.scope, FleetCounter.key)
+    )
+    for row in rows:
+        if row.count:
+            summary.setdefault(row.scope, {})[row.key] = row.count
+    return summary
+
+
+def _actual_counts(db: Session) -> CounterDeltas:
+    actual = CounterDeltas()
+    active = Device.is_deleted.is_(False)
+    for status, count in db.execute(
+        select(Device.status, func.count()).where(active).group_by(Device.status)
+    ):
+        actual[(COUNTER_SCOPE_DEVICE_STATUS, status or "unknown")] += count
+    for os_type, count in db.execute(
+        select(Device.os_type, func.count()).where(active).group_by(Device.os_type)
+    ):
+        actual[(COUNTER_SCOPE_DEVICE_OS_TYPE, os_type or "unknown")] += count
+    for status, count in db.execute(select(Action.status, func.count()).group_by(Action.status)):
+        actual[(COUNTER_SCOPE_ACTION_STATUS, status)] += count
+    return actual
+
+
+def reconcile_fleet_counters(db: Session) -> int:
+    """Recompute every counter from the source tables and correct drift.
+
+    The counter rows are locked before counting, so increments from
+    concurrent transactions wait and land on top of the corrected values.
+    Corrections are applied as increments to shard 0. Returns how many
+    counters were wrong. Check-ins still in the write-behind buffer are
+    counted when they are flushed.
+
+    SQLite ignores ``FOR UPDATE`` and does not read the counters and the
+    tables in one snapshot. There, a change committed while this runs can
+    be counted twice; the error is bounded by the writes that overlapped the
+    pass, and the next pass corrects it.
+    """
+    stored = CounterDeltas()
+    for row in db.execute(
+        select(FleetCounter.scope, FleetCounter.key, FleetCounter.count).with_for_update()
+    ):
+        stored[(row.scope, row.key)] += row.count
+    actual = _actual_counts(db)
+    drift = 0
+    for scope, key in sorted(stored.keys() | actual.keys()):
+        correction = actual.get((scope, key), 0) - stored.get((scope, key), 0)
+        if correction:
+            drift += 1
+            _increment(db, scope, key, 0, correction)
+    db.commit()
+    return drift
+
+
+def run_counter_reconciliation() -> int:
+    db = SessionLocal()
+    try:
+        drift = reconcile_fleet_counters(db)
+    finally:
+        db.close()
+    if drift:
+        logger.warning("Corrected %d drifted fleet counters", drift)
+    return drift
+
+
+def _track_checkin_status(db: Session, changes: list[tuple]) -> None:
+    deltas = CounterDeltas()
+    for _, old_status, new_status, os_type in changes:
+        deltas.update(device_change_deltas((old_status, os_type), (new_status, os_type)))
+    bump_counters(db, deltas)
+
+
+def register_counter_listeners() -> None:
+    """Count device status changes written by check-in flushes. Called at startup."""
+    checkin_buffer.add_status_listener(_track_checkin_status)
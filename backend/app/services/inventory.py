@@ -0,0 +1,9 @@
+import hashlib
+from typing import Optional
+
+
+def inventory_hash(hardware_summary: Optional[str]) -> Optional[str]:
+    """Content hash agents and the server compare to skip resending unchanged inventory."""
+    if not hardware_summary:
+        return None
+    return hashlib.sha256(hardware_summary.encode("utf-8")).hexdigest()
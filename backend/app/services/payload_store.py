@@ -0,0 +1,90 @@
+import hashlib
+from typing import Iterable, Optional
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.models.payload_blob import PayloadBlob
+
+_settings = get_settings()
+
+# Blobs are immutable, so entries only leave the cache through LRU eviction.
+payload_blob_cache = TTLCache(
+    "payload_blobs", _settings.payload_cache_max_entries, ttl_seconds=24 * 3600
+)
+
+# Blobs written by the session's open transaction, cached once it commits.
+_PENDING_KEY = "payload_store.pending_blobs"
+_INSERT_IGNORING_CONFLICTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def payload_digest(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def blob_digest(content: Optional[str]) -> Optional[str]:
+    """Digest ``content`` is stored under, or ``None`` if it stays inline. Writes nothing."""
+    if content is None or len(content.encode("utf-8")) < get_settings().payload_store_min_bytes:
+        return None
+    return payload_digest(content)
+
+
+def store_payload(db: Session, content: Optional[str]) -> Optional[str]:
+    """Store ``content`` in the blob table and return its digest.
+
+    Returns ``None`` for payloads below ``payload_store_min_bytes``; those stay
+    inline on the action row. The caller commits; the blob only enters the
+    in-memory cache once that commit succeeds.
+    """
+    digest = blob_digest(content)
+    if digest is None:
+        return None
+    # A cached digest has a committed row; anything else is (re)inserted, and
+    # a concurrent or earlier insert of the same content is simply kept.
+    if payload_blob_cache.get(digest, None) is not None:
+        return digest
+    values = {"digest": digest, "content": content, "size": len(content.encode("utf-8"))}
+    dialect = db.get_bind().dialect.name
+    if dialect in _INSERT_IGNORING_CONFLICTS:
+        statement = _INSERT_IGNORING_CONFLICTS[dialect](PayloadBlob).values(**values)
+        db.execute(statement.on_conflict_do_nothing())
+    elif db.get(PayloadBlob, digest) is None:
+        db.execute(insert(PayloadBlob).values(**values))
+    db.info.setdefault(_PENDING_KEY, {})[digest] = content
+    return digest
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_blobs(session) -> None:
+    for digest, content in session.info.pop(_PENDING_KEY, {}).items():
+        payload_blob_cache.set(digest, content)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_blobs(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def load_payloads(db: Session, digests: Iterable[str]) -> dict[str, str]:
+    """Resolve digests to content, serving hot blobs from the in-memory LRU."""
+    contents: dict[str, str] = {}
+    missing = set()
+    for digest in set(digests):
+        content = payload_blob_cache.get(digest, None)
+        if content is None:
+            missing.add(digest)
+        else:
+            contents[digest] = content
+
+    if missing:
+        rows = db.execute(
+            select(PayloadBlob.digest, PayloadBlob.content).where(PayloadBlob.digest.in_(missing))
+        ).all()
+        for row in rows:
+            payload_blob_cache.set(row.digest, row.content)
+            contents[row.digest] = row.content
+    return contents
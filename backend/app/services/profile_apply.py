@@ -0,0 +1,172 @@
+import json
+from typing import Callable, Iterable, NamedTuple, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.action import ACTION_STATUS_HELD, ACTION_STATUS_PENDING, Action
+from app.models.profile_task import ProfileTask
+from app.models.script import Script
+from app.models.software_package import SoftwarePackage
+from app.services.fleet_counters import track_actions
+from app.services.payload_store import blob_digest, store_payload
+from app.services.resource_versions import bump_device_actions
+
+INSERT_CHUNK_SIZE = 1000
+
+
+class PlannedAction(NamedTuple):
+    action_type: str
+    payload: Optional[str]
+    # Set when the payload is large enough to be stored once as a shared blob.
+    payload_digest: Optional[str]
+    script_id: Optional[int]
+    software_id: Optional[int]
+    # target_os_type values of the referenced script/software; a device with an
+    # os_type must match every one of them.
+    os_constraints: tuple[str, ...]
+
+    def allows(self, os_type: Optional[str]) -> bool:
+        return not os_type or all(constraint == os_type for constraint in self.os_constraints)
+
+
+class DeviceTarget(NamedTuple):
+    id: int
+    os_type: Optional[str]
+    # Rollout wave the device belongs to; only used with ``rollout_id``.
+    wave: Optional[int] = None
+
+
+def software_payload(software: SoftwarePackage) -> str:
+    return json.dumps(
+        {
+            "software_id": software.id,
+            "name": software.name,
+            "installer_type": software.installer_type,
+            "source_type": software.source_type,
+            "source": software.source,
+            "install_args": software.install_args,
+            "uninstall_args": software.uninstall_args,
+            "target_os": software.target_os_type,
+            "version": software.version,
+        }
+    )
+
+
+def plan_profile_tasks(db: Session, tasks: Sequence[ProfileTask]) -> list[PlannedAction]:
+    """Resolve each task's payload once, dropping tasks that can never produce an action.
+
+    Device-independent checks (missing references, script language) happen here;
+    OS compatibility is left to ``PlannedAction.allows``. Nothing is written: large
+    payloads only get their blob digest here and are stored by
+    ``insert_planned_actions``.
+    """
+    script_ids = {task.script_id for task in tasks if task.script_id is not None}
+    software_ids = {task.software_id for task in tasks if task.software_id is not None}
+    scripts = (
+        {script.id: script for script in db.query(Script).filter(Script.id.in_(script_ids))}
+        if script_ids
+        else {}
+    )
+    software_by_id = (
+        {
+            software.id: software
+            for software in db.query(SoftwarePackage).filter(SoftwarePackage.id.in_(software_ids))
+        }
+        if software_ids
+        else {}
+    )
+
+    planned: list[PlannedAction] = []
+    for task in tasks:
+        payload: str | None = None
+        os_constraints: list[str] = []
+
+        if task.action_type == "install_software":
+            software = software_by_id.get(task.software_id) if task.software_id is not None else None
+            if software is None:
+                continue
+            if software.target_os_type:
+                os_constraints.append(software.target_os_type)
+            payload = software_payload(software)
+
+        if task.script_id is not None:
+            script = scripts.get(task.script_id)
+            if script is None:
+                continue
+            if task.action_type in ("powershell_script", "powershell_inline") and script.language != "powershell":
+                continue
+            if script.target_os_type:
+                os_constraints.append(script.target_os_type)
+            payload = script.content
+
+        if task.action_type in {"powershell_inline", "bash_inline"} and payload is None:
+            # Skip tasks that require a script payload when none is available
+            continue
+
+        planned.append(
+            PlannedAction(
+                action_type=task.action_type,
+                payload=payload,
+                payload_digest=blob_digest(payload),
+                script_id=task.script_id,
+                software_id=task.software_id,
+                os_constraints=tuple(os_constraints),
+            )
+        )
+    return planned
+
+
+def insert_planned_actions(
+    db: Session,
+    plan_for: Callable[[Optional[str]], Sequence[PlannedAction]],
+    devices: Iterable[DeviceTarget],
+    rollout_id: Optional[int] = None,
+) -> tuple[int, set[int]]:
+    """Bulk insert actions for ``devices`` in chunks; returns (created, device ids to notify).
+
+    ``plan_for`` maps a device ``os_type`` to the actions that device receives.
+    With ``rollout_id`` the actions are created held, tagged with each device's wave.
+    Devices are processed in the order given (duplicates included), matching the
+    per-device semantics of the original apply loop. Blobs of large payloads are
+    written in the same transaction as the actions referencing them; the caller commits.
+    """
+    created = 0
+    touched: set[int] = set()
+    stored: set[str] = set()
+    batch: list[dict] = []
+    status = ACTION_STATUS_HELD if rollout_id is not None else ACTION_STATUS_PENDING
+
+    def flush() -> None:
+        nonlocal created
+        if batch:
+            db.execute(insert(Action), batch)
+            track_actions(db, None, status, len(batch))
+            bump_device_actions(db, {row["device_id"] for row in batch})
+            created += len(batch)
+            batch.clear()
+
+    for device in devices:
+        for item in plan_for(device.os_type):
+            if item.payload_digest and item.payload_digest not in stored:
+                store_payload(db, item.payload)
+                stored.add(item.payload_digest)
+            batch.append(
+                {
+                    "device_id": device.id,
+                    "type": item.action_type,
+                    "payload": None if item.payload_digest else item.payload,
+                    "payload_digest": item.payload_digest,
+                    "script_id": item.script_id,
+                    "software_id": item.software_id,
+                    "status": status,
+                    "rollout_id": rollout_id,
+                    "rollout_wave": device.wave if rollout_id is not None else None,
+                }
+            )
+            if rollout_id is None:
+                touched.add(device.id)
+            if len(batch) >= INSERT_CHUNK_SIZE:
+                flush()
+    flush()
+    return created, touched
@@ -0,0 +1,83 @@
+from typing import NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.db import SessionLocal
+from app.models.deployment_profile import DeploymentProfile
+from app.models.profile_task import ProfileTask
+from app.services.profile_apply import PlannedAction, plan_profile_tasks
+from app.services.resource_versions import (
+    VERSION_PROFILES,
+    VERSION_SCRIPTS,
+    VERSION_SOFTWARE,
+    read_versions,
+)
+
+# Collection versions of the rows a compiled plan is derived from.
+_PLAN_SOURCES = (VERSION_PROFILES, VERSION_SCRIPTS, VERSION_SOFTWARE)
+
+
+class ProfilePlan(NamedTuple):
+    """Immutable per-OS execution plan of a profile: the actions one device receives."""
+
+    profile_id: int
+    os_type: Optional[str]
+    task_count: int
+    actions: tuple[PlannedAction, ...]
+
+
+_settings = get_settings()
+
+# (profile_id, os_type) -> (source versions, ProfilePlan)
+profile_plan_cache = TTLCache("profile_plans", _settings.cache_max_entries, _settings.cache_ttl_seconds)
+
+
+def _source_versions(db: Session) -> tuple[int, ...]:
+    versions = read_versions(db, *_PLAN_SOURCES)
+    return tuple(versions.get(name, 0) for name in _PLAN_SOURCES)
+
+
+def compile_profile_plan(db: Session, profile_id: int, os_type: Optional[str]) -> Optional[ProfilePlan]:
+    """Build the plan for devices of ``os_type``; ``None`` when the profile does not exist.
+
+    Read-only: payload blobs are stored when actions are inserted.
+    """
+    profile = db.query(DeploymentProfile).filter(DeploymentProfile.id == profile_id).first()
+    if profile is None:
+        return None
+    tasks = (
+        db.query(ProfileTask)
+        .filter(ProfileTask.profile_id == profile_id)
+        .order_by(ProfileTask.order_index.asc(), ProfileTask.id.asc())
+        .all()
+    )
+    if profile.target_os_type and os_type and profile.target_os_type != os_type:
+        actions: tuple[PlannedAction, ...] = ()
+    else:
+        actions = tuple(item for item in plan_profile_tasks(db, tasks) if item.allows(os_type))
+    return ProfilePlan(profile_id, os_type, len(tasks), actions)
+
+
+def get_profile_plan(profile_id: int, os_type: Optional[str]) -> Optional[ProfilePlan]:
+    """Cached plan, valid while the profile, script and software versions are unchanged.
+
+    The versions live in the database, so a write committed by any process
+    invalidates the plans of every process on their next lookup.
+    """
+    key = (profile_id, os_type)
+    db = SessionLocal()
+    try:
+        # Read before compiling: a concurrent write can only make the stamp
+        # older than the plan, which costs one extra compile, never a stale hit.
+        versions = _source_versions(db)
+        cached = profile_plan_cache.get(key, None)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        plan = compile_profile_plan(db, profile_id, os_type)
+        if plan is not None:
+            profile_plan_cache.set(key, (versions, plan))
+        return plan
+    finally:
+        db.close()
@@ -0,0 +1,141 @@
+from itertools import chain
+from typing import Iterable
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.conditional import weak_etag
+from app.models.deployment_profile import DeploymentProfile
+from app.models.device import Device
+from app.models.device_group import DeviceGroup, DeviceGroupMember
+from app.models.profile_task import ProfileTask
+from app.models.resource_version import ResourceVersion
+from app.models.script import Script
+from app.models.software_package import SoftwarePackage
+
+VERSION_DEVICES = "devices"
+VERSION_DEVICE_GROUPS = "device_groups"
+VERSION_SCRIPTS = "scripts"
+VERSION_SOFTWARE = "software"
+VERSION_PROFILES = "profiles"
+
+# Which collection version a write to each model bumps. Profiles and templates
+# share deployment_profiles; their tasks are part of them.
+_VERSIONED_MODELS = {
+    Device: VERSION_DEVICES,
+    DeviceGroup: VERSION_DEVICE_GROUPS,
+    DeviceGroupMember: VERSION_DEVICE_GROUPS,
+    Script: VERSION_SCRIPTS,
+    SoftwarePackage: VERSION_SOFTWARE,
+    DeploymentProfile: VERSION_PROFILES,
+    ProfileTask: VERSION_PROFILES,
+}
+
+_versions = ResourceVersion.__table__
+_devices = Device.__table__
+
+
+def ensure_resource_versions(engine: Engine) -> None:
+    """Create the version rows up front so bumps are plain UPDATEs."""
+    with engine.begin() as conn:
+        existing = set(conn.execute(select(_versions.c.name)).scalars())
+        missing = [
+            {"name": name, "version": 0}
+            for name in sorted(set(_VERSIONED_MODELS.values()) - existing)
+        ]
+        if missing:
+            conn.execute(insert(_versions), missing)
+
+
+def bump_versions(session: Session, names: Iterable[str]) -> None:
+    names = sorted(set(names))
+    if names:
+        # Core table statements: they do not re-enter the ORM events below.
+        session.execute(
+            update(_versions)
+            .where(_versions.c.name.in_(names))
+            .values(version=_versions.c.version + 1)
+        )
+
+
+def read_versions(db: Session, *names: str) -> dict[str, int]:
+    rows = db.execute(select(_versions.c.name, _versions.c.version).where(_versions.c.name.in_(names)))
+    return {row.name: row.version for row in rows}
+
+
+def bump_device_actions(db: Session, device_ids: Iterable[int]) -> None:
+    """Invalidate the action-list ETag of ``device_ids``. The caller commits."""
+    device_ids = sorted(set(device_ids))
+    for start in range(0, len(device_ids), 500):
+        db.execute(
+            update(_devices)
+            .where(_devices.c.id.in_(device_ids[start : start + 500]))
+            .values(actions_version=_devices.c.actions_version + 1)
+        )
+
+
+def _bump_device_rows(db: Session, device_ids: Iterable[int]) -> None:
+    device_ids = sorted(set(device_ids))
+    for start in range(0, len(device_ids), 500):
+        db.execute(
+            update(_devices)
+            .where(_devices.c.id.in_(device_ids[start : start + 500]))
+            .values(version=_devices.c.version + 1)
+        )
+
+
+def device_version(db: Session, device_id: int) -> int | None:
+    """Row version of an active device, or ``None`` when it is missing or deleted."""
+    return db.execute(
+        select(_devices.c.version).where(_devices.c.id == device_id, _devices.c.is_deleted.is_(False))
+    ).scalar_one_or_none()
+
+
+def device_actions_version(db: Session, device_id: int) -> int | None:
+    """Action-list version of an active device, or ``None`` when it is missing or deleted."""
+    return db.execute(
+        select(_devices.c.actions_version).where(
+            _devices.c.id == device_id, _devices.c.is_deleted.is_(False)
+        )
+    ).scalar_one_or_none()
+
+
+def _versions_for(classes: Iterable[type]) -> set[str]:
+    return {_VERSIONED_MODELS[cls] for cls in classes if cls in _VERSIONED_MODELS}
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_versions(session, flush_context) -> None:
+    changed = _versions_for(type(obj) for obj in chain(session.new, session.dirty, session.deleted))
+    bump_versions(session, changed)
+    _bump_device_rows(session, (obj.id for obj in session.dirty if isinstance(obj, Device)))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_bulk_written_versions(orm_execute_state) -> None:
+    # Bulk ORM statements bypass the flush, e.g. check-in flushes and task bulk replace.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        changed = _versions_for(mapper.class_ for mapper in orm_execute_state.all_mappers)
+        bump_versions(orm_execute_state.session, changed)
+        if orm_execute_state.is_update and any(
+            mapper.class_ is Device for mapper in orm_execute_state.all_mappers
+        ):
+            _bump_device_row_versions(orm_execute_state)
+
+
+def _bump_device_row_versions(orm_execute_state) -> None:
+    parameters = orm_execute_state.parameters
+    if isinstance(parameters, (list, tuple)):
+        # Bulk UPDATE by primary key, e.g. the check-in flush.
+        _bump_device_rows(orm_execute_state.session, (row["id"] for row in parameters))
+    else:
+        # Criteria UPDATE, e.g. the liveness sweep: bump in the same statement.
+        orm_execute_state.statement = orm_execute_state.statement.values(version=Device.version + 1)
+
+
+def collection_etag(db: Session, *names: str, buffered: str = "") -> str:
+    """ETag over collection versions; ``buffered`` covers values not in the database yet."""
+    versions = read_versions(db, *names)
+    parts = chain.from_iterable((name, versions.get(name, 0)) for name in names)
+    return weak_etag(*parts, buffered) if buffered else weak_etag(*parts)
@@ -0,0 +1,246 @@
+import logging
+import math
+from datetime import datetime
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.events import EVENT_ACTIONS_CHANGED, event_broadcaster
+from app.core.notifications import action_hub
+from app.db import SessionLocal
+from app.models.action import (
+    ACTION_STATUS_CANCELLED,
+    ACTION_STATUS_FAILED,
+    ACTION_STATUS_HELD,
+    ACTION_STATUS_PENDING,
+    ACTION_STATUS_RUNNING,
+    ACTION_STATUS_SUCCEEDED,
+    Action,
+)
+from app.models.apply_job import APPLY_JOB_STATUS_FAILED, APPLY_JOB_STATUS_SUCCEEDED, ApplyJob
+from app.models.device import DEVICE_STATUS_OFFLINE, DEVICE_STATUS_STALE, Device
+from app.models.rollout import (
+    ROLLOUT_STATUS_CANCELLED,
+    ROLLOUT_STATUS_COMPLETED,
+    ROLLOUT_STATUS_FAILED,
+    ROLLOUT_STATUS_PAUSED,
+    ROLLOUT_STATUS_PENDING,
+    ROLLOUT_STATUS_RUNNING,
+    Rollout,
+)
+from app.services.fleet_counters import track_actions
+from app.services.resource_versions import bump_device_actions
+
+logger = logging.getLogger(__name__)
+
+_IN_FLIGHT = (ACTION_STATUS_PENDING, ACTION_STATUS_RUNNING)
+
+# Pending actions whose device stopped checking in (see device_liveness). They
+# stay deliverable if the device returns, but neither hold a ``max_concurrent``
+# slot nor keep a wave open; the success rate counts them as not succeeded.
+_UNREACHABLE = and_(
+    Action.status == ACTION_STATUS_PENDING,
+    select(Device.id)
+    .where(Device.id == Action.device_id, Device.status.in_([DEVICE_STATUS_STALE, DEVICE_STATUS_OFFLINE]))
+    .exists(),
+)
+
+
+def plan_rollout_waves(rollout: Rollout, total_devices: int) -> None:
+    """Fix the wave size and count once the apply job knows how many devices it targets."""
+    if rollout.wave_percent is not None:
+        rollout.wave_size = max(1, math.ceil(total_devices * rollout.wave_percent / 100))
+    rollout.total_waves = math.ceil(total_devices / rollout.wave_size)
+
+
+def wave_counts(db: Session, rollout_id: int, wave: int) -> dict[str, int]:
+    rows = db.execute(
+        select(Action.status, func.count())
+        .where(Action.rollout_id == rollout_id, Action.rollout_wave == wave)
+        .group_by(Action.status)
+    ).all()
+    return {action_status: count for action_status, count in rows}
+
+
+def unreachable_count(db: Session, rollout_id: int, wave: int) -> int:
+    return db.execute(
+        select(func.count())
+        .select_from(Action)
+        .where(Action.rollout_id == rollout_id, Action.rollout_wave == wave, _UNREACHABLE)
+    ).scalar_one()
+
+
+def _release_open_waves(db: Session, rollout: Rollout) -> set[int]:
+    """Flip held actions to pending while under ``max_concurrent``.
+
+    Releases the current wave and any earlier wave an operator advanced past,
+    oldest wave first.
+    """
+    in_flight = db.execute(
+        select(func.count())
+        .select_from(Action)
+        .where(Action.rollout_id == rollout.id, Action.status.in_(_IN_FLIGHT), ~_UNREACHABLE)
+    ).scalar_one()
+    room = rollout.max_concurrent - in_flight
+    if room <= 0:
+        return set()
+
+    rows = db.execute(
+        select(Action.id, Action.device_id)
+        .where(
+            Action.rollout_id == rollout.id,
+            Action.rollout_wave <= rollout.current_wave,
+            Action.status == ACTION_STATUS_HELD,
+        )
+        .order_by(Action.rollout_wave.asc(), Action.id.asc())
+        .limit(room)
+    ).all()
+    if not rows:
+        return set()
+    flipped = db.execute(
+        update(Action)
+        .where(Action.id.in_([row.id for row in rows]), Action.status == ACTION_STATUS_HELD)
+        .values(status=ACTION_STATUS_PENDING)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    track_actions(db, ACTION_STATUS_HELD, ACTION_STATUS_PENDING, flipped)
+    device_ids = {row.device_id for row in rows}
+    bump_device_actions(db, device_ids)
+    return device_ids
+
+
+def step_rollout(db: Session, rollout_id: int) -> None:
+    """Release the current wave up to the concurrency cap and advance finished waves.
+
+    A finished wave advances when its success rate reaches ``success_threshold``;
+    otherwise the rollout pauses until an operator resumes or advances it. A
+    wave is finished once nothing is held or in flight apart from actions
+    waiting on stale/offline devices, which count against the success rate.
+    The rollout completes when the last wave has advanced and no action is
+    left held or in flight.
+    """
+    rollout = db.execute(
+        select(Rollout).where(Rollout.id == rollout_id).with_for_update()
+    ).scalar_one_or_none()
+    if rollout is None:
+        return
+
+    if rollout.status == ROLLOUT_STATUS_PENDING:
+        job = db.get(ApplyJob, rollout.apply_job_id)
+        if job is not None and job.status == APPLY_JOB_STATUS_FAILED:
+            rollout.status = ROLLOUT_STATUS_FAILED
+            rollout.last_error = job.last_error
+            rollout.completed_at = datetime.utcnow()
+        elif job is not None and job.status == APPLY_JOB_STATUS_SUCCEEDED:
+            rollout.status = ROLLOUT_STATUS_RUNNING
+
+    released: set[int] = set()
+    while rollout.status == ROLLOUT_STATUS_RUNNING:
+        released |= _release_open_waves(db, rollout)
+        if rollout.current_wave >= rollout.total_waves:
+            # Waves advanced past by an operator may still be releasing.
+            outstanding = db.execute(
+                select(func.count())
+                .select_from(Action)
+                .where(
+                    Action.rollout_id == rollout.id,
+                    Action.status.in_([ACTION_STATUS_HELD, *_IN_FLIGHT]),
+                    ~_UNREACHABLE,
+                )
+            ).scalar_one()
+            if not outstanding:
+                rollout.status = ROLLOUT_STATUS_COMPLETED
+                rollout.completed_at = datetime.utcnow()
+            break
+
+        counts = wave_counts(db, rollout.id, rollout.current_wave)
+        unreachable = unreachable_count(db, rollout.id, rollout.current_wave)
+        open_actions = sum(counts.get(status, 0) for status in (ACTION_STATUS_HELD, *_IN_FLIGHT))
+        if open_actions > unreachable:
+            break
+
+        succeeded = counts.get(ACTION_STATUS_SUCCEEDED, 0)
+        finished = succeeded + counts.get(ACTION_STATUS_FAILED, 0) + unreachable
+        rate = succeeded / finished if finished else 1.0
+        if rate < rollout.success_threshold:
+            rollout.status = ROLLOUT_STATUS_PAUSED
+            rollout.last_error = (
+                f"Wave {rollout.current_wave + 1} success rate {rate:.0%} "
+                f"is below the {rollout.success_threshold:.0%} threshold"
+            )
+            if unreachable:
+                rollout.last_error += f"; {unreachable} pending on stale/offline devices"
+            break
+        is_last_wave = rollout.current_wave + 1 >= rollout.total_waves
+        if not rollout.auto_advance and not is_last_wave:
+            rollout.status = ROLLOUT_STATUS_PAUSED
+            rollout.last_error = f"Wave {rollout.current_wave + 1} completed; waiting for advance"
+            break
+        rollout.current_wave += 1
+
+    db.commit()
+    action_hub.notify_many(released)
+    event_broadcaster.publish_many(EVENT_ACTIONS_CHANGED, released)
+
+
+def advance_rollout(db: Session, rollout: Rollout) -> None:
+    """Operator override: start the next wave regardless of the current one.
+
+    The current wave's held actions are not dropped: they stay eligible and are
+    released ahead of the next wave's, still under ``max_concurrent``. Use
+    cancel to stop delivering them.
+    """
+    rollout.current_wave += 1
+    rollout.status = ROLLOUT_STATUS_RUNNING
+    rollout.last_error = None
+    db.commit()
+    step_rollout(db, rollout.id)
+
+
+def cancel_rollout(db: Session, rollout: Rollout) -> int:
+    """Stop a rollout; actions not yet dispatched are cancelled. Returns how many."""
+    device_ids = db.execute(
+        select(Action.device_id)
+        .where(
+            Action.rollout_id == rollout.id,
+            Action.status.in_([ACTION_STATUS_HELD, ACTION_STATUS_PENDING]),
+        )
+        .distinct()
+    ).scalars().all()
+    bump_device_actions(db, device_ids)
+    cancelled_total = 0
+    for undelivered in (ACTION_STATUS_HELD, ACTION_STATUS_PENDING):
+        cancelled = db.execute(
+            update(Action)
+            .where(Action.rollout_id == rollout.id, Action.status == undelivered)
+            .values(status=ACTION_STATUS_CANCELLED, completed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        track_actions(db, undelivered, ACTION_STATUS_CANCELLED, cancelled)
+        cancelled_total += cancelled
+    rollout.status = ROLLOUT_STATUS_CANCELLED
+    rollout.completed_at = datetime.utcnow()
+    db.commit()
+    event_broadcaster.publish_many(EVENT_ACTIONS_CHANGED, device_ids)
+    return cancelled_total
+
+
+def run_rollouts() -> int:
+    """Scheduler pass over every pending or running rollout."""
+    db = SessionLocal()
+    try:
+        rollout_ids = db.execute(
+            select(Rollout.id)
+            .where(Rollout.status.in_([ROLLOUT_STATUS_PENDING, ROLLOUT_STATUS_RUNNING]))
+            .order_by(Rollout.id.asc())
+        ).scalars().all()
+        db.rollback()
+        for rollout_id in rollout_ids:
+            try:
+                step_rollout(db, rollout_id)
+            except Exception:
+                db.rollback()
+                logger.exception("Rollout %s step failed", rollout_id)
+    finally:
+        db.close()
+    return len(rollout_ids)
@@ -0,0 +1,194 @@
+"""
+Measures agent endpoint throughput under concurrent load for two SQLite setups.
+
+Usage:
+    cd backend
+    python -m scripts.bench_agent_concurrency [--processes 4] [--threads 8] [--devices 400] [--seconds 10]
+
+Each profile gets a throwaway SQLite file shared by ``--processes`` worker
+processes, like several API workers behind one database. The engine is
+configured once at import time from the environment:
+
+- ``defaults``: rollback journal, ``synchronous=FULL`` and a 5-entry pool.
+  These are what the engine used before the pool and pragma settings existed.
+- ``tuned``: the current defaults (WAL, ``synchronous=NORMAL``, busy_timeout, larger pool).
+
+Within each process, worker threads loop over their devices sending
+heartbeats through the API. Check-ins are written immediately (``CHECKIN_FLUSH_INTERVAL_SECONDS=0``),
+which is the write-heaviest mode. Threads post results for any actions a
+heartbeat hands out. Failed requests (e.g. "database is locked") are counted.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROFILES = {
+    "defaults": {
+        "SQLITE_JOURNAL_MODE": "delete",
+        "SQLITE_SYNCHRONOUS": "full",
+        # pysqlite's own default lock wait.
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",
+        "SQLITE_CACHE_SIZE_KIB": "2000",
+        "DB_POOL_SIZE": "5",
+        "DB_MAX_OVERFLOW": "10",
+    },
+    "tuned": {},
+}
+ACTIONS_PER_DEVICE = 3
+
+
+def run_worker(worker_id: int, threads: int, devices: int, seconds: float) -> dict:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        device_ids = []
+        for index in range(devices):
+            response = client.post(
+                "/api/v1/agent/register",
+                json={"enrollment_token": "changeme", "hostname": f"bench-{worker_id}-{index:05d}"},
+            )
+            device_ids.append(response.json()["device_id"])
+            for _ in range(ACTIONS_PER_DEVICE):
+                client.post(
+                    f"/api/v1/devices/{device_ids[-1]}/actions",
+                    json={"type": "bash_inline", "payload": "echo bench"},
+                )
+
+        # Tell the parent setup is done and wait until every process is ready.
+        print("ready", flush=True)
+        sys.stdin.readline()
+
+        latencies: list[float] = []
+        errors: dict[str, int] = {}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def call(method: str, url: str, body: dict) -> dict | None:
+            started = time.perf_counter()
+            try:
+                response = client.request(method, url, json=body)
+                ok = response.status_code == 200
+                key = None if ok else str(response.status_code)
+            except Exception as exc:  # transport-level failures
+                response, ok, key = None, False, type(exc).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if key is not None:
+                    errors[key] = errors.get(key, 0) + 1
+            return response.json() if ok else None
+
+        def worker(mine: list[int]) -> None:
+            while time.perf_counter() < deadline:
+                for device_id in mine:
+                    if time.perf_counter() >= deadline:
+                        return
+                    reply = call(
+                        "POST", "/api/v1/agent/heartbeat", {"device_id": device_id, "status": "online"}
+                    )
+                    for action in (reply or {}).get("actions", []):
+                        call(
+                            "POST",
+                            f"/api/v1/agent/actions/{action['id']}/result",
+                            {"status": "succeeded", "exit_code": 0},
+                        )
+
+        workers = [
+            threading.Thread(target=worker, args=(device_ids[index::threads],)) for index in range(threads)
+        ]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        pool = client.get("/api/v1/admin/db-stats").json()
+
+    return {
+        "latencies": latencies,
+        "elapsed": elapsed,
+        "errors": errors,
+        "journal_mode": pool.get("sqlite", {}).get("journal_mode"),
+    }
+
+
+def run_profile(overrides: dict, args) -> dict:
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        env = {
+            **os.environ,
+            **overrides,
+            "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'bench.db')}",
+            "CHECKIN_FLUSH_INTERVAL_SECONDS": "0",
+        }
+        command = [
+            sys.executable, "-m", "scripts.bench_agent_concurrency", "--threads", str(args.threads),
+            "--devices", str(args.devices // args.processes), "--seconds", str(args.seconds),
+        ]
+        children = []
+        for worker_id in range(args.processes):
+            children.append(
+                subprocess.Popen(
+                    [*command, "--worker", str(worker_id)],
+                    env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL, text=True,
+                )
+            )
+            # Creating the schema is not concurrency-safe; let the first one finish.
+            while children[-1].stdout.readline().strip() != "ready":
+                pass
+        for child in children:
+            child.stdin.write("go\n")
+            child.stdin.flush()
+        results = [json.loads(child.communicate()[0].strip().splitlines()[-1]) for child in children]
+
+    latencies = sorted(latency for result in results for latency in result["latencies"])
+    errors: dict[str, int] = {}
+    for result in results:
+        for key, count in result["errors"].items():
+            errors[key] = errors.get(key, 0) + count
+    return {
+        "per_second": len(latencies) / max(result["elapsed"] for result in results),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "errors": errors,
+        "journal_mode": results[0]["journal_mode"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="threads per process")
+    parser.add_argument("--devices", type=int, default=400)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--dir", default=None, help="where to create the database (default: system temp)")
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run_worker(args.worker, args.threads, args.devices, args.seconds)))
+        return
+
+    print(
+        f"{args.processes} processes x {args.threads} threads, {args.devices} devices, "
+        f"{args.seconds:.0f}s per profile"
+    )
+    print(f"{'profile':<10}{'journal':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}  errors")
+    for name, overrides in PROFILES.items():
+        result = run_profile(overrides, args)
+        print(
+            f"{name:<10}{result['journal_mode']:>9}{result['per_second']:>9.0f}"
+            f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}  {result['errors'] or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
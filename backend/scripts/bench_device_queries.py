@@ -0,0 +1,106 @@
+"""
+Times the device list filters and search against a throwaway SQLite database.
+
+Usage:
+    cd backend
+    python -m scripts.bench_device_queries [--devices 100000] [--repeat 20]
+
+Seeds ``--devices`` rows into a temporary file, then reports the median
+latency of each filter through the same condition builders the API uses.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.db import Base
+from app.models.device import Device
+from app.services.device_search import device_filter_conditions, search_condition, setup_device_search
+
+OS_TYPES = ("windows", "linux", "macos")
+STATUSES = ("online", "offline", "unknown")
+VENDORS = ("Dell OptiPlex", "Lenovo ThinkPad", "HP EliteBook", "Apple MacBook Pro", "Supermicro")
+PAGE_SIZE = 100
+
+
+def seed(engine, count: int) -> None:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "hostname": f"{rng.choice(('web', 'db', 'lab', 'kiosk'))}-{i:06d}.corp",
+            "os_type": rng.choice(OS_TYPES),
+            "os_version": f"{rng.randint(10, 14)}.{rng.randint(0, 9)}",
+            "status": rng.choice(STATUSES),
+            "profile_id": rng.randint(1, 50) if rng.random() < 0.5 else None,
+            "hardware_summary": f"{rng.choice(VENDORS)} {rng.randint(4, 64)}GB RAM serial SN{rng.randint(0, 10**8):08d}",
+            "last_check_in": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        for start in range(0, count, 10_000):
+            conn.execute(insert(Device), rows[start : start + 10_000])
+
+
+def timed(engine, conditions, repeat: int, order_by=(Device.id,)) -> tuple[float, int]:
+    samples = []
+    found = 0
+    with Session(engine) as db:
+        statement = select(Device.id).where(*conditions).order_by(*order_by).limit(PAGE_SIZE)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = len(db.execute(statement).all())
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    try:
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        fts = setup_device_search(engine)
+        started = time.perf_counter()
+        seed(engine, args.devices)
+        print(f"Seeded {args.devices} devices in {time.perf_counter() - started:.1f}s (FTS5: {fts})")
+
+        recent = datetime.utcnow() - timedelta(hours=1)
+        month = datetime.utcnow() - timedelta(days=20)
+        # Check-in windows page in (last_check_in, id) order, as the API does.
+        by_check_in = (Device.last_check_in, Device.id)
+        cases = {
+            "no filter": [],
+            "hostname_prefix=kiosk-0999": device_filter_conditions(hostname_prefix="kiosk-0999"),
+            "hostname_contains=099912": device_filter_conditions(hostname_contains="099912"),
+            "status=offline": device_filter_conditions(status="offline"),
+            "profile_id=7": device_filter_conditions(profile_id=7),
+            "checked_in_after=-1h": (device_filter_conditions(checked_in_after=recent), by_check_in),
+            "checked_in_before=-20d": (device_filter_conditions(checked_in_before=month), by_check_in),
+            "search q=SN1234": [search_condition("SN1234")],
+            "search q=ThinkPad + os_type": [search_condition("ThinkPad"), *device_filter_conditions(os_type="linux")],
+        }
+        print(f"{'query':<36}{'median ms':>10}{'rows':>6}")
+        for name, case in cases.items():
+            conditions, order_by = case if isinstance(case, tuple) else (case, (Device.id,))
+            median_ms, found = timed(engine, conditions, args.repeat, order_by)
+            print(f"{name:<36}{median_ms:>10.2f}{found:>6}")
+        engine.dispose()
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+One-shot migration that rewrites stored action payloads/logs and log chunks
+using the current compression settings.
+
+Usage:
+    cd backend
+    python -m scripts.recompress_action_data [--batch-size 500] [--dry-run]
+
+Rows are processed in primary-key batches with one commit per batch, so the
+command can be interrupted and re-run safely. Values below
+COMPRESSION_THRESHOLD_BYTES (or with COMPRESSION_ALGORITHM=none) are written
+back as plain text.
+"""
+import argparse
+
+from sqlalchemy import Integer, Text, bindparam, column, select, table, update
+
+from app.core.config import get_settings
+from app.db import Base, SessionLocal, engine
+from app.models.types import decode_text, encode_text
+
+# Lightweight table clauses read the raw stored text, bypassing CompressedText.
+TARGETS = (
+    table("actions", column("id", Integer), column("payload", Text), column("logs", Text)),
+    table("action_log_chunks", column("id", Integer), column("content", Text)),
+)
+
+
+def recompress_table(target, batch_size: int, dry_run: bool) -> tuple[int, int]:
+    value_columns = [col for col in target.c if col.name != "id"]
+    scanned = rewritten = 0
+    last_id = 0
+
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.execute(
+                select(target.c.id, *value_columns)
+                .where(target.c.id > last_id)
+                .order_by(target.c.id.asc())
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            scanned += len(rows)
+
+            updates = []
+            for row in rows:
+                changed = {}
+                for col in value_columns:
+                    stored = getattr(row, col.name)
+                    if stored is None:
+                        continue
+                    encoded = encode_text(decode_text(stored))
+                    if encoded != stored:
+                        changed[col.name] = encoded
+                if changed:
+                    current = {col.name: getattr(row, col.name) for col in value_columns}
+                    updates.append({"row_id": row.id, **current, **changed})
+
+            if updates and not dry_run:
+                stmt = (
+                    update(target)
+                    .where(target.c.id == bindparam("row_id"))
+                    .values({col.name: bindparam(col.name) for col in value_columns})
+                )
+                db.execute(stmt, updates)
+                db.commit()
+            rewritten += len(updates)
+            print(f"  {target.name}: scanned {scanned}, rewritten {rewritten}")
+    finally:
+        db.close()
+
+    return scanned, rewritten
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    print("\n=== DeployFlow Action Data Recompression ===")
+    print(f"DATABASE_URL: {settings.database_url}")
+    print(
+        f"Algorithm: {settings.compression_algorithm}, "
+        f"threshold: {settings.compression_threshold_bytes} bytes"
+        f"{' (dry run)' if args.dry_run else ''}\n"
+    )
+
+    Base.metadata.create_all(bind=engine)
+
+    for target in TARGETS:
+        scanned, rewritten = recompress_table(target, args.batch_size, args.dry_run)
+        print(f"{target.name}: {rewritten} of {scanned} rows rewritten.")
+
+    print("\nDone.\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import uuid
+
+# Settings and the engine are read at import time, so point them at a scratch
+# database and switch off the periodic tasks before the app is imported.
+_DB_DIR = tempfile.mkdtemp(prefix="deployflow-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["CHECKIN_FLUSH_INTERVAL_SECONDS"] = "0"
+for _interval in (
+    "ACTION_REAPER_INTERVAL_SECONDS",
+    "ROLLOUT_INTERVAL_SECONDS",
+    "FLEET_RECONCILE_INTERVAL_SECONDS",
+    "LIVENESS_SWEEP_INTERVAL_SECONDS",
+):
+    os.environ[_interval] = "0"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.db import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.device import DEVICE_STATUS_ONLINE, Device  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def device(client, db) -> Device:
+    device = Device(hostname=f"test-{uuid.uuid4().hex[:12]}", status=DEVICE_STATUS_ONLINE, os_type="windows")
+    db.add(device)
+    db.commit()
+    return device
@@ -0,0 +1,191 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.core.config import get_settings
+from app.db import SessionLocal
+from app.models.action import (
+    ACTION_STATUS_CANCELLED,
+    ACTION_STATUS_FAILED,
+    ACTION_STATUS_PENDING,
+    ACTION_STATUS_RUNNING,
+    ACTION_STATUS_SUCCEEDED,
+    Action,
+)
+from app.models.apply_job import APPLY_JOB_STATUS_QUEUED, ApplyJob
+from app.services.apply_jobs import _claim, _save
+from app.services.dispatch import claim_pending_actions, reap_expired_leases
+from app.services.fleet_counters import reconcile_fleet_counters
+
+
+def _queue(client, device_id: int, count: int = 1) -> list[int]:
+    return [
+        client.post(f"/api/v1/devices/{device_id}/actions", json={"type": "test"}).json()["id"]
+        for _ in range(count)
+    ]
+
+
+def _heartbeat(client, device_id: int) -> list[int]:
+    response = client.post("/api/v1/agent/heartbeat", json={"device_id": device_id, "status": "online"})
+    assert response.status_code == 200
+    return [action["id"] for action in response.json()["actions"]]
+
+
+def _result(client, action_id: int, status: str = ACTION_STATUS_SUCCEEDED, exit_code: int = 0):
+    return client.post(
+        f"/api/v1/agent/actions/{action_id}/result",
+        json={"status": status, "exit_code": exit_code, "logs": status},
+    )
+
+
+def _action(db, action_id: int) -> Action:
+    db.expire_all()
+    return db.get(Action, action_id)
+
+
+def _expire_lease(db, action_id: int) -> None:
+    db.execute(
+        update(Action)
+        .where(Action.id == action_id)
+        .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+    db.commit()
+
+
+def test_result_is_accepted_once(client, db, device):
+    [action_id] = _queue(client, device.id)
+    assert _heartbeat(client, device.id) == [action_id]
+
+    assert _result(client, action_id).status_code == 200
+    retry = _result(client, action_id, ACTION_STATUS_FAILED, exit_code=1)
+
+    assert retry.status_code == 409
+    action = _action(db, action_id)
+    assert action.status == ACTION_STATUS_SUCCEEDED
+    assert action.exit_code == 0
+    assert action.lease_expires_at is None
+
+
+def test_result_for_undelivered_action_is_rejected(client, db, device):
+    [action_id] = _queue(client, device.id)
+
+    assert _result(client, action_id).status_code == 409
+    assert _action(db, action_id).status == ACTION_STATUS_PENDING
+
+
+def test_result_for_cancelled_action_is_rejected(client, db, device):
+    [action_id] = _queue(client, device.id)
+    _heartbeat(client, device.id)
+    db.execute(update(Action).where(Action.id == action_id).values(status=ACTION_STATUS_CANCELLED))
+    db.commit()
+
+    assert _result(client, action_id).status_code == 409
+    assert _action(db, action_id).status == ACTION_STATUS_CANCELLED
+
+
+def test_late_result_after_requeue_is_rejected(client, db, device):
+    [action_id] = _queue(client, device.id)
+    _heartbeat(client, device.id)
+    _expire_lease(db, action_id)
+
+    assert reap_expired_leases(db) == (1, 0)
+    assert _result(client, action_id).status_code == 409
+
+    action = _action(db, action_id)
+    assert action.status == ACTION_STATUS_PENDING
+    assert action.attempts == 1
+    assert action.not_before is not None
+
+
+def test_reaper_leaves_finished_actions_alone(client, db, device):
+    [action_id] = _queue(client, device.id)
+    _heartbeat(client, device.id)
+    assert _result(client, action_id).status_code == 200
+
+    assert reap_expired_leases(db, now=datetime.utcnow() + timedelta(days=1)) == (0, 0)
+    assert _action(db, action_id).status == ACTION_STATUS_SUCCEEDED
+
+
+def test_reaper_fails_action_after_max_attempts(client, db, device):
+    [action_id] = _queue(client, device.id)
+    _heartbeat(client, device.id)
+    db.execute(
+        update(Action).where(Action.id == action_id).values(attempts=get_settings().action_max_attempts)
+    )
+    db.commit()
+    _expire_lease(db, action_id)
+
+    assert reap_expired_leases(db) == (0, 1)
+    assert _action(db, action_id).status == ACTION_STATUS_FAILED
+    assert _result(client, action_id).status_code == 409
+
+
+def test_batch_reports_duplicate_result_as_error(client, db, device):
+    [action_id] = _queue(client, device.id)
+    _heartbeat(client, device.id)
+
+    response = client.post(
+        "/api/v1/agent/actions/results",
+        json={
+            "results": [
+                {"action_id": action_id, "status": ACTION_STATUS_SUCCEEDED},
+                {"action_id": action_id, "status": ACTION_STATUS_FAILED},
+            ]
+        },
+    )
+
+    assert [outcome["status"] for outcome in response.json()["results"]] == ["ok", "error"]
+    assert _action(db, action_id).status == ACTION_STATUS_SUCCEEDED
+
+
+def test_overlapping_claims_never_share_an_action(client, db, device):
+    action_ids = _queue(client, device.id, count=20)
+    # Start from exact counters; the fixture inserts its device directly.
+    reconcile_fleet_counters(db)
+    claimed: list[list[int]] = []
+    barrier = threading.Barrier(4)
+
+    def claim() -> None:
+        session = SessionLocal()
+        try:
+            barrier.wait()
+            rows = claim_pending_actions(session, device.id, limit=20)
+            session.commit()
+            claimed.append([row.id for row in rows])
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    flat = [action_id for ids in claimed for action_id in ids]
+    assert sorted(flat) == sorted(action_ids)
+    db.expire_all()
+    statuses = db.execute(select(Action.status).where(Action.id.in_(action_ids))).scalars().all()
+    assert set(statuses) == {ACTION_STATUS_RUNNING}
+    assert reconcile_fleet_counters(db) == 0
+
+
+def test_apply_job_claim_is_exclusive(client, db):
+    job = ApplyJob(profile_id=0, status=APPLY_JOB_STATUS_QUEUED, selector='{"all": true}')
+    db.add(job)
+    db.commit()
+    other = SessionLocal()
+    try:
+        assert _claim(db, job.id, "worker-a")
+        assert not _claim(other, job.id, "worker-b")
+
+        # Worker A stops heartbeating; B takes over and A's writes no longer land.
+        stale = datetime.utcnow() - timedelta(seconds=get_settings().apply_job_stale_seconds + 1)
+        db.execute(update(ApplyJob).where(ApplyJob.id == job.id).values(heartbeat_at=stale))
+        db.commit()
+        assert _claim(other, job.id, "worker-b")
+        db.expire_all()
+        assert not _save(db, db.get(ApplyJob, job.id), "worker-a", processed_devices=1)
+        db.rollback()
+    finally:
+        other.close()
@@ -14,6 +14,7 @@ import {
   fetchDeviceActions,
   fetchProfiles,
   fetchScripts,
+  subscribeDeviceEvents,
 } from '@/lib/api'
 import { DeviceStatusBadge } from '@/components/DeviceStatusBadge'
 import { ActionStatusBadge } from '@/components/ActionStatusBadge'
@@ -35,6 +36,8 @@ export default function DeviceDetailPage() {
 
   const [device, setDevice] = useState<Device | null>(null)
   const [actions, setActions] = useState<Action[]>([])
+  const [actionsCursor, setActionsCursor] = useState<string | null>(null)
+  const [actionsError, setActionsError] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
@@ -65,7 +68,8 @@ export default function DeviceDetailPage() {
           fetchDeviceActions(deviceId),
         ])
         setDevice(deviceResp)
-        setActions(actionsResp)
+        setActions(actionsResp.items)
+        setActionsCursor(actionsResp.next_cursor ?? null)
       } catch (err) {
         const message = err instanceof Error ? err.message : 'Failed to load device'
         setError(message)
@@ -77,6 +81,48 @@ export default function DeviceDetailPage() {
     load()
   }, [deviceId])
 
+  useEffect(() => {
+    if (Number.isNaN(deviceId)) return
+
+    const reloadActions = async () => {
+      try {
+        const page = await fetchDeviceActions(deviceId)
+        setActions(page.items)
+        setActionsCursor(page.next_cursor ?? null)
+      } catch (err) {
+        setActionsError(err instanceof Error ? err.message : 'Failed to load actions')
+      }
+    }
+
+    return subscribeDeviceEvents(deviceId, (event) => {
+      switch (event.type) {
+        case 'action.status':
+          setActions((prev) =>
+            prev.map((action) =>
+              action.id === event.data.action_id
+                ? { ...action, status: event.data.status, exit_code: event.data.exit_code ?? action.exit_code }
+                : action
+            )
+          )
+          break
+        case 'device.status':
+          setDevice((prev) =>
+            prev ? { ...prev, status: event.data.status, os_version: event.data.os_version ?? prev.os_version } : prev
+          )
+          break
+        case 'device.deleted':
+          setDevice((prev) => (prev ? { ...prev, is_deleted: true } : prev))
+          reloadActions()
+          break
+        case 'action.created':
+        case 'actions.changed':
+        case 'resync':
+          reloadActions()
+          break
+      }
+    })
+  }, [deviceId])
+
   const openScriptModal = async () => {
     setScriptModalOpen(true)
     try {
@@ -121,7 +167,8 @@ export default function DeviceDetailPage() {
     try {
       await applyProfile(selectedProfileId, deviceId)
       const updated = await fetchDeviceActions(deviceId)
-      setActions(updated)
+      setActions(updated.items)
+      setActionsCursor(updated.next_cursor ?? null)
       setProfileModalOpen(false)
       setSelectedProfileId(null)
     } catch (err) {
@@ -131,6 +178,18 @@ export default function DeviceDetailPage() {
     }
   }
 
+  const loadMoreActions = async () => {
+    if (!actionsCursor) return
+    setActionsError(null)
+    try {
+      const page = await fetchDeviceActions(deviceId, actionsCursor)
+      setActions((prev) => [...prev, ...page.items])
+      setActionsCursor(page.next_cursor ?? null)
+    } catch (err) {
+      setActionsError(err instanceof Error ? err.message : 'Failed to load actions')
+    }
+  }
+
   const submitRunScript = async () => {
     if (!selectedScriptId) {
       setActionError('Select a script to run')
@@ -144,7 +203,8 @@ export default function DeviceDetailPage() {
         script_id: selectedScriptId,
       })
       const updated = await fetchDeviceActions(deviceId)
-      setActions(updated)
+      setActions(updated.items)
+      setActionsCursor(updated.next_cursor ?? null)
       setScriptModalOpen(false)
       setSelectedScriptId(null)
     } catch (err) {
@@ -293,6 +353,15 @@ export default function DeviceDetailPage() {
               </tbody>
             </table>
           </div>
+          {actionsCursor && (
+            <button
+              onClick={loadMoreActions}
+              className="mt-3 rounded-md border border-zinc-700 px-3 py-1 text-xs font-semibold text-zinc-200 hover:bg-zinc-800"
+            >
+              Load older actions
+            </button>
+          )}
+          {actionsError && <p className="mt-2 text-sm text-rose-400">{actionsError}</p>}
         </div>
       </div>
 
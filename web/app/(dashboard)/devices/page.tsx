@@ -2,7 +2,7 @@
 
 import Link from 'next/link'
 import { useEffect, useState } from 'react'
-import { fetchDevices, deleteDevice, Device } from '@/lib/api'
+import { fetchDevices, fetchFleetSummary, deleteDevice, Device, FleetSummary } from '@/lib/api'
 import { DeviceStatusBadge } from '@/components/DeviceStatusBadge'
 
 function formatDate(value?: string | null) {
@@ -17,12 +17,16 @@ export default function DevicesPage() {
   const [deletingId, setDeletingId] = useState<number | null>(null)
   const [deleteError, setDeleteError] = useState<string | null>(null)
   const [deleteNotice, setDeleteNotice] = useState<string | null>(null)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [summary, setSummary] = useState<FleetSummary | null>(null)
 
   useEffect(() => {
     const load = async () => {
       try {
-        const data = await fetchDevices()
-        setDevices(data)
+        const page = await fetchDevices()
+        setDevices(page.items)
+        setNextCursor(page.next_cursor ?? null)
       } catch (err) {
         const message = err instanceof Error ? err.message : 'Failed to load devices'
         setError(message)
@@ -32,8 +36,26 @@ export default function DevicesPage() {
     }
 
     load()
+    // Counts are informational; the list still renders if the summary fails.
+    fetchFleetSummary()
+      .then(setSummary)
+      .catch(() => setSummary(null))
   }, [])
 
+  const loadMore = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      const page = await fetchDevices(nextCursor)
+      setDevices((prev) => [...prev, ...page.items])
+      setNextCursor(page.next_cursor ?? null)
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to load devices')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   return (
     <div className="space-y-6">
       <div className="flex items-center justify-between">
@@ -44,7 +66,13 @@ export default function DevicesPage() {
         <div className="rounded-md bg-zinc-900/70 px-3 py-2 text-xs text-zinc-300">
           {loading && 'Loading devices…'}
           {!loading && error && <span className="text-rose-400">{error}</span>}
-          {!loading && !error && `${devices.length} device${devices.length === 1 ? '' : 's'}`}
+          {!loading && !error && !summary && `${devices.length}${nextCursor ? '+' : ''} device${devices.length === 1 ? '' : 's'}`}
+          {!loading && !error && summary && (
+            <span>
+              {summary.devices.total} device{summary.devices.total === 1 ? '' : 's'} ·{' '}
+              {summary.devices.by_status.online ?? 0} online · {summary.actions.by_status.pending ?? 0} pending actions
+            </span>
+          )}
         </div>
       </div>
 
@@ -122,6 +150,18 @@ export default function DevicesPage() {
         )}
       </div>
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="rounded-md border border-zinc-700 px-4 py-2 text-sm font-semibold text-zinc-200 hover:bg-zinc-800 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading…' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       {deleteError && <p className="text-sm text-rose-400">{deleteError}</p>}
       {deleteNotice && <p className="text-sm text-emerald-300">{deleteNotice}</p>}
     </div>
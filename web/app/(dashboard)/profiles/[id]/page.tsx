@@ -4,12 +4,14 @@ import { useMemo, useEffect, useState } from 'react'
 import { useParams, useRouter } from 'next/navigation'
 import {
   DeploymentProfileWithTasks,
+  ProfilePlan,
   deleteProfile,
   fetchProfile,
+  fetchProfilePlan,
   fetchProfileTasks,
 } from '@/lib/api'
 import { ProfileEditorModal } from '@/components/ProfileEditorModal'
-import { formatTargetOs } from '@/lib/osTypes'
+import { TARGET_OS_OPTIONS, formatTargetOs } from '@/lib/osTypes'
 
 function formatDate(value?: string | null) {
   if (!value) return '—'
@@ -31,6 +33,9 @@ export default function ProfileDetailPage() {
   const [error, setError] = useState<string | null>(null)
   const [editOpen, setEditOpen] = useState(false)
   const [actionError, setActionError] = useState<string | null>(null)
+  const [planOs, setPlanOs] = useState<string>('')
+  const [plan, setPlan] = useState<ProfilePlan | null>(null)
+  const [planError, setPlanError] = useState<string | null>(null)
 
   useEffect(() => {
     if (Number.isNaN(profileId)) return
@@ -54,6 +59,18 @@ export default function ProfileDetailPage() {
     load()
   }, [profileId])
 
+  useEffect(() => {
+    if (Number.isNaN(profileId) || !profile) return
+
+    // The compiled plan is what apply actually creates for a device of this OS.
+    fetchProfilePlan(profileId, planOs || null)
+      .then((data) => {
+        setPlan(data)
+        setPlanError(null)
+      })
+      .catch((err) => setPlanError(err instanceof Error ? err.message : 'Failed to load plan'))
+  }, [profileId, profile, planOs])
+
   if (loading) {
     return <div className="text-sm text-zinc-300">Loading profile…</div>
   }
@@ -169,6 +186,44 @@ export default function ProfileDetailPage() {
         </div>
       </div>
 
+      <div className="rounded-lg border border-zinc-800 bg-zinc-900/40 p-4">
+        <div className="flex flex-wrap items-center justify-between gap-3">
+          <h2 className="text-lg font-semibold">Execution Plan</h2>
+          <select
+            value={planOs}
+            onChange={(event) => setPlanOs(event.target.value)}
+            className="rounded-md border border-zinc-700 bg-zinc-900 px-3 py-2 text-sm text-zinc-100"
+          >
+            <option value="">Any OS</option>
+            {TARGET_OS_OPTIONS.map((option) => (
+              <option key={option.value} value={option.value}>
+                {option.label}
+              </option>
+            ))}
+          </select>
+        </div>
+        {planError && <p className="mt-3 text-sm text-rose-400">{planError}</p>}
+        {plan && (
+          <>
+            <p className="mt-2 text-sm text-zinc-400">
+              {plan.actions.length} of {plan.task_count} tasks run on {formatTargetOs(plan.os_type)} devices.
+            </p>
+            <ol className="mt-3 space-y-2 text-sm text-zinc-300">
+              {plan.actions.map((action, index) => (
+                <li key={index} className="rounded-md bg-zinc-900/50 p-3">
+                  <span className="font-semibold text-zinc-100">{action.action_type}</span>
+                  <span className="ml-2 text-zinc-400">
+                    {action.action_type === 'install_software'
+                      ? `software ${action.software_id ?? '—'}`
+                      : `script ${action.script_id ?? '—'}`}
+                  </span>
+                </li>
+              ))}
+            </ol>
+          </>
+        )}
+      </div>
+
       <ProfileEditorModal
         open={editOpen}
         variant="edit"
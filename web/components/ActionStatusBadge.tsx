@@ -9,6 +9,8 @@ const colorMap: Record<string, string> = {
   running: 'bg-blue-400/10 text-blue-200 border-blue-400/30 animate-pulse',
   succeeded: 'bg-emerald-400/10 text-emerald-200 border-emerald-400/30',
   failed: 'bg-rose-400/10 text-rose-200 border-rose-400/30',
+  held: 'bg-zinc-400/10 text-zinc-300 border-zinc-400/30',
+  cancelled: 'bg-zinc-400/10 text-zinc-400 border-zinc-500/30',
 }
 
 export function ActionStatusBadge({ status }: ActionStatusBadgeProps) {
@@ -1,6 +1,10 @@
 'use client'
 
-import { Action } from '@/lib/api'
+import { useEffect, useState } from 'react'
+
+import { Action, fetchActionLogs, fetchActionPayload } from '@/lib/api'
+
+const LOG_TAIL_BYTES = 256 * 1024
 
 interface LogsModalProps {
   action: Action | null
@@ -8,6 +12,36 @@ interface LogsModalProps {
 }
 
 export function LogsModal({ action, onClose }: LogsModalProps) {
+  const [logs, setLogs] = useState<string | null>(null)
+  const [logsError, setLogsError] = useState<string | null>(null)
+  const [payload, setPayload] = useState<string | null | undefined>(undefined)
+
+  useEffect(() => {
+    if (!action) return
+    let cancelled = false
+    setLogs(null)
+    setLogsError(null)
+    setPayload(undefined)
+    // Action listings omit the payload; load it for this action only.
+    fetchActionPayload(action.device_id, action.id)
+      .then((result) => {
+        if (!cancelled) setPayload(result.payload ?? null)
+      })
+      .catch(() => {
+        if (!cancelled) setPayload(null)
+      })
+    fetchActionLogs(action.device_id, action.id, { tail: LOG_TAIL_BYTES })
+      .then((log) => {
+        if (!cancelled) setLogs(log.content)
+      })
+      .catch((err: Error) => {
+        if (!cancelled) setLogsError(err.message)
+      })
+    return () => {
+      cancelled = true
+    }
+  }, [action])
+
   if (!action) return null
 
   return (
@@ -41,7 +75,7 @@ export function LogsModal({ action, onClose }: LogsModalProps) {
           </div>
           <div className="space-y-1 rounded-md bg-zinc-900/50 p-3">
             <p className="text-xs uppercase tracking-wide text-zinc-500">Payload</p>
-            <p className="break-words text-zinc-100">{action.payload ?? '—'}</p>
+            <p className="break-words text-zinc-100">{payload === undefined ? 'Loading…' : payload ?? '—'}</p>
           </div>
           <div className="space-y-1 rounded-md bg-zinc-900/50 p-3">
             <p className="text-xs uppercase tracking-wide text-zinc-500">Exit code</p>
@@ -52,7 +86,7 @@ export function LogsModal({ action, onClose }: LogsModalProps) {
         <div className="mt-4 rounded-md border border-zinc-800 bg-zinc-950/80">
           <div className="border-b border-zinc-800 px-3 py-2 text-xs uppercase tracking-wide text-zinc-500">Logs</div>
           <pre className="max-h-80 overflow-auto bg-zinc-950 px-3 py-3 text-sm text-zinc-100 whitespace-pre-wrap">
-            {action.logs ?? '(no logs)'}
+            {logsError ? `Failed to load logs: ${logsError}` : logs === null ? 'Loading…' : logs || '(no logs)'}
           </pre>
         </div>
       </div>
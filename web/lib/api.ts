@@ -28,12 +28,27 @@ export interface Action {
   script_id?: number | null
   software_id?: number | null
   logs?: string | null
+  log_size?: number
   exit_code?: number | null
   created_at: string
   updated_at: string
   completed_at?: string | null
 }
 
+export interface ActionPayload {
+  action_id: number
+  payload?: string | null
+}
+
+export interface ActionLog {
+  action_id: number
+  offset: number
+  next_offset: number
+  size: number
+  content: string
+  complete: boolean
+}
+
 export interface Script {
   id: number
   name: string
@@ -149,11 +164,59 @@ export interface DeploymentProfileWithTasks extends DeploymentProfile {
   tasks: ProfileTask[]
 }
 
+export interface PlannedAction {
+  action_type: string
+  script_id?: number | null
+  software_id?: number | null
+  payload?: string | null
+  payload_digest?: string | null
+}
+
+export interface ProfilePlan {
+  profile_id: number
+  os_type?: string | null
+  task_count: number
+  actions: PlannedAction[]
+}
+
+export interface ApplySelector {
+  all?: boolean
+  device_ids?: number[] | null
+  os_type?: string | null
+  status?: string | null
+  hostname_pattern?: string | null
+  group_id?: number | null
+}
+
+export interface ApplyJob {
+  id: number
+  profile_id: number
+  status: 'queued' | 'running' | 'succeeded' | 'failed'
+  selector: ApplySelector
+  total_devices: number
+  processed_devices: number
+  created_actions: number
+  skipped_actions: number
+  error_count: number
+  last_error?: string | null
+  created_at: string
+  updated_at: string
+  started_at?: string | null
+  completed_at?: string | null
+  rollout_id?: number | null
+}
+
 export interface TemplateInstantiateBody {
   name?: string
   description?: string
 }
 
+export interface Page<T> {
+  items: T[]
+  next_cursor?: string | null
+  total?: number | null
+}
+
 async function handleResponse<T>(res: Response): Promise<T> {
   if (!res.ok) {
     const text = await res.text()
@@ -163,13 +226,80 @@ async function handleResponse<T>(res: Response): Promise<T> {
   return res.json() as Promise<T>
 }
 
-export async function fetchDevices(): Promise<Device[]> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/devices`, { cache: 'no-store' })
-  return handleResponse<Device[]>(res)
+function pagePath(path: string, cursor?: string | null, limit?: number): string {
+  const query = new URLSearchParams()
+  if (cursor) query.set('cursor', cursor)
+  if (limit) query.set('limit', String(limit))
+  const separator = path.includes('?') ? '&' : '?'
+  return query.toString() ? `${path}${separator}${query.toString()}` : path
+}
+
+// Polled lists use `no-cache`: the browser revalidates with the ETag it holds and
+// the API answers 304 when nothing changed. Finished action payloads/logs are
+// cacheable as sent (`default`); in-flight ones are marked no-store server-side.
+
+// Small catalogs (scripts, software, profiles) are read in full for pickers.
+async function fetchAllPages<T>(path: string): Promise<T[]> {
+  const items: T[] = []
+  let cursor: string | null | undefined = null
+  do {
+    const res = await fetch(`${API_BASE_URL}${pagePath(path, cursor, 1000)}`, { cache: 'no-cache' })
+    const page: Page<T> = await handleResponse<Page<T>>(res)
+    items.push(...page.items)
+    cursor = page.next_cursor
+  } while (cursor)
+  return items
+}
+
+export type DeviceFilters = {
+  hostname_prefix?: string
+  hostname_contains?: string
+  status?: string
+  os_type?: string
+  profile_id?: number
+  group_id?: number
+  checked_in_after?: string
+  checked_in_before?: string
+}
+
+function deviceFilterPath(path: string, filters?: DeviceFilters): string {
+  const query = new URLSearchParams()
+  Object.entries(filters ?? {}).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') query.set(key, String(value))
+  })
+  const separator = path.includes('?') ? '&' : '?'
+  return query.toString() ? `${path}${separator}${query.toString()}` : path
+}
+
+export async function fetchDevices(cursor?: string | null, filters?: DeviceFilters): Promise<Page<Device>> {
+  const path = pagePath(deviceFilterPath('/api/v1/devices', filters), cursor)
+  const res = await fetch(`${API_BASE_URL}${path}`, { cache: 'no-cache' })
+  return handleResponse<Page<Device>>(res)
+}
+
+export async function searchDevices(
+  q: string,
+  cursor?: string | null,
+  filters?: DeviceFilters
+): Promise<Page<Device>> {
+  const base = `/api/v1/devices/search?q=${encodeURIComponent(q)}`
+  const path = pagePath(deviceFilterPath(base, filters), cursor)
+  const res = await fetch(`${API_BASE_URL}${path}`, { cache: 'no-cache' })
+  return handleResponse<Page<Device>>(res)
+}
+
+export type FleetSummary = {
+  devices: { total: number; by_status: Record<string, number>; by_os_type: Record<string, number> }
+  actions: { total: number; by_status: Record<string, number> }
+}
+
+export async function fetchFleetSummary(): Promise<FleetSummary> {
+  const res = await fetch(`${API_BASE_URL}/api/v1/fleet/summary`, { cache: 'no-store' })
+  return handleResponse<FleetSummary>(res)
 }
 
 export async function fetchDevice(deviceId: number): Promise<Device> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/devices/${deviceId}`, { cache: 'no-store' })
+  const res = await fetch(`${API_BASE_URL}/api/v1/devices/${deviceId}`, { cache: 'no-cache' })
   return handleResponse<Device>(res)
 }
 
@@ -189,9 +319,63 @@ export async function deleteDevice(deviceId: number): Promise<{ status: number }
   return { status: res.status }
 }
 
-export async function fetchDeviceActions(deviceId: number): Promise<Action[]> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/devices/${deviceId}/actions`, { cache: 'no-store' })
-  return handleResponse<Action[]>(res)
+export async function fetchDeviceActions(deviceId: number, cursor?: string | null): Promise<Page<Action>> {
+  const res = await fetch(`${API_BASE_URL}${pagePath(`/api/v1/devices/${deviceId}/actions`, cursor)}`, {
+    cache: 'no-cache',
+  })
+  return handleResponse<Page<Action>>(res)
+}
+
+export async function fetchActionLogs(
+  deviceId: number,
+  actionId: number,
+  params: { offset?: number; limit?: number; tail?: number } = {}
+): Promise<ActionLog> {
+  const query = new URLSearchParams()
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined) query.set(key, String(value))
+  })
+  const suffix = query.toString() ? `?${query.toString()}` : ''
+  const res = await fetch(`${API_BASE_URL}/api/v1/devices/${deviceId}/actions/${actionId}/logs${suffix}`, {
+    cache: 'default',
+  })
+  return handleResponse<ActionLog>(res)
+}
+
+export async function fetchActionPayload(deviceId: number, actionId: number): Promise<ActionPayload> {
+  const res = await fetch(`${API_BASE_URL}/api/v1/devices/${deviceId}/actions/${actionId}/payload`, {
+    cache: 'default',
+  })
+  return handleResponse<ActionPayload>(res)
+}
+
+export type DeviceEvent =
+  | { type: 'action.created'; data: { device_id: number; action_id: number; type: string; status: string } }
+  | { type: 'action.status'; data: { device_id: number; action_id: number; status: string; exit_code?: number | null } }
+  | { type: 'actions.changed'; data: { device_id: number } }
+  | { type: 'device.status'; data: { device_id: number; status: string; os_version?: string | null } }
+  | { type: 'device.deleted'; data: { device_id: number } }
+  | { type: 'resync'; data: { dropped: number } }
+
+const DEVICE_EVENT_TYPES: DeviceEvent['type'][] = [
+  'action.created',
+  'action.status',
+  'actions.changed',
+  'device.status',
+  'device.deleted',
+  'resync',
+]
+
+// Server-sent state changes for one device (or the whole fleet); returns a function that closes the stream.
+export function subscribeDeviceEvents(deviceId: number | null, onEvent: (event: DeviceEvent) => void): () => void {
+  const query = deviceId === null ? '' : `?device_id=${deviceId}`
+  const source = new EventSource(`${API_BASE_URL}/api/v1/events${query}`)
+  DEVICE_EVENT_TYPES.forEach((type) => {
+    source.addEventListener(type, (message) => {
+      onEvent({ type, data: JSON.parse((message as MessageEvent).data) } as DeviceEvent)
+    })
+  })
+  return () => source.close()
 }
 
 export async function createDeviceAction(
@@ -207,8 +391,7 @@ export async function createDeviceAction(
 }
 
 export async function fetchScripts(): Promise<Script[]> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/scripts`, { cache: 'no-store' })
-  return handleResponse<Script[]>(res)
+  return fetchAllPages<Script>('/api/v1/scripts')
 }
 
 export async function fetchScript(scriptId: number): Promise<Script> {
@@ -244,8 +427,7 @@ export async function deleteScript(scriptId: number): Promise<void> {
 }
 
 export async function fetchProfiles(): Promise<DeploymentProfile[]> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/profiles`, { cache: 'no-store' })
-  return handleResponse<DeploymentProfile[]>(res)
+  return fetchAllPages<DeploymentProfile>('/api/v1/profiles')
 }
 
 export async function createProfile(body: DeploymentProfileCreateInput): Promise<DeploymentProfile> {
@@ -312,23 +494,42 @@ export async function fetchProfileTasks(profileId: number): Promise<ProfileTask[
   return handleResponse<ProfileTask[]>(res)
 }
 
+export async function fetchProfilePlan(profileId: number, osType?: string | null): Promise<ProfilePlan> {
+  const query = osType ? `?os_type=${encodeURIComponent(osType)}` : ''
+  const res = await fetch(`${API_BASE_URL}/api/v1/profiles/${profileId}/plan${query}`, { cache: 'no-store' })
+  return handleResponse<ProfilePlan>(res)
+}
+
 export async function fetchTemplateTasks(templateId: number): Promise<ProfileTask[]> {
   const res = await fetch(`${API_BASE_URL}/api/v1/templates/${templateId}/tasks`, { cache: 'no-store' })
   return handleResponse<ProfileTask[]>(res)
 }
 
-export async function applyProfile(profileId: number, deviceId: number): Promise<void> {
+export async function fetchApplyJob(jobId: number): Promise<ApplyJob> {
+  const res = await fetch(`${API_BASE_URL}/api/v1/apply-jobs/${jobId}`, { cache: 'no-store' })
+  return handleResponse<ApplyJob>(res)
+}
+
+export async function applyProfile(profileId: number, deviceId: number): Promise<ApplyJob> {
   const res = await fetch(`${API_BASE_URL}/api/v1/profiles/${profileId}/apply`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ device_ids: [deviceId] }),
   })
-  await handleResponse<{ created_actions: number }>(res)
+  let job = await handleResponse<ApplyJob>(res)
+  // Apply runs as a background job; single-device jobs finish almost immediately.
+  for (let attempt = 0; attempt < 20 && (job.status === 'queued' || job.status === 'running'); attempt++) {
+    await new Promise((resolve) => setTimeout(resolve, 250))
+    job = await fetchApplyJob(job.id)
+  }
+  if (job.status === 'failed') {
+    throw new Error(job.last_error ?? 'Profile apply failed')
+  }
+  return job
 }
 
 export async function fetchTemplates(): Promise<DeploymentProfile[]> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/templates`, { cache: 'no-store' })
-  return handleResponse<DeploymentProfile[]>(res)
+  return fetchAllPages<DeploymentProfile>('/api/v1/templates')
 }
 
 export async function fetchTemplate(templateId: number): Promise<DeploymentProfileWithTasks> {
@@ -382,8 +583,7 @@ export async function replaceTemplateTasks(
 }
 
 export async function fetchSoftware(): Promise<SoftwarePackage[]> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/software`, { cache: 'no-store' })
-  return handleResponse<SoftwarePackage[]>(res)
+  return fetchAllPages<SoftwarePackage>('/api/v1/software')
 }
 
 export async function fetchSoftwareItem(id: number): Promise<SoftwarePackage> {